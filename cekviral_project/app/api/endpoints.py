@@ -1,71 +1,115 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-import logging
 import asyncio
-import requests
+import json
+import logging
+import time
 
-from app.schemas import ContentInput, MLPredictionOutput, VerificationResult
-from app.utils.helpers import is_url, classify_url
-from app.services.content_analyzer import extract_text_from_html, convert_video_to_text
-from app.services.ml_model import predict_content_hoax_status
-from app.services.database import save_verification_result
+from app.core.config import settings
+from app.core.metrics import INFERENCE_GAUGES, ProgressCallback, StageTimer, registry
+from app.schemas import (
+    BatchContentInput, BatchVerificationItem, ContentInput, MLPredictionOutput, TranscriptionJobStatus, VerificationResult
+)
+from app.utils.helpers import is_url, classify_url, canonical_url, video_id_from_url
+from app.services.article_cache import article_cache, fetch_article_text
+from app.services.transcription_jobs import transcription_jobs
+from app.services.ml_model import (
+    inference_batcher, get_interpreter_pool_stats, get_prediction_cache_stats, predict_content_hoax_status_batch
+)
+from app.services.database import history_writer, save_verification_result, save_verification_results
+from app.services.http_fetcher import FetchError
 from app.utils.auth import get_current_user
+from app.utils.single_flight import SingleFlight
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.post("/verify", response_model=VerificationResult)
-async def verify_content(
-    input_data: ContentInput,
-    request: Request,
-    user_id: Optional[str] = Depends(get_current_user)
-):
-    user_input = input_data.content.strip()
-    processed_text: Optional[str] = None
-    input_type = "text"
-    processing_message = "Konten sedang diproses..."
-
-    default_ml_output = MLPredictionOutput(
+def _default_ml_output() -> MLPredictionOutput:
+    return MLPredictionOutput(
         status="error",
         message="Tidak ada teks yang dapat diproses atau diverifikasi oleh model ML.",
         probabilities={"HOAKS": 0.0, "FAKTA": 0.0},
         predicted_label_model="N/A",
         highest_confidence=0.0,
         final_label_thresholded="BELUM DIVERIFIKASI",
-        inference_time_ms=0.0
+        inference_time_ms=0.0,
+        windows_used=0
     )
-    prediction_details = default_ml_output
+
+
+def _normalized_input(user_input: str) -> str:
+    """Kunci deduplikasi input: URL kanonik untuk URL, teks dengan spasi dirapikan untuk teks."""
+    if is_url(user_input):
+        return canonical_url(user_input)
+    return " ".join(user_input.split())
+
+
+async def _prepare_input(
+    user_input: str, timer: StageTimer, wait_for_video: bool, emit: Optional[ProgressCallback] = None
+) -> tuple[str, Optional[str], str, Optional[str]]:
+    """
+    Mengubah input (teks, URL artikel, atau URL video) menjadi teks yang siap dinilai model.
+    Mengembalikan (input_type, processed_text, processing_message, job_id); job_id diisi jika
+    video masih ditranskripsi di latar belakang (hanya bila `wait_for_video` False). Pemanggil
+    mengubah job_id itu menjadi handle milik pemohon dengan `_open_job_handle`.
+    Jika `emit` diisi, setiap tahap yang selesai dilaporkan: classified, fetched, extracted,
+    transcription_status, transcribed.
+    """
+    emit = emit or (lambda event, data: None)
+    processed_text: Optional[str] = None
+    input_type = "text"
+    processing_message = "Konten sedang diproses..."
 
     if is_url(user_input):
         input_type = "url"
-        url_type = classify_url(user_input)
+        with timer.stage("classification"):
+            url_type = classify_url(user_input)
+        emit("classified", {"input_type": input_type, "url_type": url_type})
 
         match url_type:
             case "direct_video":
-                logger.info("Transkripsi video dimulai.")
-                processed_text = await convert_video_to_text(user_input)
-                if processed_text and not processed_text.lower().startswith("maaf,"):
-                    processing_message = "Transkripsi video berhasil."
+                processed_text = transcription_jobs.cached_transcript(video_id_from_url(user_input))
+                if processed_text:
+                    processing_message = "Transkrip video diambil dari cache."
                 else:
-                    processing_message = processed_text or "Gagal mentranskripsi video."
-                    processed_text = None
+                    logger.info("Transkripsi video dimulai.")
+                    job = transcription_jobs.submit(user_input, detached=not wait_for_video)
+                    if not wait_for_video:
+                        # Jangan tahan request selama unduh + transkripsi; klien memantau job
+                        return input_type, None, "Video sedang ditranskripsi.", job.job_id
+                    try:
+                        with timer.stage("transcribe"):
+                            await transcription_jobs.wait(
+                                job, on_status=lambda status: emit("transcription_status", {"job_id": job.job_id, "status": status})
+                            )
+                    finally:
+                        # Request dibatalkan (mis. klien memutus koneksi): job ikut dihentikan jika tidak ada penunggu lain
+                        transcription_jobs.release(job)
+                    if job.status == "done":
+                        processed_text = job.transcript
+                        processing_message = "Transkripsi video berhasil."
+                    else:
+                        processing_message = job.error or "Gagal mentranskripsi video."
+                if processed_text:
+                    emit("transcribed", {"processed_text": processed_text})
 
             case "web_article":
                 logger.info("Ekstraksi artikel dimulai.")
                 try:
-                    headers = {
-                        "User-Agent": "Mozilla/5.0"
-                    }
-                    response = await asyncio.to_thread(requests.get, user_input, headers=headers, timeout=20)
-                    response.raise_for_status()
-                    html_content = response.text
-                    processed_text = await asyncio.to_thread(extract_text_from_html, html_content)
-                    processing_message = (
-                        "Teks dari halaman web berhasil diekstrak."
-                        if processed_text else
-                        "Gagal mengekstrak teks dari artikel."
-                    )
+                    processed_text, source = await fetch_article_text(user_input, timer, emit=emit)
+                    if not processed_text:
+                        processing_message = "Gagal mengekstrak teks dari artikel."
+                    elif source == "fetched":
+                        processing_message = "Teks dari halaman web berhasil diekstrak."
+                    else:
+                        processing_message = "Teks dari halaman web diambil dari cache."
+                    if processed_text:
+                        emit("extracted", {"processed_text": processed_text, "source": source})
+                except FetchError as e:
+                    logger.warning(f"Gagal mengambil artikel {user_input}: {e}")
+                    processing_message = f"Gagal memproses URL. {e}"
                 except Exception as e:
                     logger.error(f"Error: {e}", exc_info=True)
                     processing_message = "Gagal memproses URL."
@@ -80,12 +124,38 @@ async def verify_content(
     elif user_input:
         processed_text = user_input
         processing_message = "Teks langsung diterima untuk verifikasi."
+        emit("classified", {"input_type": input_type})
     else:
         processing_message = "Input kosong, tidak dapat diverifikasi."
 
-    if processed_text:
-        logger.info(f"Verifikasi ML untuk teks: {processed_text[:100]}...")
-        ml_output = await asyncio.to_thread(predict_content_hoax_status, processed_text)
+    return input_type, processed_text, processing_message, None
+
+
+def _open_job_handle(job_id: str, user_input: str, processing_message: str) -> tuple[str, str]:
+    """
+    Handle job transkripsi untuk pemohon ini, agar hasilnya memakai URL yang ia kirim walaupun job-nya
+    digabungkan dengan request lain. Mengembalikan (handle, processing_message dengan tautan status).
+    """
+    handle = transcription_jobs.open_handle(job_id, user_input)
+    return handle, f"{processing_message} Cek hasilnya di /verify/jobs/{handle}."
+
+
+def _build_result(
+    user_input: str,
+    input_type: str,
+    processed_text: Optional[str],
+    processing_message: str,
+    ml_output: Optional[dict],
+    timer: StageTimer,
+    job_id: Optional[str] = None,
+) -> VerificationResult:
+    """Menyusun VerificationResult dari teks hasil pemrosesan input dan keluaran model (jika ada)."""
+    prediction_details = _default_ml_output()
+
+    if processed_text and ml_output is not None:
+        # Tahap model diukur per batch oleh predict_content_hoax_status_batch
+        for stage, duration_ms in ml_output.pop("stage_timings_ms", {}).items():
+            timer.record(stage, duration_ms)
         if ml_output.get("status") == "success":
             prediction_details = MLPredictionOutput(**ml_output)
             processing_message += " Verifikasi selesai."
@@ -95,21 +165,324 @@ async def verify_content(
     elif processing_message.startswith("Konten sedang diproses"):
         processing_message = "Tidak ada teks yang dapat diproses."
 
-    final_result = VerificationResult(
+    return VerificationResult(
         original_input=user_input,
         input_type=input_type,
         processed_text=processed_text or "",
         prediction=prediction_details,
         processing_message=processing_message,
-        history_id="unsaved"
+        history_id="unsaved",
+        job_id=job_id,
     )
 
-    # Simpan ke Supabase hanya jika user login
+
+async def _classify(processed_text: Optional[str], timer: StageTimer) -> Optional[dict]:
+    """Keluaran model untuk teks hasil pemrosesan input (lewat micro-batcher); None jika tidak ada teks."""
+    if not processed_text:
+        return None
+    logger.info(f"Verifikasi ML untuk teks: {processed_text[:100]}...")
+    with timer.stage("inference"):
+        return await inference_batcher.submit(processed_text)
+
+
+async def _save(final_result: VerificationResult, user_id: Optional[str], timer: StageTimer):
+    """Menyimpan hasil ke riwayat Supabase (hanya jika user login) dan mengisi history_id-nya."""
     if user_id:
         logger.info(f"Penyimpanan ke Supabase untuk user_id: {user_id}")
-        history_id = await save_verification_result(result=final_result, user_id=user_id)
+        with timer.stage("persist"):
+            history_id = await save_verification_result(result=final_result, user_id=user_id)
         final_result.history_id = history_id or "unsaved"
     else:
         logger.info("User belum login. Hasil tidak disimpan.")
 
-    return final_result
\ No newline at end of file
+
+async def _verify_and_save(
+    user_input: str,
+    input_type: str,
+    processed_text: Optional[str],
+    processing_message: str,
+    user_id: Optional[str],
+    timer: StageTimer,
+) -> VerificationResult:
+    """Menjalankan model atas teks hasil pemrosesan input lalu menyimpan hasilnya jika user login."""
+    ml_output = await _classify(processed_text, timer)
+    final_result = _build_result(user_input, input_type, processed_text, processing_message, ml_output, timer)
+    await _save(final_result, user_id, timer)
+    return final_result
+
+
+# Request /verify identik yang datang bersamaan berbagi satu kali pengambilan, transkripsi, dan inferensi
+verify_flights = SingleFlight()
+
+
+@router.post("/verify", response_model=VerificationResult)
+async def verify_content(
+    input_data: ContentInput,
+    request: Request,
+    include_timings: bool = False,
+    user_id: Optional[str] = Depends(get_current_user)
+):
+    timer = StageTimer()
+    user_input = input_data.content.strip()
+
+    async def process():
+        prepared = await _prepare_input(user_input, timer, wait_for_video=not settings.TRANSCRIPTION_ASYNC_JOBS)
+        ml_output = None if prepared[3] else await _classify(prepared[1], timer)
+        return prepared, ml_output
+
+    if settings.VERIFY_COALESCING_ENABLED:
+        wait_start = time.perf_counter()
+        ((input_type, processed_text, processing_message, job_id), ml_output), shared = await verify_flights.do(
+            _normalized_input(user_input), process
+        )
+        if shared:
+            timer.record("coalesced_wait", (time.perf_counter() - wait_start) * 1000)
+            if ml_output is not None:
+                # Tahap model sudah dicatat oleh request yang menjalankannya
+                ml_output = {key: value for key, value in ml_output.items() if key != "stage_timings_ms"}
+    else:
+        (input_type, processed_text, processing_message, job_id), ml_output = await process()
+    if job_id:
+        job_id, processing_message = _open_job_handle(job_id, user_input, processing_message)
+
+    final_result = _build_result(
+        user_input, input_type, processed_text, processing_message,
+        dict(ml_output) if ml_output is not None else None, timer, job_id=job_id
+    )
+    if not job_id:
+        # Setiap pengguna tetap mendapat baris riwayatnya sendiri
+        await _save(final_result, user_id, timer)
+
+    if include_timings:
+        final_result.stage_timings_ms = timer.timings_ms
+    return final_result
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Satu event Server-Sent Events; data dikirim sebagai JSON satu baris."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/verify/stream")
+async def verify_content_stream(
+    input_data: ContentInput,
+    include_timings: bool = False,
+    user_id: Optional[str] = Depends(get_current_user)
+):
+    """
+    Varian /verify yang mengirim progres sebagai Server-Sent Events (text/event-stream), untuk dibaca
+    dengan fetch + ReadableStream. Event: classified, fetched, extracted / transcription_status /
+    transcribed, predicted, saved, lalu done (berisi VerificationResult lengkap) atau error.
+    Teks hasil ekstraksi dan prediksi dikirim begitu tersedia. Jika klien memutus koneksi, pipeline
+    dibatalkan, termasuk job transkripsi (dan proses yt-dlp/ffmpeg-nya) yang tidak ditunggu request lain.
+    """
+    timer = StageTimer()
+    user_input = input_data.content.strip()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: str, data: dict):
+        events.put_nowait((event, data))
+
+    async def pipeline():
+        input_type, processed_text, processing_message, _ = await _prepare_input(
+            user_input, timer, wait_for_video=True, emit=emit
+        )
+        ml_output = await _classify(processed_text, timer)
+        final_result = _build_result(user_input, input_type, processed_text, processing_message, ml_output, timer)
+        if ml_output is not None:
+            emit("predicted", {"prediction": final_result.prediction.model_dump()})
+        if user_id:
+            await _save(final_result, user_id, timer)
+            emit("saved", {"history_id": final_result.history_id})
+        if include_timings:
+            final_result.stage_timings_ms = timer.timings_ms
+        emit("done", {"result": final_result.model_dump()})
+
+    async def stream_events():
+        task = asyncio.create_task(pipeline())
+        task.add_done_callback(lambda done: events.put_nowait(None))
+        try:
+            while (item := await events.get()) is not None:
+                yield _sse_event(*item)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Pipeline verifikasi streaming gagal: {task.exception()}", exc_info=task.exception())
+                yield _sse_event("error", {"message": "Terjadi kesalahan saat memproses konten."})
+        finally:
+            # Generator ditutup sebelum selesai = klien memutus koneksi; hentikan pekerjaan yang tersisa
+            task.cancel()
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/verify/batch")
+async def verify_batch(
+    input_data: BatchContentInput,
+    user_id: Optional[str] = Depends(get_current_user)
+):
+    """
+    Verifikasi banyak teks/URL sekaligus. Input duplikat (setelah normalisasi) hanya diproses sekali;
+    URL diambil paralel dengan batas BATCH_VERIFY_FETCH_CONCURRENCY. Respons berupa NDJSON, satu
+    BatchVerificationItem per input unik:
+    - input tanpa teks (URL tidak didukung, gagal diambil, video yang masih ditranskripsi) dikirim
+      begitu selesai diproses dan tidak disimpan ke riwayat;
+    - semua teks lainnya dinilai per potongan berisi paling banyak INFERENCE_MAX_BATCH_SIZE teks: satu
+      pemanggilan model batch dan satu insert massal ke riwayat (jika login) per potongan, lalu dikirim.
+      Potongan dinilai begitu penuh atau INFERENCE_MAX_WAIT_MS setelah teks pertamanya siap, tanpa
+      menunggu URL lain selesai diambil.
+    """
+    if len(input_data.contents) > settings.BATCH_VERIFY_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Maksimal {settings.BATCH_VERIFY_MAX_ITEMS} konten per batch.",
+        )
+
+    # Deduplikasi: kunci ternormalisasi -> (input pertama, semua posisinya di request)
+    unique_inputs: dict[str, tuple[str, list[int]]] = {}
+    for index, content in enumerate(input_data.contents):
+        user_input = content.strip()
+        key = _normalized_input(user_input)
+        if key in unique_inputs:
+            unique_inputs[key][1].append(index)
+        else:
+            unique_inputs[key] = (user_input, [index])
+
+    fetch_slots = asyncio.Semaphore(settings.BATCH_VERIFY_FETCH_CONCURRENCY)
+
+    async def prepare(user_input: str, indices: list[int]):
+        timer = StageTimer()
+        async with fetch_slots:
+            prepared = await _prepare_input(user_input, timer, wait_for_video=False)
+        return user_input, indices, timer, prepared
+
+    def to_line(indices: list[int], result: VerificationResult) -> str:
+        return BatchVerificationItem(indices=indices, result=result).model_dump_json() + "\n"
+
+    # Dipotong sebesar batch interpreter agar satu request tidak menahan thread model (dan memori
+    # tensor input) untuk ratusan teks sekaligus
+    chunk_size = settings.INFERENCE_MAX_BATCH_SIZE
+    max_wait = settings.INFERENCE_MAX_WAIT_MS / 1000
+
+    async def classify_chunk(chunk: list[tuple]) -> list[str]:
+        ml_outputs = await asyncio.to_thread(predict_content_hoax_status_batch, [item[4] for item in chunk])
+        results = [
+            _build_result(user_input, input_type, processed_text, processing_message, ml_output, timer)
+            for (user_input, _, timer, input_type, processed_text, processing_message), ml_output in zip(chunk, ml_outputs)
+        ]
+
+        if user_id:
+            history_ids = await save_verification_results(results, user_id=user_id)
+            for result, history_id in zip(results, history_ids):
+                result.history_id = history_id or "unsaved"
+
+        return [to_line(indices, result) for (_, indices, *_), result in zip(chunk, results)]
+
+    async def stream_results():
+        loop = asyncio.get_running_loop()
+        tasks = [asyncio.create_task(prepare(user_input, indices)) for user_input, indices in unique_inputs.values()]
+        pending = set(tasks)
+        try:
+            # Potongan dinilai begitu penuh, atau max_wait setelah teks pertama di dalamnya siap, sementara
+            # URL lain terus diambil; teks tidak menunggu pengambilan yang paling lambat
+            ready, deadline = [], 0.0
+            while pending or ready:
+                if pending:
+                    timeout = None
+                    if ready:
+                        timeout = 0 if len(ready) >= chunk_size else max(0.0, deadline - loop.time())
+                    done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        user_input, indices, timer, (input_type, processed_text, processing_message, job_id) = task.result()
+                        if processed_text:
+                            if not ready:
+                                deadline = loop.time() + max_wait
+                            ready.append((user_input, indices, timer, input_type, processed_text, processing_message))
+                            continue
+                        if job_id:
+                            job_id, processing_message = _open_job_handle(job_id, user_input, processing_message)
+                        yield to_line(indices, _build_result(
+                            user_input, input_type, None, processing_message, None, timer, job_id=job_id
+                        ))
+
+                if ready and (len(ready) >= chunk_size or not pending or loop.time() >= deadline):
+                    chunk, ready = ready[:chunk_size], ready[chunk_size:]
+                    deadline = loop.time() + max_wait
+                    for line in await classify_chunk(chunk):
+                        yield line
+        finally:
+            # Klien memutus koneksi di tengah stream: hentikan pengambilan URL yang belum selesai
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/verify/jobs/{job_id}", response_model=TranscriptionJobStatus)
+async def get_transcription_job(
+    job_id: str,
+    user_id: Optional[str] = Depends(get_current_user)
+):
+    """
+    Status job transkripsi video. Setelah transkrip siap, hasil verifikasinya dihitung sekali per
+    pengguna (dan disimpan ke riwayat jika login); polling berikutnya mengembalikan hasil yang sama.
+    """
+    resolved = transcription_jobs.resolve(job_id)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Job transkripsi tidak ditemukan atau sudah kedaluwarsa.")
+    # Job bisa digabungkan dengan pemohon lain; hasil dan riwayat memakai URL yang dikirim pemohon handle ini
+    job, submitted_url = resolved
+
+    if job.status == "failed":
+        return TranscriptionJobStatus(job_id=job_id, status=job.status, original_input=submitted_url,
+                                      message=job.error or "Gagal mentranskripsi video.")
+    if job.status != "done":
+        return TranscriptionJobStatus(job_id=job_id, status=job.status, original_input=submitted_url,
+                                      message="Video masih diproses.")
+
+    # Polling bersamaan dari pengguna yang sama menunggu task yang sama agar riwayat tidak tersimpan ganda
+    key = (user_id or "", submitted_url)
+    task = job.results.get(key)
+    if task is None:
+        task = job.results[key] = asyncio.ensure_future(_verify_and_save(
+            submitted_url, "url", job.transcript, "Transkripsi video berhasil.", user_id, StageTimer()
+        ))
+    try:
+        final_result = await asyncio.shield(task)
+    except Exception:
+        job.results.pop(key, None)
+        raise
+    return TranscriptionJobStatus(job_id=job_id, status=job.status, original_input=submitted_url,
+                                  message=final_result.processing_message or "", result=final_result)
+
+
+@router.get("/stats/inference")
+async def inference_stats():
+    """Metrik inferensi: micro-batching (ukuran batch, waktu tunggu antrean), pool interpreter, dan cache prediksi."""
+    return {
+        "batcher": inference_batcher.stats(),
+        "interpreter_pool": get_interpreter_pool_stats(),
+        "prediction_cache": get_prediction_cache_stats(),
+        "article_cache": article_cache.stats(),
+        "transcription_jobs": transcription_jobs.stats(),
+        "verify_coalescing": verify_flights.stats(),
+        "history_writer": history_writer.stats(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrik dalam format teks Prometheus: histogram durasi per tahap, request in-flight, dan kondisi inferensi."""
+    batcher_stats = inference_batcher.stats()
+    pool_stats = get_interpreter_pool_stats()
+    cache_stats = get_prediction_cache_stats()
+    INFERENCE_GAUGES.set(batcher_stats["queue_depth"], metric="batcher_queue_depth")
+    INFERENCE_GAUGES.set(batcher_stats["inflight_batches"], metric="batcher_inflight_batches")
+    INFERENCE_GAUGES.set(batcher_stats["avg_batch_size"], metric="batcher_avg_batch_size")
+    INFERENCE_GAUGES.set(pool_stats["in_use"], metric="interpreter_pool_in_use")
+    INFERENCE_GAUGES.set(pool_stats["size"], metric="interpreter_pool_size")
+    INFERENCE_GAUGES.set(cache_stats["hit_rate"], metric="prediction_cache_hit_rate")
+    INFERENCE_GAUGES.set(cache_stats["entries"], metric="prediction_cache_entries")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,5 +1,6 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
+from typing import Literal
 import os
 
 # Khusus untuk lokal saja
@@ -17,4 +18,109 @@ class Settings(BaseSettings):
     YDL_TEMP_DIR: str = "temp_downloads/"
     GCP_CREDENTIALS_PATH: str | None = None
 
+    # Micro-batching inferensi: jumlah maksimum teks per invoke dan jendela tunggu pengumpulan batch
+    INFERENCE_MAX_BATCH_SIZE: int = 16
+    INFERENCE_MAX_WAIT_MS: float = 5.0
+    # Bucket ukuran batch interpreter: batch dipad sampai bucket terkecil yang memuatnya, dan setiap slot
+    # pool menyimpan satu interpreter teralokasi per (bucket panjang sekuens, bucket batch) agar
+    # allocate_tensors() tidak dipanggil setiap ukuran batch berubah. Setiap pasangan bucket adalah instance
+    # interpreter penuh (tensor kerja + salinan bobot milik delegate), jadi per slot paling banyak
+    # INFERENCE_BATCH_INTERPRETERS_PER_SLOT interpreter batch > 1 dipertahankan (yang paling lama tidak dipakai
+    # dibuang dan dibuat ulang saat dibutuhkan lagi), di samping satu interpreter batch 1 per bucket panjang.
+    # Ukur RSS per interpreter dengan benchmarks/bench_runtime_footprint.py sebelum menaikkan keduanya.
+    INFERENCE_BATCH_BUCKETS: list[int] = [1, 4, 16]
+    INFERENCE_BATCH_INTERPRETERS_PER_SLOT: int = 3
+
+    # Pool interpreter TFLite: jumlah instance paralel dan thread intra-op per instance.
+    # Idealnya INTERPRETER_POOL_SIZE * INTERPRETER_NUM_THREADS <= jumlah core CPU.
+    INTERPRETER_POOL_SIZE: int = 2
+    INTERPRETER_NUM_THREADS: int = 1
+    # Runtime interpreter: "auto"/"tflite_runtime" memakai runtime TFLite mandiri (ai-edge-litert atau
+    # tflite-runtime) jika terpasang, selain itu TensorFlow penuh; "tensorflow" butuh requirements-benchmark.txt
+    INFERENCE_RUNTIME: Literal["auto", "tflite_runtime", "tensorflow"] = "auto"
+    # Varian model TFLite: "float32" (indobert_model.tflite), "float16", atau "int8" (kuantisasi
+    # dynamic-range). Jika file varian tidak ada, model float32 yang dipakai.
+    MODEL_VARIANT: Literal["float32", "float16", "int8"] = "float32"
+
+    # Bucket panjang sekuens: setiap batch dipad hanya sampai bucket terkecil yang memuat teks terpanjangnya
+    SEQUENCE_BUCKETS: list[int] = [32, 64, 128]
+
+    # Mode dokumen panjang: teks dipecah menjadi jendela token yang tumpang tindih dan semua
+    # jendela dinilai dalam satu batch. Agregasi: "mean", "max_hoax", atau "attention".
+    LONG_DOCUMENT_MODE: bool = True
+    LONG_DOCUMENT_WINDOW_OVERLAP: int = 32
+    LONG_DOCUMENT_MAX_WINDOWS: int = 16
+    LONG_DOCUMENT_AGGREGATION: Literal["mean", "max_hoax", "attention"] = "mean"
+
+    # Cache hasil prediksi (LRU + TTL di memori, opsional SQLite di disk agar bertahan setelah restart)
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    PREDICTION_CACHE_DB_PATH: str | None = None
+    # Batas baris tier SQLite (entri kedaluwarsa dan terlama dihapus saat startup dan berkala); kosong = sama
+    # dengan PREDICTION_CACHE_MAX_ENTRIES
+    PREDICTION_CACHE_DB_MAX_ENTRIES: int | None = None
+
+    # Fetcher HTTP artikel: body dibaca streaming sampai FETCH_MAX_BYTES; timeout connect/read terpisah
+    # dan batas waktu total per halaman. Koneksi dipakai ulang dan dibatasi per host.
+    FETCH_MAX_BYTES: int = 2 * 1024 * 1024
+    FETCH_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    FETCH_READ_TIMEOUT_SECONDS: float = 10.0
+    FETCH_TOTAL_TIMEOUT_SECONDS: float = 20.0
+    FETCH_MAX_CONNECTIONS: int = 100
+    FETCH_MAX_CONNECTIONS_PER_HOST: int = 8
+
+    # Cache teks artikel per URL kanonik: segar selama TTL, setelah itu direvalidasi dengan GET kondisional
+    # (ETag/Last-Modified). Memori dibatasi jumlah entri dan total karakter; opsional SQLite di disk.
+    ARTICLE_CACHE_ENABLED: bool = True
+    ARTICLE_CACHE_MAX_ENTRIES: int = 2000
+    ARTICLE_CACHE_MAX_CHARS: int = 50_000_000
+    ARTICLE_CACHE_TTL_SECONDS: int = 30 * 60
+    ARTICLE_CACHE_DB_PATH: str | None = None
+
+    # Ekstraktor teks artikel: "auto" memakai selectolax jika terpasang, selain itu BeautifulSoup
+    HTML_EXTRACTOR: Literal["auto", "beautifulsoup"] = "auto"
+
+    # Job transkripsi video: /verify langsung mengembalikan job_id dan hasilnya diambil lewat
+    # /verify/jobs/{job_id}. Unduhan dan transkripsi yang berjalan bersamaan dibatasi terpisah;
+    # transkrip disimpan per ID video. Backend "stand_in" untuk pengujian offline tanpa yt-dlp/Google API.
+    TRANSCRIPTION_ASYNC_JOBS: bool = True
+    TRANSCRIPTION_BACKEND: Literal["gcp", "stand_in"] = "gcp"
+    TRANSCRIPTION_STAND_IN_DELAY_SECONDS: float = 0.5
+    TRANSCRIPTION_MAX_CONCURRENT_DOWNLOADS: int = 4
+    TRANSCRIPTION_MAX_CONCURRENT_TRANSCRIPTIONS: int = 2
+    TRANSCRIPTION_JOB_TTL_SECONDS: int = 60 * 60
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = 1000
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Ekstraksi audio: yt-dlp dialirkan lewat pipe ke ffmpeg menjadi potongan 16 kHz mono ("flac" atau
+    # "ogg_opus") yang ditranskripsi paralel. Audio setelah TRANSCRIPTION_MAX_DURATION_SECONDS diabaikan.
+    TRANSCRIPTION_AUDIO_FORMAT: Literal["flac", "ogg_opus"] = "flac"
+    TRANSCRIPTION_CHUNK_SECONDS: int = 5 * 60
+    TRANSCRIPTION_MAX_DURATION_SECONDS: int = 30 * 60
+
+    # Verifikasi batch (/verify/batch): jumlah maksimum konten per request dan URL yang diambil bersamaan
+    BATCH_VERIFY_MAX_ITEMS: int = 500
+    BATCH_VERIFY_FETCH_CONCURRENCY: int = 16
+
+    # Request /verify identik (input ternormalisasi sama) yang sedang berjalan bersamaan digabung menjadi
+    # satu pengambilan/transkripsi/inferensi; setiap pengguna tetap mendapat baris riwayatnya sendiri
+    VERIFY_COALESCING_ENABLED: bool = True
+
+    # Penulisan riwayat ke tabel history: "inline" (satu insert per request di worker thread), "batched"
+    # (write-behind: baris digabung menjadi insert massal, request menunggu ID dari database), atau
+    # "client_id" (history_id UUID dibuat di aplikasi, request tidak menunggu insert). Jika database tidak
+    # dapat dijangkau (galat jaringan/5xx), baris ditulis ke HISTORY_SPILL_PATH setelah beberapa percobaan dan
+    # dikirim ulang nanti; baris yang sudah HISTORY_SPILL_MAX_ATTEMPTS kali gagal (atau baris file yang rusak)
+    # dipindah ke HISTORY_DEAD_LETTER_PATH. Jika database menolak insert (mis. foreign key), batch dipecah dua
+    # sampai baris penyebabnya ketemu; hanya baris itu yang langsung dipindah ke HISTORY_DEAD_LETTER_PATH.
+    HISTORY_WRITE_MODE: Literal["inline", "batched", "client_id"] = "batched"
+    HISTORY_QUEUE_MAX_SIZE: int = 10000
+    HISTORY_BATCH_SIZE: int = 100
+    HISTORY_FLUSH_INTERVAL_MS: float = 50.0
+    HISTORY_WRITE_MAX_RETRIES: int = 3
+    HISTORY_SPILL_PATH: str = "history_spill/pending.jsonl"
+    HISTORY_SPILL_MAX_ATTEMPTS: int = 5
+    HISTORY_DEAD_LETTER_PATH: str = "history_spill/dead_letter.jsonl"
+
 settings = Settings()
\ No newline at end of file
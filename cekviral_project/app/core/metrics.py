@@ -0,0 +1,178 @@
+# cekviral_project/app/core/metrics.py
+"""
+Metrik aplikasi dalam format teks Prometheus (tanpa dependensi tambahan).
+
+Histogram durasi per tahap pipeline /verify (classification, fetch, extract, transcribe, preprocess,
+tokenize, invoke, postprocess, inference, persist), gauge request yang sedang diproses, dan counter
+request. Semua metrik disimpan di `registry` dan dirender oleh endpoint GET /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# Batas bucket histogram durasi (detik): dari tokenisasi sub-milidetik sampai transkripsi video
+DURATION_BUCKETS_SECONDS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Histogram kumulatif per kombinasi label, setara `prometheus_client.Histogram`."""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...], buckets=DURATION_BUCKETS_SECONDS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [jumlah per bucket (+Inf di akhir), total nilai, jumlah observasi]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: ([*counts], total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(snapshot.items()):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """Counter monoton per kombinasi label."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for key, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.label_names, key)))} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Nilai yang bisa naik-turun (mis. jumlah request yang sedang diproses)."""
+
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.register(Histogram(
+    "cekviral_stage_duration_seconds",
+    "Durasi setiap tahap pipeline verifikasi per request (tahap model diukur per batch yang memuat request).",
+    ("stage",),
+))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "cekviral_http_requests_in_flight",
+    "Jumlah request HTTP yang sedang diproses.",
+))
+REQUESTS_TOTAL = registry.register(Counter(
+    "cekviral_http_requests_total",
+    "Jumlah request HTTP yang selesai diproses.",
+    ("path", "method", "status"),
+))
+INFERENCE_GAUGES = registry.register(Gauge(
+    "cekviral_inference_state",
+    "Kondisi lapisan inferensi saat scrape (antrean batcher, pool interpreter, cache prediksi).",
+    ("metric",),
+))
+
+
+# Callback progres pipeline: (nama event, data) -> None; dipakai untuk streaming tahap ke klien
+ProgressCallback = Callable[[str, dict], None]
+
+
+class StageTimer:
+    """
+    Mencatat durasi tahap-tahap satu request: setiap tahap masuk ke histogram STAGE_DURATION
+    dan disimpan di `timings_ms` untuk dikembalikan di respons jika diminta.
+    """
+
+    def __init__(self):
+        self.timings_ms: dict[str, float] = {}
+
+    def record(self, stage: str, duration_ms: float):
+        self.timings_ms[stage] = self.timings_ms.get(stage, 0.0) + duration_ms
+        STAGE_DURATION.observe(duration_ms / 1000, stage=stage)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
@@ -7,6 +7,9 @@ from pydantic import BaseModel, Field
 class ContentInput(BaseModel):
     content: str = Field(..., description="Konten yang akan diverifikasi, bisa berupa teks murni atau URL.")
 
+class BatchContentInput(BaseModel):
+    contents: list[str] = Field(..., min_length=1, description="Daftar teks atau URL yang akan diverifikasi.")
+
 class PredictionProbabilities(BaseModel):
     HOAKS: float = Field(..., description="Probabilitas konten sebagai HOAKS.")
     FAKTA: float = Field(..., description="Probabilitas konten sebagai FAKTA.")
@@ -19,6 +22,7 @@ class MLPredictionOutput(BaseModel):
     highest_confidence: float
     final_label_thresholded: str
     inference_time_ms: float
+    windows_used: int = Field(1, description="Jumlah jendela token yang dinilai model (lebih dari 1 untuk dokumen panjang).")
 
 class VerificationResult(BaseModel):
     original_input: str
@@ -26,4 +30,17 @@ class VerificationResult(BaseModel):
     processed_text: str | None
     prediction: MLPredictionOutput
     processing_message: str | None
-    history_id: str
\ No newline at end of file
+    history_id: str
+    stage_timings_ms: dict[str, float] | None = Field(None, description="Durasi per tahap pipeline (ms); hanya diisi jika diminta dengan ?include_timings=true.")
+    job_id: str | None = Field(None, description="ID job transkripsi jika video masih diproses di latar belakang; cek hasilnya di /verify/jobs/{job_id}.")
+
+class TranscriptionJobStatus(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, downloading, transcribing, done, atau failed.")
+    original_input: str
+    message: str
+    result: VerificationResult | None = Field(None, description="Hasil verifikasi transkrip; diisi setelah status done.")
+
+class BatchVerificationItem(BaseModel):
+    indices: list[int] = Field(..., description="Posisi input ini (dan duplikatnya) di daftar `contents` request.")
+    result: VerificationResult
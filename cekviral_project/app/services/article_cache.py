@@ -0,0 +1,196 @@
+# cekviral_project/app/services/article_cache.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from app.core.config import settings
+from app.core.metrics import ProgressCallback, StageTimer
+from app.services.content_analyzer import extract_text_from_html
+from app.services.http_fetcher import http_fetcher
+from app.utils.helpers import canonical_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedArticle:
+    fetched_url: str
+    text: str
+    etag: str | None
+    last_modified: str | None
+    validated_at: float
+
+
+class ArticleCache:
+    """
+    Cache teks artikel hasil ekstraksi, dikunci dengan URL kanonik (lihat `canonical_url`).
+
+    Tier memori berupa LRU yang dibatasi jumlah entri dan total karakter teks. Jika `db_path`
+    diisi, tier kedua berupa SQLite sehingga cache bertahan setelah restart. Entri yang lebih tua
+    dari `ttl_seconds` tidak langsung dibuang: `fetch_article_text` merevalidasinya dengan GET
+    kondisional (If-None-Match / If-Modified-Since) dan memakai ulang teksnya jika server menjawab 304.
+    """
+
+    def __init__(self, max_entries: int, max_chars: int, ttl_seconds: float, db_path: str | None = None):
+        self.max_entries = max(1, max_entries)
+        self.max_chars = max(1, max_chars)
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedArticle] = OrderedDict()
+        self._chars = 0
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+
+        self._db: sqlite3.Connection | None = None
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS article_cache (url TEXT PRIMARY KEY, entry TEXT NOT NULL)"
+                )
+                self._db.commit()
+                logger.info(f"Tier disk cache artikel aktif di {db_path}.")
+            except sqlite3.Error as e:
+                logger.error(f"Gagal membuka cache artikel SQLite {db_path}: {e}", exc_info=True)
+                self._db = None
+
+    def get(self, key: str) -> CachedArticle | None:
+        """Entri untuk URL kanonik (segar atau kedaluwarsa); None jika tidak ada."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT entry FROM article_cache WHERE url = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal membaca cache artikel SQLite: {e}")
+                    row = None
+                if row is not None:
+                    entry = CachedArticle(**json.loads(row[0]))
+                    self._store_in_memory(key, entry)
+                    return entry
+            return None
+
+    def is_fresh(self, entry: CachedArticle) -> bool:
+        return time.time() - entry.validated_at <= self.ttl_seconds
+
+    def put(self, key: str, entry: CachedArticle):
+        with self._lock:
+            self._store_in_memory(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO article_cache (url, entry) VALUES (?, ?)",
+                        (key, json.dumps(asdict(entry))),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal menulis cache artikel SQLite: {e}")
+
+    def _store_in_memory(self, key: str, entry: CachedArticle):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._chars -= len(previous.text)
+        self._entries[key] = entry
+        self._chars += len(entry.text)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted.text)
+
+    def record(self, outcome: str):
+        with self._lock:
+            if outcome == "hit":
+                self._hits += 1
+            elif outcome == "revalidated":
+                self._revalidated += 1
+            else:
+                self._misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._revalidated + self._misses
+            return {
+                "entries": len(self._entries),
+                "chars": self._chars,
+                "max_entries": self.max_entries,
+                "max_chars": self.max_chars,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self._db is not None,
+                "hits": self._hits,
+                "revalidated": self._revalidated,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._revalidated) / lookups if lookups else 0.0,
+            }
+
+
+article_cache = ArticleCache(
+    max_entries=settings.ARTICLE_CACHE_MAX_ENTRIES,
+    max_chars=settings.ARTICLE_CACHE_MAX_CHARS,
+    ttl_seconds=settings.ARTICLE_CACHE_TTL_SECONDS,
+    db_path=settings.ARTICLE_CACHE_DB_PATH,
+)
+
+
+async def fetch_article_text(
+    url: str, timer: StageTimer | None = None, emit: ProgressCallback | None = None
+) -> tuple[str | None, str]:
+    """
+    Mengambil teks artikel dari URL, memakai cache jika bisa. Mengembalikan (teks, sumber) dengan
+    sumber "cache", "revalidated" (server menjawab 304), atau "fetched". Melempar FetchError jika
+    halaman gagal diambil. Jika `emit` diisi, event "fetched" dikirim begitu halaman (atau entri
+    cache) tersedia, sebelum ekstraksi teks.
+    """
+    timer = timer or StageTimer()
+    key = canonical_url(url)
+    cached = article_cache.get(key) if settings.ARTICLE_CACHE_ENABLED else None
+
+    if cached is not None and article_cache.is_fresh(cached):
+        article_cache.record("hit")
+        if emit:
+            emit("fetched", {"source": "cache"})
+        return cached.text, "cache"
+
+    conditional_headers = {}
+    if cached is not None:
+        if cached.etag:
+            conditional_headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            conditional_headers["If-Modified-Since"] = cached.last_modified
+
+    with timer.stage("fetch"):
+        page = await http_fetcher.fetch_html(cached.fetched_url if conditional_headers else url, headers=conditional_headers)
+
+    if page.status_code == 304 and cached is not None:
+        cached.validated_at = time.time()
+        article_cache.put(key, cached)
+        article_cache.record("revalidated")
+        logger.info(f"Artikel {key} belum berubah (304), memakai teks dari cache.")
+        if emit:
+            emit("fetched", {"source": "revalidated", "status_code": page.status_code})
+        return cached.text, "revalidated"
+
+    if emit:
+        emit("fetched", {"source": "network", "status_code": page.status_code, "bytes": page.bytes_read, "truncated": page.truncated})
+    with timer.stage("extract"):
+        text = await asyncio.to_thread(extract_text_from_html, page.text, page.url)
+    article_cache.record("miss")
+    if text and settings.ARTICLE_CACHE_ENABLED:
+        article_cache.put(key, CachedArticle(
+            fetched_url=page.url,
+            text=text,
+            etag=page.headers.get("etag"),
+            last_modified=page.headers.get("last-modified"),
+            validated_at=time.time(),
+        ))
+    return text, "fetched"
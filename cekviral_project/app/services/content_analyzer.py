@@ -2,6 +2,7 @@
 from bs4 import BeautifulSoup
 import re
 import os
+import shutil
 import subprocess
 import logging
 import asyncio
@@ -15,8 +16,39 @@ logger = logging.getLogger(__name__)
 # Ganti dengan nama bucket GCS yang sudah dibuat
 GCS_BUCKET_NAME = "cekviral-audio-uploads"
 
-# --- FUNGSI EKSTRAKSI TEKS DARI HTML (MENGGUNAKAN BEAUTIFULSOUP) ---
-def extract_text_from_html(html_content: str) -> str | None:
+# Ekstraktor cepat berbasis selectolax; jika paket tidak terpasang, BeautifulSoup yang dipakai
+try:
+    from app.services.html_extractor import extract_article_text
+except ImportError:
+    extract_article_text = None
+
+
+# --- FUNGSI EKSTRAKSI TEKS DARI HTML ---
+def extract_text_from_html(html_content: str, url: str | None = None) -> str | None:
+    """
+    Mengekstrak judul + teks utama dari konten HTML. Secara default memakai ekstraktor selectolax
+    (satu kali penilaian paragraf, dengan petunjuk selector per domain dari `url`); kembali ke
+    BeautifulSoup jika selectolax tidak tersedia, dimatikan lewat settings.HTML_EXTRACTOR, atau gagal.
+    """
+    if not html_content or not isinstance(html_content, str):
+        logger.warning("Input html_content untuk extract_text_from_html kosong atau bukan string.")
+        return None
+
+    if extract_article_text is not None and settings.HTML_EXTRACTOR != "beautifulsoup":
+        try:
+            final_text = extract_article_text(html_content, url)
+            if final_text:
+                logger.debug(f"Extracted text length: {len(final_text)}")
+                return final_text
+            logger.warning("No significant text could be extracted from HTML.")
+            return None
+        except Exception as e:
+            logger.error(f"Ekstraktor selectolax gagal, beralih ke BeautifulSoup: {e}", exc_info=True)
+
+    return extract_text_from_html_bs4(html_content)
+
+
+def extract_text_from_html_bs4(html_content: str) -> str | None:
     """
     Mengekstrak teks utama dari konten HTML menggunakan BeautifulSoup.
     """
@@ -77,88 +109,176 @@ def extract_text_from_html(html_content: str) -> str | None:
 
 
 # --- FUNGSI TRANSKRIPSI VIDEO (MENGGUNAKAN GOOGLE CLOUD API) ---
-async def convert_video_to_text(video_url: str) -> str | None:
-    """
-    Mengunduh audio dari URL video, mengonversinya ke format mono, mengunggahnya ke GCS, 
-    dan mentranskripsinya menggunakan Google Cloud Speech-to-Text API.
-    """
-    temp_dir = settings.YDL_TEMP_DIR
-    os.makedirs(temp_dir, exist_ok=True)
-    audio_filename = f"temp_audio_{os.urandom(4).hex()}.wav"
-    local_audio_path = os.path.join(temp_dir, audio_filename)
-    
+class TranscriptionError(Exception):
+    """Kegagalan pada tahap unduh/transkripsi; pesannya ("Maaf, ...") aman ditampilkan ke pengguna."""
+
+
+TOOLS_UNAVAILABLE_MESSAGE = "Maaf, fitur transkripsi suara tidak tersedia karena aplikasi tidak dapat menemukan alat bantu (yt-dlp/ffmpeg)."
+
+# Hasil pemeriksaan yt-dlp/ffmpeg; None berarti belum diperiksa (diisi sekali saat startup)
+transcription_tools_available: bool | None = None
+
+# Format potongan audio: (codec ffmpeg + argumen, ekstensi file, encoding Speech-to-Text)
+AUDIO_CHUNK_FORMATS = {
+    "flac": (["-c:a", "flac"], "flac", speech.RecognitionConfig.AudioEncoding.FLAC),
+    "ogg_opus": (["-c:a", "libopus", "-b:a", "24k"], "ogg", speech.RecognitionConfig.AudioEncoding.OGG_OPUS),
+}
+AUDIO_SAMPLE_RATE_HZ = 16000
+MIN_AUDIO_CHUNK_BYTES = 1024
+
+
+async def check_transcription_tools() -> bool:
+    """Memeriksa sekali apakah yt-dlp dan ffmpeg tersedia; hasilnya disimpan untuk request berikutnya."""
+    global transcription_tools_available
     try:
         logger.info(f"Memeriksa keberadaan yt-dlp dan ffmpeg...")
         await asyncio.to_thread(subprocess.run, ['yt-dlp', '--version'], check=True, capture_output=True, text=True, timeout=10)
         await asyncio.to_thread(subprocess.run, ['ffmpeg', '-version'], check=True, capture_output=True, text=True, timeout=10)
+        transcription_tools_available = True
     except Exception as e:
         logger.error(f"Error saat memeriksa yt-dlp/FFmpeg: {e}")
-        return "Maaf, fitur transkripsi suara tidak tersedia karena aplikasi tidak dapat menemukan alat bantu (yt-dlp/ffmpeg)."
+        transcription_tools_available = False
+    return transcription_tools_available
 
-    transcribed_text = None
-    gcs_uri = None
+
+async def _kill_process(process: asyncio.subprocess.Process):
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+
+
+async def download_audio(video_url: str) -> str:
+    """
+    Mengalirkan audio video dari yt-dlp langsung ke ffmpeg (tanpa file WAV sementara) dan menyimpannya
+    sebagai potongan FLAC/Opus 16 kHz mono di direktori baru dalam YDL_TEMP_DIR. Durasi dibatasi
+    TRANSCRIPTION_MAX_DURATION_SECONDS; sisa video tidak diunduh. Mengembalikan path direktori
+    potongan; pemanggil bertanggung jawab menghapusnya dengan `remove_audio`.
+    """
+    if transcription_tools_available is None:
+        await check_transcription_tools()
+    if not transcription_tools_available:
+        raise TranscriptionError(TOOLS_UNAVAILABLE_MESSAGE)
+
+    codec_args, extension, _ = AUDIO_CHUNK_FORMATS[settings.TRANSCRIPTION_AUDIO_FORMAT]
+    audio_dir = os.path.join(settings.YDL_TEMP_DIR, f"temp_audio_{os.urandom(4).hex()}")
+    os.makedirs(audio_dir, exist_ok=True)
+
+    logger.info(f"Mulai mengalirkan audio dari {video_url} ke potongan {extension} di {audio_dir}")
+    read_fd, write_fd = os.pipe()
+    downloader = converter = None
     try:
-        # 1. Unduh dan konversi audio ke WAV mono
-        logger.info(f"Mulai mengunduh dan mengonversi audio dari {video_url} ke {local_audio_path}")
-        process = await asyncio.to_thread(
-            subprocess.run,
-            [
-                'yt-dlp', '-x', '--audio-format', 'wav', 
-                '--ppa', 'ffmpeg:-ac 1', # Paksa output menjadi mono (1 channel audio)
-                '-o', local_audio_path, video_url
-            ],
-            capture_output=True, text=True, check=False, timeout=900
+        downloader = await asyncio.create_subprocess_exec(
+            'yt-dlp', '-f', 'bestaudio/best', '--no-playlist', '--quiet', '-o', '-', video_url,
+            stdout=write_fd, stderr=asyncio.subprocess.PIPE,
+        )
+        converter = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+            '-vn', '-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE_HZ),
+            '-t', str(settings.TRANSCRIPTION_MAX_DURATION_SECONDS),
+            *codec_args,
+            '-f', 'segment', '-segment_time', str(settings.TRANSCRIPTION_CHUNK_SECONDS), '-reset_timestamps', '1',
+            os.path.join(audio_dir, f"chunk_%03d.{extension}"),
+            stdin=read_fd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
         )
-        if process.returncode != 0:
-            logger.error(f"yt-dlp gagal mengunduh audio. Error: {process.stderr.strip()}")
-            return "Maaf, gagal mengunduh audio dari video tersebut."
+    except BaseException:
+        # Mis. ffmpeg gagal dijalankan setelah yt-dlp sudah berjalan: jangan tinggalkan proses dan direktori
+        for process in (converter, downloader):
+            if process is not None:
+                await _kill_process(process)
+        remove_audio(audio_dir)
+        raise
+    finally:
+        # Ujung pipe sudah diwarisi kedua proses; salinan di proses ini harus ditutup agar EOF sampai ke ffmpeg
+        os.close(read_fd)
+        os.close(write_fd)
 
-        if not os.path.exists(local_audio_path) or os.path.getsize(local_audio_path) == 0:
-            logger.error(f"File audio tidak ditemukan atau kosong: {local_audio_path}.")
-            return "Maaf, audio dari video tidak dapat diunduh."
-        
-        # 2. Upload ke GCS
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(audio_filename)
+    downloader_stderr_task = asyncio.create_task(downloader.stderr.read())
+    try:
+        _, converter_stderr = await asyncio.wait_for(converter.communicate(), timeout=900)
+        # ffmpeg berhenti membaca setelah batas durasi; yt-dlp yang masih mengirim data dihentikan
+        await _kill_process(downloader)
+        downloader_stderr = await downloader_stderr_task
+    except BaseException:
+        await _kill_process(converter)
+        await _kill_process(downloader)
+        downloader_stderr_task.cancel()
+        remove_audio(audio_dir)
+        raise
+
+    # Segmen terakhir bisa hanya berisi header kontainer (tanpa audio); segmen seperti itu dibuang
+    chunks = []
+    for name in sorted(os.listdir(audio_dir)):
+        path = os.path.join(audio_dir, name)
+        if os.path.getsize(path) < MIN_AUDIO_CHUNK_BYTES:
+            os.remove(path)
+        else:
+            chunks.append(name)
+    if converter.returncode != 0 or not chunks:
+        logger.error(
+            f"Gagal mengambil audio. yt-dlp: {downloader_stderr.decode(errors='replace').strip()} "
+            f"ffmpeg: {converter_stderr.decode(errors='replace').strip()}"
+        )
+        remove_audio(audio_dir)
+        raise TranscriptionError("Maaf, gagal mengunduh audio dari video tersebut.")
+
+    logger.info(f"Audio tersimpan sebagai {len(chunks)} potongan di {audio_dir}.")
+    return audio_dir
+
+
+def remove_audio(audio_dir: str):
+    shutil.rmtree(audio_dir, ignore_errors=True)
+
+
+async def _transcribe_chunk(storage_client, speech_client, chunk_path: str, blob_name: str) -> str:
+    """Mengunggah satu potongan audio ke GCS, mentranskripsinya, lalu menghapusnya dari GCS."""
+    _, _, encoding = AUDIO_CHUNK_FORMATS[settings.TRANSCRIPTION_AUDIO_FORMAT]
+    blob = storage_client.bucket(GCS_BUCKET_NAME).blob(blob_name)
+    gcs_uri = None
+    try:
+        await asyncio.to_thread(blob.upload_from_filename, chunk_path)
+        gcs_uri = f"gs://{GCS_BUCKET_NAME}/{blob_name}"
 
-        logger.info(f"Mengunggah {local_audio_path} ke GCS bucket '{GCS_BUCKET_NAME}'...")
-        await asyncio.to_thread(blob.upload_from_filename, local_audio_path)
-        gcs_uri = f"gs://{GCS_BUCKET_NAME}/{audio_filename}"
-        
-        # 3. Kirim request ke Google Speech-to-Text API
-        speech_client = speech.SpeechClient()
         audio = speech.RecognitionAudio(uri=gcs_uri)
         config = speech.RecognitionConfig(
+            encoding=encoding,
+            sample_rate_hertz=AUDIO_SAMPLE_RATE_HZ,
+            audio_channel_count=1,
             language_code="id-ID",
             enable_automatic_punctuation=True
         )
-
-        logger.info("Mengirim request long_running_recognize ke Google API...")
         operation = await asyncio.to_thread(speech_client.long_running_recognize, config=config, audio=audio)
         response = await asyncio.to_thread(operation.result, timeout=900)
-        
-        if response.results:
-            transcribed_text = " ".join([result.alternatives[0].transcript for result in response.results])
-        else:
-            logger.warning(f"Google API tidak mengembalikan hasil untuk {video_url}")
-            return "Maaf, tidak ada obrolan yang dapat dikenali dari audio ini."
-
-    except Exception as e:
-        logger.error(f"Error selama proses transkripsi: {e}", exc_info=True)
-        return "Maaf, terjadi kesalahan pada layanan transkripsi suara."
+        return " ".join(result.alternatives[0].transcript for result in response.results)
     finally:
-        # 4. Bersihkan file temporer di lokal dan GCS
-        if os.path.exists(local_audio_path):
-            os.remove(local_audio_path)
-        
         if gcs_uri:
             try:
-                storage_client = storage.Client()
-                bucket = storage_client.bucket(GCS_BUCKET_NAME)
-                blob = bucket.blob(audio_filename)
-                blob.delete()
+                await asyncio.to_thread(blob.delete)
             except Exception as e:
                 logger.error(f"Gagal membersihkan file dari GCS {gcs_uri}: {e}")
-    
-    return transcribed_text
\ No newline at end of file
+
+
+async def transcribe_audio(audio_dir: str) -> str:
+    """
+    Mentranskripsi semua potongan audio di `audio_dir` dengan Google Cloud Speech-to-Text API.
+    Potongan diunggah dan dikenali secara paralel; teksnya digabung sesuai urutan.
+    File di GCS selalu dihapus setelahnya; file lokal tidak disentuh.
+    """
+    chunk_names = sorted(os.listdir(audio_dir))
+    prefix = os.path.basename(os.path.normpath(audio_dir))
+    try:
+        storage_client = storage.Client()
+        speech_client = speech.SpeechClient()
+        logger.info(f"Mentranskripsi {len(chunk_names)} potongan audio lewat GCS bucket '{GCS_BUCKET_NAME}'...")
+        texts = await asyncio.gather(*[
+            _transcribe_chunk(storage_client, speech_client, os.path.join(audio_dir, name), f"{prefix}_{name}")
+            for name in chunk_names
+        ])
+    except Exception as e:
+        logger.error(f"Error selama proses transkripsi: {e}", exc_info=True)
+        raise TranscriptionError("Maaf, terjadi kesalahan pada layanan transkripsi suara.")
+
+    transcript = " ".join(text for text in texts if text)
+    if not transcript:
+        logger.warning(f"Google API tidak mengembalikan hasil untuk {audio_dir}")
+        raise TranscriptionError("Maaf, tidak ada obrolan yang dapat dikenali dari audio ini.")
+    return transcript
@@ -1,5 +1,12 @@
 # cekviral_project/app/services/database.py
+import asyncio
+import json
 import logging
+import os
+import time
+import uuid
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 from app.core.config import settings
 
@@ -19,39 +26,416 @@ if settings.SUPABASE_URL and settings.SUPABASE_KEY:
 else:
     logger.warning("SUPABASE_URL atau SUPABASE_KEY tidak ditemukan. Fitur database tidak akan aktif.")
 
-async def save_verification_result(result: VerificationResult, user_id: str | None = None) -> str | None:
+def _history_row(result: VerificationResult, user_id: str | None = None) -> dict:
+    """Baris tabel 'history' untuk satu hasil verifikasi."""
+    data_to_insert = {
+        "original_input":        result.original_input,
+        "processed_text":        result.processed_text,
+        "prob_hoax":             result.prediction.probabilities.HOAKS,
+        "prob_fakta":            result.prediction.probabilities.FAKTA,
+        "final_label_threshold": result.prediction.final_label_thresholded,
+        "inference_time_ms":     result.prediction.inference_time_ms,
+        "predicted_label":       result.prediction.predicted_label_model,
+    }
+
+    if user_id:
+        data_to_insert["user_id"] = user_id  # hanya ditambahkan jika user login
+    return data_to_insert
+
+
+def _insert_history_rows(rows: list[dict]) -> list[str | None]:
+    """Insert massal sinkron ke tabel 'history'; mengembalikan history_id per baris sesuai urutan."""
+    if all(row.get("history_id") for row in rows):
+        # history_id dibuat di aplikasi: insert ulang setelah timeout yang sebenarnya sudah ter-commit
+        # tidak boleh gagal karena duplikat, jadi baris yang sudah ada dilewati
+        supabase.table("history").upsert(
+            rows, on_conflict="history_id", ignore_duplicates=True, returning="minimal"
+        ).execute()
+        return [row["history_id"] for row in rows]
+    response = supabase.table("history").insert(rows, returning="representation").execute()
+    # PostgREST mengembalikan baris hasil insert massal sesuai urutan input
+    history_ids = [row.get("history_id") for row in (response.data or [])]
+    if len(history_ids) != len(rows):
+        logger.warning(f"Insert massal mengembalikan {len(history_ids)} ID untuk {len(rows)} baris.")
+        history_ids = (history_ids + [None] * len(rows))[:len(rows)]
+    return history_ids
+
+
+# Kolom tambahan di file spill: jumlah insert gagal yang sudah dialami baris itu (dibuang sebelum insert)
+_SPILL_ATTEMPTS_FIELD = "_spill_attempts"
+
+# SQLSTATE/kode PostgREST yang berarti database sedang tidak bisa melayani (koneksi, sumber daya habis,
+# shutdown, deadlock/serialisasi), bukan baris yang ditolak
+_UNAVAILABLE_ERROR_CODES = ("08", "40", "53", "57", "PGRST00")
+
+
+def _is_unavailable_error(error: Exception) -> bool:
+    """True jika insert gagal karena database/jaringan (layak dicoba ulang), False jika barisnya ditolak."""
+    if isinstance(error, (httpx.TransportError, OSError)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        if len(code) == 3 and code.isdigit():
+            # Respons bukan JSON (mis. dari gateway): kodenya status HTTP, bukan SQLSTATE lima karakter
+            return int(code) >= 500
+        return code.startswith(_UNAVAILABLE_ERROR_CODES)
+    return False
+
+
+class HistoryWriter:
     """
-    Menyimpan hasil verifikasi ke dalam tabel 'history' di Supabase. Jika user login, simpan juga user_id.
+    Penulisan riwayat verifikasi secara write-behind.
+
+    Baris masuk ke antrean berukuran terbatas (jika penuh, pemanggil menunggu) dan sebuah worker
+    menggabungkannya menjadi insert massal: paling banyak `batch_size` baris atau setelah menunggu
+    `flush_interval_ms`. Insert yang gagal karena database tidak dapat dijangkau (galat jaringan/5xx)
+    dicoba ulang dengan backoff; jika tetap gagal, baris ditulis ke file JSONL `spill_path` dan
+    database dianggap tidak tersedia selama `cooldown_seconds` (batch berikutnya langsung ditulis ke
+    file). Isi file dikirim ulang saat startup dan setelah insert berikutnya berhasil. Setiap baris di
+    file spill membawa jumlah insert gagal yang sudah dialaminya; setelah `max_spill_attempts` kali,
+    baris dipindah ke `dead_letter_path` dan tidak dikirim ulang lagi (begitu pula baris file spill
+    yang tidak bisa dibaca). Insert yang ditolak database (mis. foreign key) tidak dicoba ulang: batch
+    dipecah dua sampai baris penyebabnya ketemu, baris itu dipindah ke `dead_letter_path` dan baris
+    lain tetap disimpan.
     """
-    if not supabase:
-        logger.warning("Klien Supabase tidak tersedia. Melewatkan penyimpanan ke database.")
-        return None
 
-    try:
-        data_to_insert = {
-            "original_input":        result.original_input,
-            "processed_text":        result.processed_text,
-            "prob_hoax":             result.prediction.probabilities.HOAKS,
-            "prob_fakta":            result.prediction.probabilities.FAKTA,
-            "final_label_threshold": result.prediction.final_label_thresholded,
-            "inference_time_ms":     result.prediction.inference_time_ms,
-            "predicted_label":       result.prediction.predicted_label_model,
+    def __init__(
+        self,
+        insert_rows_fn,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval_ms: float,
+        max_retries: int,
+        spill_path: str,
+        dead_letter_path: str,
+        max_spill_attempts: int = 5,
+        cooldown_seconds: float = 30.0,
+    ):
+        self._insert_rows_fn = insert_rows_fn
+        self.max_queue_size = max(1, max_queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_ms = max(0.0, flush_interval_ms)
+        self.max_retries = max(0, max_retries)
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self.max_spill_attempts = max(1, max_spill_attempts)
+        self.cooldown_seconds = cooldown_seconds
+
+        self._queue: asyncio.Queue | None = None
+        self._worker_task: asyncio.Task | None = None
+        self._replay_task: asyncio.Task | None = None
+        self._unavailable_until = 0.0
+
+        self._batches_total = 0
+        self._rows_total = 0
+        self._retries_total = 0
+        self._spilled_rows_total = 0
+        self._replayed_rows_total = 0
+        self._dead_letter_rows_total = 0
+        self._rejected_rows_total = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker_task is not None and not self._worker_task.done()
+
+    async def start(self):
+        """Menjalankan worker penulisan dan mengirim ulang baris yang tersimpan di file spill."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_task = asyncio.create_task(self._run())
+        logger.info(
+            f"Penulis riwayat aktif (batch_size={self.batch_size}, flush_interval_ms={self.flush_interval_ms}, "
+            f"max_queue_size={self.max_queue_size})."
+        )
+        self._schedule_replay()
+
+    async def stop(self, timeout: float = 10.0):
+        """Menunggu antrean kosong (paling lama `timeout` detik); sisanya ditulis ke file spill."""
+        if not self.is_running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Antrean riwayat belum kosong saat shutdown; sisa baris ditulis ke file spill.")
+        self._worker_task.cancel()
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+        await asyncio.gather(self._worker_task, return_exceptions=True)
+
+        remaining = []
+        while not self._queue.empty():
+            row, future, attempts = self._queue.get_nowait()
+            remaining.append((row, attempts))
+            if future is not None and not future.done():
+                future.set_result(row.get("history_id"))
+        if remaining:
+            self._spill(remaining)
+        self._worker_task = None
+        logger.info("Penulis riwayat berhenti.")
+
+    async def write(self, rows: list[dict], wait_for_ids: bool) -> list[str | None]:
+        """
+        Memasukkan baris ke antrean. Jika `wait_for_ids`, menunggu insert massal selesai dan
+        mengembalikan history_id dari database (None jika gagal); jika tidak, langsung mengembalikan
+        `history_id` yang sudah ada di baris (dibuat di sisi klien).
+        """
+        if not self.is_running:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in rows:
+            future = loop.create_future() if wait_for_ids else None
+            futures.append(future)
+            await self._queue.put((row, future, 0))
+        if not wait_for_ids:
+            return [row.get("history_id") for row in rows]
+        return list(await asyncio.gather(*futures))
+
+    async def _collect_batch(self) -> list[tuple]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval_ms / 1000
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Error tak terduga pada penulis riwayat: {e}", exc_info=True)
+                self._resolve(batch, [None] * len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[tuple]):
+        rows = [row for row, _, _ in batch]
+        if time.monotonic() < self._unavailable_until:
+            # Belum dicoba, jadi jumlah percobaan tidak bertambah
+            self._spill([(row, attempts) for row, _, attempts in batch])
+            self._resolve(batch, [row.get("history_id") for row in rows])
+            return
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                history_ids = await asyncio.to_thread(self._insert_rows_fn, rows)
+            except Exception as e:
+                if not _is_unavailable_error(e):
+                    await self._isolate_rejected(batch, e)
+                    return
+                logger.warning(f"Insert riwayat gagal (percobaan {attempt + 1}/{self.max_retries + 1}): {e}")
+                if attempt < self.max_retries:
+                    self._retries_total += 1
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            self._inserted(batch, history_ids)
+            return
+
+        self._mark_unavailable(batch)
+
+    async def _isolate_rejected(self, batch: list[tuple], error: Exception):
+        """Memecah batch yang ditolak database menjadi dua sampai baris penyebabnya ketemu."""
+        if len(batch) == 1:
+            row, _, attempts = batch[0]
+            logger.error(f"Baris riwayat ditolak database ({error}); dipindah ke {self.dead_letter_path}.")
+            self._dead_letter([json.dumps({**row, _SPILL_ATTEMPTS_FIELD: attempts + 1}, ensure_ascii=False) + "\n"])
+            self._rejected_rows_total += 1
+            self._resolve(batch, [None])
+            return
+
+        logger.warning(f"Insert {len(batch)} baris riwayat ditolak database ({error}); batch dipecah.")
+        middle = len(batch) // 2
+        for part in (batch[:middle], batch[middle:]):
+            if time.monotonic() < self._unavailable_until:
+                self._spill([(row, attempts) for row, _, attempts in part])
+                self._resolve(part, [row.get("history_id") for row, _, _ in part])
+                continue
+            try:
+                history_ids = await asyncio.to_thread(self._insert_rows_fn, [row for row, _, _ in part])
+            except Exception as e:
+                if _is_unavailable_error(e):
+                    self._mark_unavailable(part)
+                else:
+                    await self._isolate_rejected(part, e)
+                continue
+            self._inserted(part, history_ids)
+
+    def _inserted(self, batch: list[tuple], history_ids: list[str | None]):
+        self._batches_total += 1
+        self._rows_total += len(batch)
+        self._resolve(batch, history_ids)
+        if self._unavailable_until:
+            # Database kembali tersedia: kirim ulang baris yang sempat ditulis ke file
+            self._unavailable_until = 0.0
+            self._schedule_replay()
+
+    def _mark_unavailable(self, batch: list[tuple]):
+        logger.error(f"Database tidak dapat dijangkau; {len(batch)} baris riwayat ditulis ke {self.spill_path}.")
+        self._spill([(row, attempts + 1) for row, _, attempts in batch])
+        self._unavailable_until = time.monotonic() + self.cooldown_seconds
+        self._resolve(batch, [row.get("history_id") for row, _, _ in batch])
+
+    @staticmethod
+    def _resolve(batch: list[tuple], history_ids: list[str | None]):
+        for (_, future, _), history_id in zip(batch, history_ids):
+            if future is not None and not future.done():
+                future.set_result(history_id)
+
+    @staticmethod
+    def _append_lines(path: str, lines: list[str]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def _spill(self, entries: list[tuple[dict, int]]):
+        """Menulis (baris, jumlah insert gagal) ke file spill, atau ke dead-letter jika sudah terlalu sering gagal."""
+        spill_lines, dead_lines = [], []
+        for row, attempts in entries:
+            line = json.dumps({**row, _SPILL_ATTEMPTS_FIELD: attempts}, ensure_ascii=False) + "\n"
+            (dead_lines if attempts >= self.max_spill_attempts else spill_lines).append(line)
+        if spill_lines:
+            try:
+                self._append_lines(self.spill_path, spill_lines)
+                self._spilled_rows_total += len(spill_lines)
+            except OSError as e:
+                logger.error(f"Gagal menulis {len(spill_lines)} baris riwayat ke file spill {self.spill_path}: {e}")
+        if dead_lines:
+            logger.error(
+                f"{len(dead_lines)} baris riwayat gagal disimpan {self.max_spill_attempts} kali; "
+                f"dipindah ke {self.dead_letter_path}."
+            )
+            self._dead_letter(dead_lines)
+
+    def _dead_letter(self, lines: list[str]):
+        try:
+            self._append_lines(self.dead_letter_path, lines)
+            self._dead_letter_rows_total += len(lines)
+        except OSError as e:
+            logger.error(f"Gagal menulis {len(lines)} baris riwayat ke file dead-letter {self.dead_letter_path}: {e}")
+
+    def _schedule_replay(self):
+        replay_path = f"{self.spill_path}.replay"
+        pending = os.path.exists(self.spill_path) or os.path.exists(replay_path)
+        if pending and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = asyncio.create_task(self._replay())
+
+    async def _replay(self):
+        # File diganti nama dulu agar baris yang gagal lagi ditulis ke file spill baru, bukan dibaca ulang.
+        # File .replay yang tertinggal (mis. proses berhenti di tengah replay) dikirim dulu, tidak ditimpa.
+        replay_path = f"{self.spill_path}.replay"
+        if os.path.exists(replay_path):
+            await self._replay_file(replay_path)
+        if os.path.exists(replay_path) or not os.path.exists(self.spill_path):
+            return
+        try:
+            os.replace(self.spill_path, replay_path)
+        except OSError as e:
+            logger.error(f"Gagal memindahkan file spill riwayat {self.spill_path}: {e}")
+            return
+        await self._replay_file(replay_path)
+
+    async def _replay_file(self, replay_path: str):
+        entries, bad_lines = [], []
+        try:
+            with open(replay_path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                        if not isinstance(row, dict):
+                            raise ValueError("bukan objek JSON")
+                    except ValueError as e:
+                        logger.warning(f"Baris {line_number} file spill riwayat {replay_path} rusak dan dilewati: {e}")
+                        bad_lines.append(line if line.endswith("\n") else line + "\n")
+                        continue
+                    entries.append((row, row.pop(_SPILL_ATTEMPTS_FIELD, 0)))
+        except OSError as e:
+            logger.error(f"Gagal membaca file spill riwayat {replay_path}: {e}")
+            return
+        if bad_lines:
+            self._dead_letter(bad_lines)
+        logger.info(f"Mengirim ulang {len(entries)} baris riwayat dari file spill.")
+        for row, attempts in entries:
+            await self._queue.put((row, None, attempts))
+        self._replayed_rows_total += len(entries)
+        os.remove(replay_path)
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.HISTORY_WRITE_MODE,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "batches_total": self._batches_total,
+            "rows_total": self._rows_total,
+            "avg_batch_size": self._rows_total / self._batches_total if self._batches_total else 0.0,
+            "retries_total": self._retries_total,
+            "spilled_rows_total": self._spilled_rows_total,
+            "replayed_rows_total": self._replayed_rows_total,
+            "dead_letter_rows_total": self._dead_letter_rows_total,
+            "rejected_rows_total": self._rejected_rows_total,
+            "database_unavailable": time.monotonic() < self._unavailable_until,
         }
 
-        if user_id:
-            data_to_insert["user_id"] = user_id  # hanya ditambahkan jika user login
 
-        logger.info(f"Menyimpan hasil verifikasi ke Supabase: {data_to_insert}")
-        response = supabase.table("history").insert(data_to_insert, returning="representation").execute()
+history_writer = HistoryWriter(
+    _insert_history_rows,
+    max_queue_size=settings.HISTORY_QUEUE_MAX_SIZE,
+    batch_size=settings.HISTORY_BATCH_SIZE,
+    flush_interval_ms=settings.HISTORY_FLUSH_INTERVAL_MS,
+    max_retries=settings.HISTORY_WRITE_MAX_RETRIES,
+    spill_path=settings.HISTORY_SPILL_PATH,
+    dead_letter_path=settings.HISTORY_DEAD_LETTER_PATH,
+    max_spill_attempts=settings.HISTORY_SPILL_MAX_ATTEMPTS,
+)
 
-        if response.data and len(response.data) > 0:
-            history_id = response.data[0].get("history_id")
-            logger.info(f"Data berhasil disimpan ke Supabase dengan ID: {history_id}")
-            return history_id
-        else:
-            logger.warning("Data berhasil disimpan tetapi tidak ada ID yang dikembalikan.")
-            return None
 
+async def save_verification_results(results: list[VerificationResult], user_id: str | None = None) -> list[str | None]:
+    """
+    Menyimpan hasil verifikasi ke tabel 'history' di Supabase. Jika user login, simpan juga user_id.
+    Mengembalikan history_id per hasil sesuai urutan input (None jika gagal). Cara penulisan
+    mengikuti settings.HISTORY_WRITE_MODE:
+    - "inline": satu insert massal langsung (di worker thread) untuk hasil-hasil ini;
+    - "batched": lewat penulis write-behind, digabung dengan request lain; menunggu ID dari database;
+    - "client_id": history_id (UUID) dibuat di sini dan langsung dikembalikan tanpa menunggu insert.
+    """
+    if not results:
+        return []
+    if not supabase:
+        logger.warning("Klien Supabase tidak tersedia. Melewatkan penyimpanan ke database.")
+        return [None] * len(results)
+
+    rows = [_history_row(result, user_id) for result in results]
+    if settings.HISTORY_WRITE_MODE == "client_id":
+        for row in rows:
+            row["history_id"] = str(uuid.uuid4())
+        return await history_writer.write(rows, wait_for_ids=False)
+    if settings.HISTORY_WRITE_MODE == "batched":
+        return await history_writer.write(rows, wait_for_ids=True)
+
+    try:
+        logger.info(f"Menyimpan {len(rows)} hasil verifikasi ke Supabase.")
+        return await asyncio.to_thread(_insert_history_rows, rows)
     except Exception as e:
         logger.error(f"Gagal menyimpan data ke Supabase: {e}", exc_info=True)
-        return None
\ No newline at end of file
+        return [None] * len(results)
+
+
+async def save_verification_result(result: VerificationResult, user_id: str | None = None) -> str | None:
+    """
+    Menyimpan satu hasil verifikasi ke dalam tabel 'history' di Supabase (lihat save_verification_results).
+    """
+    history_ids = await save_verification_results([result], user_id=user_id)
+    history_id = history_ids[0]
+    if history_id:
+        logger.info(f"Data disimpan ke Supabase dengan ID: {history_id}")
+    return history_id
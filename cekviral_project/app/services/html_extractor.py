@@ -0,0 +1,163 @@
+# cekviral_project/app/services/html_extractor.py
+"""
+Ekstraksi teks utama artikel dengan parser HTML berbasis C (selectolax/Lexbor).
+
+Alih-alih mencoba puluhan selector satu per satu, setiap paragraf dibaca sekali dan skornya
+ditambahkan ke elemen induk dan kakeknya; elemen dengan skor tertinggi (setelah dikoreksi oleh
+kepadatan link dan petunjuk class/id) dianggap isi artikel. Untuk media yang paling sering dicek,
+routing URL (helpers.route_url) memilih plugin yang langsung mengambil isi dari selector yang
+sudah diketahui dan membuang sisipan khas media tersebut, tanpa penilaian seluruh halaman.
+Hasilnya mengikuti kontrak `extract_text_from_html`: judul halaman + teks isi, spasi dirapikan.
+"""
+import logging
+import re
+from dataclasses import dataclass
+
+from selectolax.lexbor import LexborHTMLParser
+
+from app.utils.helpers import route_url
+
+logger = logging.getLogger(__name__)
+
+# Tag yang tidak pernah berisi teks artikel (sama dengan daftar pada ekstraktor BeautifulSoup)
+REMOVED_TAGS = [
+    "script", "style", "nav", "header", "footer", "aside", "form", "button",
+    "iframe", "img", "svg", "figcaption", "figure", "noscript",
+]
+
+@dataclass(frozen=True)
+class ExtractorPlugin:
+    """
+    Ekstraktor khusus satu media: isi artikel langsung diambil dari `content_selector`, elemen
+    `junk_selectors` di dalamnya dibuang, lalu paragraf yang cocok dengan JUNK_PARAGRAPH_PATTERN
+    (atau `junk_pattern` khusus media) dilewati. Tidak ada penilaian paragraf untuk seluruh halaman.
+    """
+    name: str
+    content_selector: str
+    junk_selectors: tuple[str, ...] = ()
+    junk_pattern: re.Pattern | None = None
+
+
+# Paragraf sisipan yang bukan isi berita ("Baca juga: ...", iklan, kredit redaksi)
+JUNK_PARAGRAPH_PATTERN = re.compile(
+    r"^(baca juga|baca selengkapnya|baca:|lihat juga|simak juga|simak video|advertisement|"
+    r"scroll to continue|pewarta\s*:|editor\s*:|copyright)",
+    re.IGNORECASE,
+)
+
+# Plugin per nama ekstraktor; host -> nama ekstraktor ada di helpers.ARTICLE_EXTRACTORS
+EXTRACTOR_PLUGINS = {
+    plugin.name: plugin for plugin in (
+        ExtractorPlugin("detik", "div.detail__body-text", (".lihatjg", ".linksisip", ".parallaxindetail", ".detail__body-tag")),
+        ExtractorPlugin("kompas", "div.read__content", (".inner-link-baca-juga", ".ads-on-body", ".kompasidRec")),
+        ExtractorPlugin("tribun", "div.txt-article", (".baca-juga", ".ads-placeholder", ".twitter-tweet"),
+                        re.compile(r"^(\(tribunnews\.com|artikel ini telah tayang)", re.IGNORECASE)),
+        ExtractorPlugin("antaranews", "div.wrap__article-detail-content", (".baca-juga", ".text-muted", ".adsbygoogle")),
+        ExtractorPlugin("turnbackhoax", "div.entry-content", (".sharedaddy", ".jp-relatedposts", ".wpcnt"),
+                        re.compile(r"^(=+|referensi\s*:|sumber\s*:)", re.IGNORECASE)),
+        ExtractorPlugin("cnnindonesia", "div.detail-text", (".linksisip", ".paradetail")),
+        ExtractorPlugin("liputan6", "div.article-content-body__item-content", (".baca-juga-collections",)),
+        ExtractorPlugin("kumparan", "div[data-qa-id='story-content']"),
+        ExtractorPlugin("tempo", "div.detail-konten", (".bacajuga",)),
+        ExtractorPlugin("okezone", "div#contentx", (".baca-juga",)),
+    )
+}
+
+PARAGRAPH_SELECTOR = "p, pre, blockquote, td"
+MIN_PARAGRAPH_CHARS = 25
+
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|post|read|detail|story|text|isi|berita", re.IGNORECASE)
+NEGATIVE_HINTS = re.compile(
+    r"comment|komentar|sidebar|footer|related|terkait|rekomendasi|promo|iklan|ads?[-_]|share|social|menu|widget|banner",
+    re.IGNORECASE,
+)
+
+
+def _class_weight(node) -> float:
+    attributes = node.attributes
+    names = f"{attributes.get('class') or ''} {attributes.get('id') or ''} {attributes.get('itemprop') or ''}"
+    weight = 1.0
+    if POSITIVE_HINTS.search(names):
+        weight *= 1.25
+    if NEGATIVE_HINTS.search(names):
+        weight *= 0.25
+    return weight
+
+
+def _link_density(node, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_chars = sum(len(link.text(strip=True)) for link in node.css("a"))
+    return min(1.0, link_chars / text_length)
+
+
+def _best_candidate(tree):
+    """Satu kali jalan atas paragraf; skor dialirkan ke induk (penuh) dan kakek (separuh)."""
+    scores: dict[int, list] = {}
+    for paragraph in tree.css(PARAGRAPH_SELECTOR):
+        text = paragraph.text(strip=True)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1.0 + text.count(",") + min(len(text) / 100, 3.0)
+        parent = paragraph.parent
+        for ancestor, share in ((parent, 1.0), (parent.parent if parent is not None else None, 0.5)):
+            if ancestor is None or ancestor.tag in ("html", "-undef"):
+                continue
+            entry = scores.get(ancestor.mem_id)
+            if entry is None:
+                entry = scores[ancestor.mem_id] = [ancestor, 0.0]
+            entry[1] += score * share
+
+    best_node, best_score = None, 0.0
+    for node, score in scores.values():
+        text_length = len(node.text(strip=True))
+        adjusted = score * _class_weight(node) * (1.0 - _link_density(node, text_length))
+        if adjusted > best_score:
+            best_node, best_score = node, adjusted
+    return best_node
+
+
+def _extract_with_plugin(tree, plugin: ExtractorPlugin) -> str | None:
+    """Teks isi artikel lewat plugin media; None jika selector isi tidak ada di halaman."""
+    node = tree.css_first(plugin.content_selector)
+    if node is None:
+        return None
+    node.strip_tags(REMOVED_TAGS)
+    for selector in plugin.junk_selectors:
+        for junk in node.css(selector):
+            junk.decompose()
+
+    body_text = node.text(separator=" ", strip=True)
+    paragraphs = [paragraph.text(separator=" ", strip=True) for paragraph in node.css("p")]
+    # Sebagian halaman menulis isi dengan <br>, bukan <p>; jika paragraf tidak mewakili isi, pakai teks node
+    if sum(len(text) for text in paragraphs) < len(body_text) / 2:
+        return body_text
+    return " ".join(
+        text for text in paragraphs
+        if text
+        and not JUNK_PARAGRAPH_PATTERN.match(text)
+        and not (plugin.junk_pattern is not None and plugin.junk_pattern.match(text))
+    )
+
+
+def extract_article_text(html_content: str, url: str | None = None) -> str | None:
+    """Judul + teks isi artikel; None jika tidak ada teks yang berarti."""
+    tree = LexborHTMLParser(html_content)
+
+    title_node = tree.css_first("title")
+    page_title = title_node.text(strip=True) if title_node else ""
+
+    body_text = None
+    plugin = EXTRACTOR_PLUGINS.get(route_url(url).extractor) if url else None
+    if plugin is not None:
+        body_text = _extract_with_plugin(tree, plugin)
+        if body_text is None:
+            logger.debug(f"Selector {plugin.content_selector} ({plugin.name}) tidak ditemukan, beralih ke penilaian paragraf.")
+
+    if body_text is None:
+        tree.strip_tags(REMOVED_TAGS)
+        target = _best_candidate(tree) or tree.body
+        body_text = target.text(separator=" ", strip=True) if target is not None else ""
+
+    final_text = re.sub(r"\s+", " ", " ".join(part for part in (page_title, body_text) if part)).strip()
+    return final_text or None
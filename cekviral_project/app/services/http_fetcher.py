@@ -0,0 +1,190 @@
+# cekviral_project/app/services/http_fetcher.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Content-Type yang dianggap halaman HTML
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; CekViralBot/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1",
+    "Accept-Language": "id-ID,id;q=0.9,en;q=0.5",
+}
+
+
+class FetchError(Exception):
+    """Halaman tidak dapat diambil atau bukan HTML; pesannya aman ditampilkan ke pengguna."""
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    status_code: int
+    text: str
+    headers: dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+    bytes_read: int = 0
+
+
+@dataclass
+class _HostSlot:
+    semaphore: asyncio.Semaphore
+    # Request yang sedang memegang atau menunggu semaphore ini
+    users: int = 0
+
+
+class HttpFetcher:
+    """
+    Klien HTTP asinkron bersama untuk mengambil halaman artikel.
+
+    Satu `httpx.AsyncClient` dipakai ulang selama aplikasi hidup (connection pooling, HTTP/2 jika
+    server mendukung). Jumlah koneksi per host dibatasi semaphore; semaphore host dibuang begitu
+    tidak ada request yang memegang atau menunggunya, jadi jumlahnya tidak tumbuh mengikuti
+    banyaknya host berbeda yang pernah diambil. Body dibaca secara streaming dan
+    berhenti begitu `max_bytes` tercapai; respons yang bukan HTML ditolak sebelum body dibaca.
+    Timeout connect dan read terpisah, ditambah batas waktu total agar server yang mengirim data
+    sangat lambat tidak menahan request terlalu lama.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        connect_timeout: float,
+        read_timeout: float,
+        total_timeout: float,
+        max_connections: int,
+        max_connections_per_host: int,
+    ):
+        self.max_bytes = max_bytes
+        self.total_timeout = total_timeout
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self._timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=read_timeout, pool=connect_timeout)
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, _HostSlot] = {}
+
+    async def start(self):
+        """Membuat klien HTTP bersama. Dipanggil sekali saat startup aplikasi."""
+        if self._client is not None:
+            return
+        try:
+            import h2  # noqa: F401  (httpx membutuhkan paket h2 untuk HTTP/2)
+            http2 = True
+        except ImportError:
+            http2 = False
+            logger.warning("Paket h2 tidak terpasang. Fetcher HTTP berjalan tanpa HTTP/2.")
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=self._timeout,
+            limits=self._limits,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            max_redirects=5,
+        )
+        logger.info(
+            f"Fetcher HTTP aktif (http2={http2}, max_bytes={self.max_bytes}, "
+            f"per_host={self.max_connections_per_host}, total_timeout={self.total_timeout}s)."
+        )
+
+    async def stop(self):
+        """Menutup semua koneksi yang masih terbuka."""
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        self._host_slots.clear()
+        logger.info("Fetcher HTTP ditutup.")
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        """Memegang satu slot koneksi untuk host `url`; semaphore host dibuang saat tidak dipakai lagi."""
+        host = (urlsplit(url).hostname or "").lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = _HostSlot(asyncio.Semaphore(self.max_connections_per_host))
+        slot.users += 1
+        try:
+            async with slot.semaphore:
+                yield
+        finally:
+            slot.users -= 1
+            if slot.users == 0 and self._host_slots.get(host) is slot:
+                del self._host_slots[host]
+
+    async def fetch_html(self, url: str, headers: dict[str, str] | None = None) -> FetchedPage:
+        """
+        Mengambil halaman HTML. Melempar FetchError jika gagal, status bukan 2xx/304, atau bukan HTML.
+        Respons 304 (untuk request kondisional) dikembalikan dengan `text` kosong.
+        """
+        if self._client is None:
+            # Tanpa startup aplikasi (mis. saat skrip), klien dibuat saat pertama kali dipakai
+            await self.start()
+        try:
+            async with self._host_slot(url):
+                return await asyncio.wait_for(self._fetch(url, headers or {}), timeout=self.total_timeout)
+        except asyncio.TimeoutError:
+            raise FetchError("Server terlalu lama merespons.")
+        except httpx.TimeoutException:
+            raise FetchError("Koneksi ke server melebihi batas waktu.")
+        except httpx.HTTPError as e:
+            logger.warning(f"Gagal mengambil {url}: {e!r}")
+            raise FetchError("Gagal terhubung ke alamat URL.")
+
+    async def _fetch(self, url: str, headers: dict[str, str]) -> FetchedPage:
+        async with self._client.stream("GET", url, headers=headers) as response:
+            response_headers = {key.lower(): value for key, value in response.headers.items()}
+            if response.status_code == 304:
+                return FetchedPage(url=str(response.url), status_code=304, text="", headers=response_headers)
+            if not response.is_success:
+                raise FetchError(f"Server mengembalikan status {response.status_code}.")
+
+            content_type = response_headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                raise FetchError(f"URL bukan halaman HTML (Content-Type: {content_type}).")
+
+            chunks = []
+            bytes_read = 0
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                bytes_read += len(chunk)
+                if bytes_read >= self.max_bytes:
+                    truncated = True
+                    break
+            body = b"".join(chunks)[:self.max_bytes]
+            if truncated:
+                logger.warning(f"Body {url} dipotong pada {self.max_bytes} byte.")
+
+            encoding = response.charset_encoding or "utf-8"
+            try:
+                text = body.decode(encoding, errors="replace")
+            except LookupError:
+                text = body.decode("utf-8", errors="replace")
+            return FetchedPage(
+                url=str(response.url),
+                status_code=response.status_code,
+                text=text,
+                headers=response_headers,
+                truncated=truncated,
+                bytes_read=len(body),
+            )
+
+
+# Fetcher bersama untuk semua request /verify
+http_fetcher = HttpFetcher(
+    max_bytes=settings.FETCH_MAX_BYTES,
+    connect_timeout=settings.FETCH_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.FETCH_READ_TIMEOUT_SECONDS,
+    total_timeout=settings.FETCH_TOTAL_TIMEOUT_SECONDS,
+    max_connections=settings.FETCH_MAX_CONNECTIONS,
+    max_connections_per_host=settings.FETCH_MAX_CONNECTIONS_PER_HOST,
+)
@@ -0,0 +1,172 @@
+# cekviral_project/app/services/inference_batcher.py
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBatcher:
+    """
+    Lapisan micro-batching asinkron di depan model TFLite.
+
+    Request yang datang bersamaan dikumpulkan paling lama `max_wait_ms` milidetik
+    atau sampai `max_batch_size` item, lalu diprediksi dengan satu kali pemanggilan
+    `predict_batch_fn` di worker thread. Setiap pemanggil menerima hasilnya sendiri.
+    Paling banyak `max_concurrent_batches` batch berjalan bersamaan (sesuai ukuran pool interpreter).
+    """
+
+    def __init__(
+        self,
+        predict_batch_fn: Callable[[list[str]], list[dict]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_concurrent_batches: int = 1,
+    ):
+        self._predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._queue: asyncio.Queue | None = None
+        self._worker_task: asyncio.Task | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+        # Metrik batching
+        self._batches_total = 0
+        self._items_total = 0
+        self._batch_size_counts: Counter = Counter()
+        self._queue_wait_ms: deque = deque(maxlen=1024)
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker_task is not None and not self._worker_task.done()
+
+    async def start(self):
+        """Menjalankan worker batching. Dipanggil sekali saat startup aplikasi."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker_task = asyncio.create_task(self._run())
+        logger.info(
+            f"Inference batcher aktif (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms}, "
+            f"max_concurrent_batches={self.max_concurrent_batches})."
+        )
+
+    async def stop(self):
+        """Menghentikan worker dan menggagalkan request yang masih mengantre."""
+        if self._worker_task is None:
+            return
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+        self._worker_task = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference batcher dihentikan."))
+        logger.info("Inference batcher dihentikan.")
+
+    async def submit(self, text: str) -> dict:
+        """Mengantrekan satu teks dan menunggu hasil prediksinya."""
+        if not self.is_running:
+            # Tanpa worker (mis. saat skrip atau test), prediksi langsung dengan batch berisi satu teks.
+            results = await asyncio.to_thread(self._predict_batch_fn, [text])
+            return results[0]
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> list[tuple]:
+        """Mengambil satu batch dari antrean sesuai batas ukuran dan jendela tunggu."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            # Slot diambil sebelum batch dikumpulkan: selama semua slot sibuk, antrean terus
+            # terisi sehingga batch berikutnya otomatis lebih besar.
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._on_dispatch_done)
+
+    def _on_dispatch_done(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, batch: list[tuple]):
+        dispatched_at = time.perf_counter()
+        texts = [text for text, _, _ in batch]
+        self._record_batch(len(batch), [(dispatched_at - enqueued_at) * 1000 for _, _, enqueued_at in batch])
+
+        try:
+            results = await asyncio.to_thread(self._predict_batch_fn, texts)
+        except Exception as e:
+            logger.error(f"Batch inferensi gagal: {e}", exc_info=True)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record_batch(self, batch_size: int, queue_waits_ms: list[float]):
+        self._batches_total += 1
+        self._items_total += batch_size
+        self._batch_size_counts[batch_size] += 1
+        self._queue_wait_ms.extend(queue_waits_ms)
+        logger.debug(f"Menjalankan batch inferensi berukuran {batch_size}.")
+
+    def stats(self) -> dict:
+        """Ringkasan metrik ukuran batch dan waktu tunggu antrean."""
+        waits = sorted(self._queue_wait_ms)
+
+        def percentile(q: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(q * len(waits)))]
+
+        return {
+            "running": self.is_running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "inflight_batches": len(self._inflight),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_total": self._batches_total,
+            "items_total": self._items_total,
+            "avg_batch_size": self._items_total / self._batches_total if self._batches_total else 0.0,
+            "batch_size_counts": dict(sorted(self._batch_size_counts.items())),
+            "queue_wait_ms": {
+                "p50": percentile(0.50),
+                "p99": percentile(0.99),
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
@@ -0,0 +1,254 @@
+# cekviral_project/app/services/interpreter_pool.py
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Urutan input model IndoBERT TFLite sesuai `get_input_details()`
+ENCODED_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+# Bucket ukuran batch bawaan; batch dipad sampai bucket terkecil yang memuatnya
+DEFAULT_BATCH_BUCKETS = [1, 4, 16]
+# Jumlah interpreter batch > 1 yang boleh hidup bersamaan per slot (semua bucket panjang sekuens)
+DEFAULT_MAX_BATCH_INTERPRETERS = 3
+
+
+class ShapedInterpreter:
+    """
+    Satu interpreter TFLite yang tensor inputnya dialokasikan sekali untuk bentuk tetap
+    [batch_size, sequence_length]. Batch yang lebih kecil dipad dengan baris kosong sehingga
+    `allocate_tensors()` tidak pernah dipanggil lagi setelah inisialisasi.
+    """
+
+    def __init__(self, interpreter, sequence_length: int, batch_size: int = 1):
+        self.interpreter = interpreter
+        self.sequence_length = sequence_length
+        self.batch_size = batch_size
+        self.invokes_total = 0
+        for detail in self.interpreter.get_input_details():
+            self.interpreter.resize_tensor_input(detail['index'], [batch_size, sequence_length])
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+    def run(self, input_tensors: list):
+        """Mengisi tensor input sesuai urutan `input_details`, menjalankan invoke, dan mengembalikan logits."""
+        for detail, tensor in zip(self.input_details, input_tensors):
+            self.interpreter.set_tensor(detail['index'], tensor)
+        self.interpreter.invoke()
+        self.invokes_total += 1
+        return self.interpreter.get_tensor(self.output_details[0]['index'])
+
+    def run_encoded(self, encoded_rows: list[dict], pad_token_id: int = 0):
+        """
+        Menulis token setiap baris (dict berisi input_ids, attention_mask, token_type_ids yang belum
+        dipad) langsung ke buffer tensor input interpreter, lalu menjalankan invoke. Padding token
+        dan baris pengisi sampai `batch_size` dilakukan di buffer itu sendiri sehingga tidak ada
+        array perantara per batch. Mengembalikan logits untuk `encoded_rows` saja.
+        """
+        if len(encoded_rows) > self.batch_size:
+            raise ValueError(f"{len(encoded_rows)} baris melebihi ukuran batch interpreter ({self.batch_size}).")
+        for detail, name in zip(self.input_details, ENCODED_INPUT_NAMES):
+            # View buffer tidak boleh disimpan melewati invoke(), jadi dibuat ulang setiap kali
+            buffer = self.interpreter.tensor(detail['index'])()
+            buffer.fill(pad_token_id if name == 'input_ids' else 0)
+            for row, encoded in enumerate(encoded_rows):
+                values = encoded[name]
+                buffer[row, :len(values)] = values
+            del buffer
+        self.interpreter.invoke()
+        self.invokes_total += 1
+        return self.interpreter.get_tensor(self.output_details[0]['index'])[:len(encoded_rows)]
+
+
+class PooledInterpreter:
+    """
+    Satu slot pool: satu `ShapedInterpreter` untuk setiap pasangan bucket panjang sekuens dan
+    bucket ukuran batch. Interpreter batch 1 dibuat saat inisialisasi (sekaligus memeriksa bucket
+    panjang mana yang didukung model); bucket batch lain dibuat saat pertama kali dipakai.
+
+    Setiap ShapedInterpreter adalah instance interpreter penuh dari `interpreter_factory()`: selain
+    tensor kerjanya sendiri, delegate (mis. XNNPACK) menyimpan salinan bobot yang sudah dikemas ulang
+    per instance (ukur dengan benchmarks/bench_runtime_footprint.py). Karena itu paling banyak
+    `max_batch_interpreters` interpreter batch > 1 dipertahankan per slot; yang paling lama tidak
+    dipakai dibuang saat bucket baru dibutuhkan (dan dibuat ulang jika dipakai lagi).
+    Slot ini hanya boleh dipakai oleh satu thread dalam satu waktu (lihat `InterpreterPool.checkout`).
+    """
+
+    def __init__(
+        self, interpreter_factory: Callable[[], object], sequence_lengths: list[int], batch_sizes: list[int],
+        max_batch_interpreters: int = DEFAULT_MAX_BATCH_INTERPRETERS,
+    ):
+        self._interpreter_factory = interpreter_factory
+        self.batch_sizes = sorted(set(batch_sizes) | {1})
+        self.max_batch_interpreters = max(1, max_batch_interpreters)
+        self.buckets: dict[int, dict[int, ShapedInterpreter]] = {}
+        # Urutan pemakaian interpreter batch > 1, dan jumlah invoke interpreter yang sudah dibuang
+        self._batch_lru: OrderedDict[tuple[int, int], None] = OrderedDict()
+        self.evicted_invokes: dict[tuple[int, int], int] = {}
+        self.evictions_total = 0
+        for sequence_length in sorted(set(sequence_lengths)):
+            try:
+                self.buckets[sequence_length] = {1: ShapedInterpreter(interpreter_factory(), sequence_length)}
+            except Exception as e:
+                # Model yang dikonversi dengan shape statis tidak bisa di-resize ke panjang lain
+                logger.warning(f"Bucket panjang sekuens {sequence_length} tidak didukung model, dilewati: {e}")
+        if not self.buckets:
+            raise RuntimeError("Tidak ada bucket panjang sekuens yang dapat dipakai oleh model.")
+        self.sequence_lengths = sorted(self.buckets)
+
+    def batch_bucket_for(self, batch_size: int) -> int:
+        """Bucket batch terkecil yang memuat `batch_size` baris; bucket terbesar jika tidak ada yang cukup."""
+        index = bisect.bisect_left(self.batch_sizes, batch_size)
+        return self.batch_sizes[min(index, len(self.batch_sizes) - 1)]
+
+    def interpreter_for(self, sequence_length: int, batch_size: int = 1) -> ShapedInterpreter:
+        by_batch = self.buckets[sequence_length]
+        batch_bucket = self.batch_bucket_for(batch_size)
+        shaped = by_batch.get(batch_bucket)
+        if batch_bucket == 1:
+            return shaped
+        key = (sequence_length, batch_bucket)
+        if shaped is None:
+            if len(self._batch_lru) >= self.max_batch_interpreters:
+                self._evict(*self._batch_lru.popitem(last=False)[0])
+            shaped = by_batch[batch_bucket] = ShapedInterpreter(
+                self._interpreter_factory(), sequence_length, batch_bucket
+            )
+        self._batch_lru[key] = None
+        self._batch_lru.move_to_end(key)
+        return shaped
+
+    def _evict(self, sequence_length: int, batch_size: int):
+        shaped = self.buckets[sequence_length].pop(batch_size)
+        key = (sequence_length, batch_size)
+        self.evicted_invokes[key] = self.evicted_invokes.get(key, 0) + shaped.invokes_total
+        self.evictions_total += 1
+
+    def run_encoded(self, sequence_length: int, encoded_rows: list[dict], pad_token_id: int = 0) -> list:
+        """
+        Menjalankan semua baris pada bucket panjang `sequence_length`: dipotong per bucket batch
+        terbesar, dan setiap potongan dipad sampai bucket batch terkecil yang memuatnya.
+        """
+        max_batch = self.batch_sizes[-1]
+        logits = []
+        for start in range(0, len(encoded_rows), max_batch):
+            chunk = encoded_rows[start:start + max_batch]
+            logits.extend(self.interpreter_for(sequence_length, len(chunk)).run_encoded(chunk, pad_token_id))
+        return logits
+
+
+class InterpreterPool:
+    """
+    Kumpulan interpreter TFLite yang dapat dipakai paralel secara aman.
+
+    Setiap request meminjam satu slot lewat `checkout()` sehingga `set_tensor`/`invoke`
+    tidak pernah dijalankan bersamaan pada instance yang sama. Jika semua slot sedang
+    dipakai, pool dianggap jenuh: kejadian ini dicatat dan pemanggil menunggu giliran.
+    Setiap slot menyimpan interpreter yang sudah dialokasikan untuk tiap bucket panjang sekuens
+    dan bucket ukuran batch (interpreter batch > 1 dibatasi `max_batch_interpreters` per slot),
+    sehingga input pendek tidak perlu dipad sampai panjang maksimum dan perubahan ukuran batch
+    tidak memicu `allocate_tensors()`.
+    """
+
+    def __init__(
+        self,
+        interpreter_factory: Callable[[], object],
+        size: int,
+        sequence_lengths: list[int],
+        batch_sizes: list[int] = DEFAULT_BATCH_BUCKETS,
+        max_batch_interpreters: int = DEFAULT_MAX_BATCH_INTERPRETERS,
+    ):
+        self.size = max(1, size)
+
+        # Slot pertama menentukan bucket mana yang benar-benar didukung model
+        first = PooledInterpreter(interpreter_factory, sequence_lengths, batch_sizes, max_batch_interpreters)
+        self.sequence_lengths = first.sequence_lengths
+        self.batch_sizes = first.batch_sizes
+        self.max_batch_interpreters = first.max_batch_interpreters
+        self._slots = [first] + [
+            PooledInterpreter(interpreter_factory, self.sequence_lengths, self.batch_sizes, max_batch_interpreters)
+            for _ in range(self.size - 1)
+        ]
+        self._available: queue.Queue = queue.Queue()
+        for slot in self._slots:
+            self._available.put(slot)
+
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts_total = 0
+        self._saturated_total = 0
+        self._wait_ms_total = 0.0
+
+    def bucket_for(self, length: int) -> int:
+        """Bucket terkecil yang memuat `length` token; bucket terbesar jika tidak ada yang cukup."""
+        index = bisect.bisect_left(self.sequence_lengths, length)
+        return self.sequence_lengths[min(index, len(self.sequence_lengths) - 1)]
+
+    @contextmanager
+    def checkout(self, timeout: float | None = None):
+        """Meminjam satu slot interpreter; dikembalikan otomatis ke pool setelah blok `with` selesai."""
+        start = time.perf_counter()
+        try:
+            pooled = self._available.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._saturated_total += 1
+            logger.warning(f"Interpreter pool jenuh ({self.size} interpreter sedang dipakai). Menunggu giliran...")
+            try:
+                pooled = self._available.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("Tidak ada interpreter TFLite yang tersedia dalam batas waktu.")
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts_total += 1
+            self._wait_ms_total += (time.perf_counter() - start) * 1000
+        try:
+            yield pooled
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._available.put(pooled)
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._in_use >= self.size
+
+    def stats(self) -> dict:
+        """Ringkasan pemakaian pool interpreter."""
+        bucket_invokes = {sequence_length: 0 for sequence_length in self.sequence_lengths}
+        batch_bucket_invokes = {batch_size: 0 for batch_size in self.batch_sizes}
+        for slot in self._slots:
+            for sequence_length, by_batch in slot.buckets.items():
+                for batch_size, shaped in by_batch.items():
+                    bucket_invokes[sequence_length] += shaped.invokes_total
+                    batch_bucket_invokes[batch_size] += shaped.invokes_total
+            for (sequence_length, batch_size), invokes in slot.evicted_invokes.items():
+                bucket_invokes[sequence_length] += invokes
+                batch_bucket_invokes[batch_size] += invokes
+        live_interpreters = sum(len(by_batch) for slot in self._slots for by_batch in slot.buckets.values())
+        evictions_total = sum(slot.evictions_total for slot in self._slots)
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "available": self.size - self._in_use,
+                "saturated": self._in_use >= self.size,
+                "checkouts_total": self._checkouts_total,
+                "saturated_total": self._saturated_total,
+                "avg_checkout_wait_ms": self._wait_ms_total / self._checkouts_total if self._checkouts_total else 0.0,
+                "sequence_buckets": self.sequence_lengths,
+                "bucket_invokes": bucket_invokes,
+                "batch_buckets": self.batch_sizes,
+                "batch_bucket_invokes": batch_bucket_invokes,
+                "max_batch_interpreters": self.max_batch_interpreters,
+                "live_interpreters": live_interpreters,
+                "batch_interpreter_evictions_total": evictions_total,
+            }
@@ -1,159 +1,32 @@
 # cekviral_project/app/services/ml_model.py
 import os
-import re
-import string
 import logging
 import time
 
-# Import library NLTK, TensorFlow, dan Transformers
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import tensorflow as tf
+# TensorFlow penuh dan Transformers hanya di-import saat dibutuhkan (lihat create_interpreter dan load_tokenizer)
 import numpy as np
-from transformers import BertTokenizer
+
+from app.core.config import settings
+from app.services.inference_batcher import InferenceBatcher
+from app.services.interpreter_pool import InterpreterPool
+from app.services.prediction_cache import PredictionCache, fingerprint_file
+from app.services.text_preprocessing import preprocess_batch
 
 logger = logging.getLogger(__name__)
 
 # Placeholder untuk model dan tokenizer
 global_model = None
+global_interpreter_pool: InterpreterPool | None = None
 global_tokenizer = None
 
-# --- KAMUS SLANGWORDS ---
-slangwords = {"@": "di", "abis": "habis", "wtb": "beli", "masi": "masih", "wts": "jual", "wtt": "tukar", "bgt": "banget", "maks": "maksimal",
-              "plisss": "tolong", "bgttt": "banget", "indo": "indonesia", "bgtt": "banget", "ad": "ada", "rv": "redvelvet", "plis": "tolong",
-              "pls": "tolong", "cr": "sumber", "cod": "bayar ditempat", "adlh": "adalah", "afaik": "as far as i know", "ahaha": "haha", "aj": "saja",
-              "ajep-ajep": "dunia gemerlap", "ak": "saya", "akika": "aku", "akkoh": "aku", "akuwh": "aku", "alay": "norak", "alow": "halo", "ambilin": "ambilkan",
-              "ancur": "hancur", "anjrit": "anjing", "anter": "antar", "ap2": "apa-apa", "apasih": "apa sih", "apes": "sial", "aps": "apa", "aq": "saya",
-              "aquwh": "aku", "asbun": "asal bunyi", "aseekk": "asyik", "asekk": "asyik", "asem": "asam", "aspal": "asli tetapi palsu", "astul": "asal tulis",
-              "ato": "atau", "au ah": "tidak mau tahu", "awak": "saya", "ay": "sayang", "ayank": "sayang", "b4": "sebelum", "bakalan": "akan", "bandes": "bantuan desa",
-              "bangedh": "banget", "banpol": "bantuan polisi", "banpur": "bantuan tempur", "basbang": "basi", "bcanda": "bercanda", "bdg": "bandung", "begajulan": "nakal",
-              "beliin": "belikan", "bencong": "banci", "bentar": "sebentar", "ber3": "bertiga", "beresin": "membereskan", "bete": "bosan", "beud": "banget", "bg": "abang",
-              "bgmn": "bagaimana", "bgt": "banget", "bijimane": "bagaimana", "bintal": "bimbingan mental", "bkl": "akan", "bknnya": "bukannya", "blegug": "bodoh", "blh": "boleh",
-              "bln": "bulan", "blum": "belum", "bnci": "benci", "bnran": "yang benar", "bodor": "lucu", "bokap": "ayah", "boker": "buang air besar", "bokis": "bohong",
-              "boljug": "boleh juga", "bonek": "bocah nekat", "boyeh": "boleh", "br": "baru", "brg": "bareng", "bro": "saudara laki-laki", "bru": "baru", "bs": "bisa",
-              "bsen": "bosan", "bt": "buat", "btw": "ngomong-ngomong", "buaya": "tidak setia", "bubbu": "tidur", "bubu": "tidur", "bumil": "ibu hamil", "bw": "bawa",
-              "bwt": "buat", "byk": "banyak", "byrin": "bayarkan", "cabal": "sabar", "cadas": "keren", "calo": "makelar", "can": "belum", "capcus": "pergi",
-              "caper": "cari perhatian", "ce": "cewek", "cekal": "cegah tangkal", "cemen": "penakut", "cengengesan": "tertawa", "cepet": "cepat", "cew": "cewek", "chuyunk": "sayang",
-              "cimeng": "ganja", "cipika cipiki": "cium pipi kanan cium pipi kiri", "ciyh": "sih", "ckepp": "cakep", "ckp": "cakep", "cmiiw": "correct me if i'm wrong",
-              "cmpur": "campur", "cong": "banci", "conlok": "cinta lokasi", "cowwyy": "maaf", "cp": "siapa", "cpe": "capek", "cppe": "capek", "cucok": "cocok",
-              "cuex": "cuek", "cumi": "Cuma miscall", "cups": "culun", "curanmor": "pencurian kendaraan bermotor", "curcol": "curahan hati colongan", "cwek": "cewek",
-              "cyin": "cinta", "d": "di", "dah": "deh", "dapet": "dapat", "de": "adik", "dek": "adik", "demen": "suka", "deyh": "deh", "dgn": "dengan", "diancurin": "dihancurkan",
-              "dimaafin": "dimaafkan", "dimintak": "diminta", "disono": "di sana", "dket": "dekat", "dkk": "dan kawan-kawan", "dlu": "dulu", "dngn": "dengan", "dodol": "bodoh",
-              "doku": "uang", "dongs": "dong", "dpt": "dapat", "dri": "dari", "drmn": "darimana", "drtd": "dari tadi", "dst": "dan seterusnya", "dtg": "datang", "duh": "aduh",
-              "duren": "durian", "ed": "edisi", "egp": "emang gue pikirin", "eke": "aku", "elu": "kamu", "emangnya": "memangnya", "emng": "memang", "endak": "tidak", "enggak": "tidak",
-              "envy": "iri", "ex": "mantan", "fax": "facsimile", "fifo": "first in first out", "folbek": "follow back", "fyi": "sebagai informasi", "gaada": "tidak ada uang",
-              "gag": "tidak", "gaje": "tidak jelas", "gak papa": "tidak apa-apa", "gan": "juragan", "gaptek": "gagap teknologi", "gatek": "gagap teknologi", "gawe": "kerja",
-              "gbs": "tidak bisa", "gebetan": "orang yang disuka", "geje": "tidak jelas", "gepeng": "gelandangan dan pengemis", "ghiy": "lagi", "gile": "gila", "gimana": "bagaimana",
-              "gino": "gigi nongol", "githu": "gitu", "gj": "tidak jelas", "gmana": "bagaimana", "gn": "begini", "goblok": "bodoh", "golput": "golongan putih", "gowes": "mengayuh sepeda",
-              "gpny": "tidak punya", "gr": "gede rasa", "gretongan": "gratisan", "gtau": "tidak tahu", "gua": "saya", "guoblok": "goblok", "gw": "saya", "ha": "tertawa", "haha": "tertawa",
-              "hallow": "halo", "hankam": "pertahanan dan keamanan", "hehe": "he", "helo": "halo", "hey": "hai", "hlm": "halaman", "hny": "hanya", "hoax": "isu bohong", "hr": "hari",
-              "hrus": "harus", "hubdar": "perhubungan darat", "huff": "mengeluh", "hum": "rumah", "humz": "rumah", "ilang": "hilang", "ilfil": "tidak suka", "imho": "in my humble opinion",
-              "imoetz": "imut", "item": "hitam", "itungan": "hitungan", "iye": "iya", "ja": "saja", "jadiin": "jadi", "jaim": "jaga image", "jayus": "tidak lucu", "jdi": "jadi", "jem": "jam",
-              "jga": "juga", "jgnkan": "jangankan", "jir": "anjing", "jln": "jalan", "jomblo": "tidak punya pacar", "jubir": "juru bicara", "jutek": "galak", "k": "ke", "kab": "kabupaten",
-              "kabor": "kabur", "kacrut": "kacau", "kadiv": "kepala divisi", "kagak": "tidak", "kalo": "kalau", "kampret": "sialan", "kamtibmas": "keamanan dan ketertiban masyarakat",
-              "kamuwh": "kamu", "kanwil": "kantor wilayah", "karna": "karena", "kasubbag": "kepala subbagian", "katrok": "kampungan", "kayanya": "kayaknya", "kbr": "kabar", "kdu": "harus",
-              "kec": "kecamatan", "kejurnas": "kejuaraan nasional", "kekeuh": "keras kepala", "kel": "kelurahan", "kemaren": "kemarin", "kepengen": "mau", "kepingin": "mau",
-              "kepsek": "kepala sekolah", "kesbang": "kesatuan bangsa", "kesra": "kesejahteraan rakyat", "ketrima": "diterima", "kgiatan": "kegiatan", "kibul": "bohong", "kimpoi": "kawin",
-              "kl": "kalau", "klianz": "kalian", "kloter": "kelompok terbang", "klw": "kalau", "km": "kamu", "kmps": "kampus", "kmrn": "kemarin", "knal": "kenal", "knp": "kenapa",
-              "kodya": "kota madya", "komdis": "komisi disiplin", "komsov": "komunis sovyet", "kongkow": "kumpul bareng teman-teman", "kopdar": "kopi darat", "korup": "korupsi", "kpn": "kapan",
-              "krenz": "keren", "krm": "kirim", "kt": "kita", "ktmu": "ketemu", "ktr": "kantor", "kuper": "kurang pergaulan", "kw": "imitasi", "kyk": "seperti", "la": "lah", "lam": "salam",
-              "lamp": "lampiran", "lanud": "landasan udara", "latgab": "latihan gabungan", "lebay": "berlebihan", "leh": "boleh", "lelet": "lambat", "lemot": "lambat", "lgi": "lagi",
-              "lgsg": "langsung", "liat": "lihat", "litbang": "penelitian dan pengembangan", "lmyn": "lumayan", "lo": "kamu", "loe": "kamu", "lola": "lambat berfikir", "louph": "cinta",
-              "low": "kalau", "lp": "lupa", "luber": "langsung, umum, bebas, dan rahasia", "luchuw": "lucu", "lum": "belum", "luthu": "lucu", "lwn": "lawan", "maacih": "terima kasih",
-              "mabal": "bolos", "macem": "macam", "macih": "masih", "maem": "makan", "magabut": "makan gaji buta", "maho": "homo", "mak jang": "kaget", "maksain": "memaksa", "malem": "malam",
-              "mam": "makan", "maneh": "kamu", "maniez": "manis", "mao": "mau", "masukin": "masukkan", "melu": "ikut", "mepet": "dekat sekali", "mgu": "minggu", "migas": "minyak dan gas bumi",
-              "mikol": "minuman beralkohol", "miras": "minuman keras", "mlah": "malah", "mngkn": "mungkin", "mo": "mau", "mokad": "mati", "moso": "masa", "mpe": "sampai", "msk": "masuk",
-              "mslh": "masalah", "mt": "makan teman", "mubes": "musyawarah besar", "mulu": "melulu", "mumpung": "selagi", "munas": "musyawarah nasional", "muntaber": "muntah dan berak",
-              "musti": "mesti", "muupz": "maaf", "mw": "now watching", "n": "dan", "nanam": "menanam", "nanya": "bertanya", "napa": "kenapa", "napi": "narapidana",
-              "napza": "narkotika, alkohol, psikotropika, dan zat adiktif ", "narkoba": "narkotika, psikotropika, dan obat terlarang", "nasgor": "nasi goreng", "nda": "tidak", "ndiri": "sendiri",
-              "ne": "ini", "nekolin": "neokolonialisme", "nembak": "menyatakan cinta", "ngabuburit": "menunggu berbuka puasa", "ngaku": "mengaku", "ngambil": "mengambil", "nganggur": "tidak punya pekerjaan",
-              "ngapah": "kenapa", "ngaret": "terlambat", "ngasih": "memberikan", "ngebandel": "berbuat bandel", "ngegosip": "bergosip", "ngeklaim": "mengklaim", "ngeksis": "menjadi eksis", "ngeles": "berkilah",
-              "ngelidur": "menggigau", "ngerampok": "merampok", "ngga": "tidak", "ngibul": "berbohong", "ngiler": "mau", "ngiri": "iri", "ngisiin": "mengisikan", "ngmng": "bicara", "ngomong": "bicara",
-              "ngubek2": "mencari-cari", "ngurus": "mengurus", "nie": "ini", "nih": "ini", "niyh": "nih", "nmr": "nomor", "nntn": "nonton", "nobar": "nonton bareng", "np": "now playing", "ntar": "nanti",
-              "ntn": "nonton", "numpuk": "bertumpuk", "nutupin": "menutupi", "nyari": "mencari", "nyekar": "menyekar", "nyicil": "mencicil", "nyoblos": "mencoblos", "nyokap": "ibu", "ogah": "tidak mau",
-              "ol": "online", "ongkir": "ongkos kirim", "oot": "out of topic", "org2": "orang-orang", "ortu": "orang tua", "otda": "otonomi daerah", "otw": "on the way, sedang di jalan", "pacal": "pacar",
-              "pake": "pakai", "pala": "kepala", "pansus": "panitia khusus", "parpol": "partai politik", "pasutri": "pasangan suami istri", "pd": "pada", "pede": "percaya diri", "pelatnas": "pemusatan latihan nasional",
-              "pemda": "pemerintah daerah", "pemkot": "pemerintah kota", "pemred": "pemimpin redaksi", "penjas": "pendidikan jasmani", "perda": "peraturan daerah", "perhatiin": "perhatikan", "pesenan": "pesanan",
-              "pgang": "pegang", "pi": "tapi", "pilkada": "pemilihan kepala daerah", "pisan": "sangat", "pk": "penjahat kelamin", "plg": "paling", "pmrnth": "pemerintah", "polantas": "polisi lalu lintas",
-              "ponpes": "pondok pesantren", "pp": "pulang pergi", "prg": "pergi", "prnh": "pernah", "psen": "pesan", "pst": "pasti", "pswt": "pesawat", "pw": "posisi nyaman", "qmu": "kamu", "rakor": "rapat koordinasi",
-              "ranmor": "kendaraan bermotor", "re": "reply", "ref": "referensi", "rehab": "rehabilitasi", "rempong": "sulit", "repp": "balas", "restik": "reserse narkotika", "rhs": "rahasia", "rmh": "rumah"}
-
-# --- AKHIR KAMUS SLANGWORDS ---
-
-
-# --- FUNGSI PREPROCESSING TEKS ---
-def cleaningText(text):
-    text = re.sub(r'@[A-Za-z0-9_]+', '', text)
-    text = re.sub(r'#\w+', '', text)
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'\d+', '', text)
-    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ') # Menangani newline dan tab
-    text = re.sub(r'([,.!?()"])', r' \1 ', text)
-    text = re.sub(r'([a-zA-Z]+)[\"()_-]([a-zA-Z]+)', r'\1 \2', text)
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    text = re.sub(r'[^\x00-\x7F]+', '', text)
-    text = re.sub(r'\b(\w*[^aeiou\s])(nya|nua|neo)\b', r'\1 \2', text)
-    text = re.sub(r'\s+', ' ', text).strip() # Menangani spasi berlebih dan spasi awal/akhir
-    return text
-
-def casefoldingText(text):
-    text = text.lower()
-    return text
-
-def tokenizingText(text):
-    text = word_tokenize(text)
-    return text
-
-def filteringText(text):
-    listStopwords = set(stopwords.words('indonesian'))
-    listStopwords1 = set(stopwords.words('english'))
-    listStopwords.update(listStopwords1)
-    listStopwords.update(['iya','yaa','gak','nya','na','sih','ku',"di","ga","ya","gaa","loh","kah","woi","woii","woy", "yg"])
-    filtered = []
-    for txt in text:
-        if txt not in listStopwords:
-            filtered.append(txt)
-    text = filtered
-    return text
-
-def toSentence(list_words):
-    sentence = ' '.join(word for word in list_words)
-    return sentence
-
-def fix_slangwords(text):
-    words = text.split()
-    fixed_words = []
-    for word in words:
-        if word.lower() in slangwords:
-            fixed_words.append(slangwords[word.lower()])
-        else:
-            fixed_words.append(word)
-    fixed_text = ' '.join(fixed_words)
-    return fixed_text
-
-def preprocess_text_for_ml(text: str) -> str:
-    """
-    Menggabungkan semua langkah pra-pemrosesan teks ke dalam satu pipeline,
-    termasuk penanganan karakter baris baru dan spasi berlebihan secara otomatis.
-    """
-    if not isinstance(text, str):
-        logger.warning(f"Input to preprocess_text_for_ml is not a string: {type(text)}. Attempting conversion.")
-        text = str(text)
 
-    # Ini adalah langkah pertama yang kuat untuk menangani newline dan spasi berlebihan.
-    # Digunakan di sini dan di cleaningText untuk redundansi jika ada urutan pemanggilan yang berbeda.
-    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    text = cleaningText(text)
-    text = casefoldingText(text)
-    text = fix_slangwords(text)
-    tokens = tokenizingText(text)
-    tokens = filteringText(tokens)
-    text = toSentence(tokens)
-    return text
-# --- AKHIR FUNGSI PREPROCESSING TEKS ---
+# Cache hasil prediksi; aktif setelah load_ml_model menetapkan versi model
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+    db_path=settings.PREDICTION_CACHE_DB_PATH,
+    db_max_entries=settings.PREDICTION_CACHE_DB_MAX_ENTRIES,
+)
 
 
 # Konfigurasi model dan tokenizer
@@ -161,6 +34,14 @@ INDOBERT_TOKENIZER_NAME = "indobenchmark/indobert-lite-base-p2"
 MAX_SEQUENCE_LENGTH = 128
 FINE_TUNED_MODEL_FILE = "indobert_model.tflite"
 
+# File model untuk setiap varian kuantisasi (dibuat dengan benchmarks/convert_model_variants.py)
+MODEL_VARIANT_FILES = {
+    "float32": FINE_TUNED_MODEL_FILE,
+    "float16": "indobert_model_fp16.tflite",
+    "int8": "indobert_model_int8.tflite",
+}
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'models')
+
 # Mapping label untuk klasifikasi biner
 CLASS_LABELS = {0: "HOAKS", 1: "FAKTA"}
 
@@ -168,121 +49,382 @@ CLASS_LABELS = {0: "HOAKS", 1: "FAKTA"}
 UNCERTAIN_THRESHOLD_LOW = 0.15
 UNCERTAIN_THRESHOLD_HIGH = 0.85
 
+def get_sequence_buckets() -> list[int]:
+    """Bucket panjang sekuens dari settings, dibatasi MAX_SEQUENCE_LENGTH (yang selalu disertakan)."""
+    buckets = {bucket for bucket in settings.SEQUENCE_BUCKETS if 0 < bucket < MAX_SEQUENCE_LENGTH}
+    buckets.add(MAX_SEQUENCE_LENGTH)
+    return sorted(buckets)
+
+
+def get_batch_buckets() -> list[int]:
+    """Bucket ukuran batch interpreter dari settings (batch 1 selalu disertakan)."""
+    return sorted({bucket for bucket in settings.INFERENCE_BATCH_BUCKETS if bucket > 0} | {1})
+
+
+def get_model_path(variant: str | None = None) -> str:
+    """
+    Path file TFLite untuk varian model (default: settings.MODEL_VARIANT).
+    Jika file varian tidak ditemukan, kembali ke model float32.
+    """
+    variant = variant or settings.MODEL_VARIANT
+    model_path = os.path.join(MODELS_DIR, MODEL_VARIANT_FILES[variant])
+    if variant != "float32" and not os.path.exists(model_path):
+        logger.warning(f"File model varian {variant} tidak ditemukan di {model_path}. Menggunakan model float32.")
+        return os.path.join(MODELS_DIR, FINE_TUNED_MODEL_FILE)
+    return model_path
+
+
+def _model_version(model_path: str) -> str:
+    """Versi model untuk kunci cache: hash file TFLite + pengaturan yang memengaruhi hasil prediksi."""
+    return ":".join([
+        fingerprint_file(model_path)[:16],
+        str(MAX_SEQUENCE_LENGTH),
+        str(settings.LONG_DOCUMENT_MODE),
+        str(settings.LONG_DOCUMENT_WINDOW_OVERLAP),
+        str(settings.LONG_DOCUMENT_MAX_WINDOWS),
+        settings.LONG_DOCUMENT_AGGREGATION,
+    ])
+
+
+def resolve_interpreter_class():
+    """
+    Memilih kelas Interpreter TFLite sesuai settings.INFERENCE_RUNTIME. Pada mode "auto", runtime
+    mandiri yang ringan dipakai jika terpasang (LiteRT `ai_edge_litert`, lalu `tflite_runtime`);
+    jika tidak ada, kembali ke TensorFlow penuh. TensorFlow tidak ada di requirements.txt (hanya di
+    requirements-benchmark.txt), jadi jalur itu opsional. Mengembalikan tuple (kelas Interpreter, nama runtime).
+    """
+    if settings.INFERENCE_RUNTIME in ("auto", "tflite_runtime"):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+            return Interpreter, "ai_edge_litert"
+        except ImportError:
+            pass
+        try:
+            from tflite_runtime.interpreter import Interpreter
+            return Interpreter, "tflite_runtime"
+        except ImportError:
+            if settings.INFERENCE_RUNTIME == "tflite_runtime":
+                logger.warning("Runtime TFLite mandiri tidak terpasang. Kembali menggunakan TensorFlow penuh.")
+
+    try:
+        import tensorflow as tf
+    except ImportError as e:
+        raise ImportError(
+            "Runtime TFLite tidak ditemukan: pasang ai-edge-litert (requirements.txt) atau TensorFlow "
+            "(requirements-benchmark.txt)."
+        ) from e
+    return tf.lite.Interpreter, "tensorflow"
+
+
+def create_interpreter(model_path: str):
+    """Membuat satu instance Interpreter TFLite dengan jumlah thread intra-op dari settings."""
+    interpreter_class, _ = resolve_interpreter_class()
+    return interpreter_class(model_path=model_path, num_threads=settings.INTERPRETER_NUM_THREADS)
+
+
+def load_tokenizer():
+    """Memuat tokenizer IndoBERT versi cepat (Rust); kembali ke versi Python jika gagal."""
+    try:
+        from transformers import BertTokenizerFast
+        return BertTokenizerFast.from_pretrained(INDOBERT_TOKENIZER_NAME)
+    except Exception as e:
+        logger.warning(f"Tokenizer cepat tidak dapat dimuat ({e}). Menggunakan BertTokenizer (Python).")
+        from transformers import BertTokenizer
+        return BertTokenizer.from_pretrained(INDOBERT_TOKENIZER_NAME)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Softmax per baris dengan NumPy (stabil secara numerik)."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
 def load_ml_model():
     """Memuat model TFLite dan tokenizer-nya."""
-    global global_interpreter, global_tokenizer
+    global global_interpreter_pool, global_tokenizer
 
-    model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'models', FINE_TUNED_MODEL_FILE)
+    model_path = get_model_path()
     
     try:
-        logger.info(f"Memuat model TFLite dari: {model_path}")
-        global_interpreter = tf.lite.Interpreter(model_path=model_path)
-        global_interpreter.allocate_tensors()
-        logger.info("Model TFLite berhasil dimuat.")
+        _, runtime_name = resolve_interpreter_class()
+        logger.info(
+            f"Memuat model TFLite dari: {model_path} (varian={settings.MODEL_VARIANT}, runtime={runtime_name}, "
+            f"pool={settings.INTERPRETER_POOL_SIZE}, num_threads={settings.INTERPRETER_NUM_THREADS})"
+        )
+        global_interpreter_pool = InterpreterPool(
+            lambda: create_interpreter(model_path),
+            size=settings.INTERPRETER_POOL_SIZE,
+            sequence_lengths=get_sequence_buckets(),
+            batch_sizes=get_batch_buckets(),
+            max_batch_interpreters=settings.INFERENCE_BATCH_INTERPRETERS_PER_SLOT,
+        )
+        logger.info(
+            f"Model TFLite berhasil dimuat (bucket panjang sekuens: {global_interpreter_pool.sequence_lengths}, "
+            f"bucket batch: {global_interpreter_pool.batch_sizes})."
+        )
+
+        if settings.PREDICTION_CACHE_ENABLED:
+            prediction_cache.set_model_version(_model_version(model_path))
+            logger.info(f"Cache prediksi aktif untuk versi model {prediction_cache.model_version}.")
         
         logger.info(f"Memuat tokenizer: {INDOBERT_TOKENIZER_NAME}")
-        global_tokenizer = BertTokenizer.from_pretrained(INDOBERT_TOKENIZER_NAME)
-        logger.info("Tokenizer Hugging Face berhasil dimuat.")
+        global_tokenizer = load_tokenizer()
+        logger.info(f"Tokenizer Hugging Face berhasil dimuat ({type(global_tokenizer).__name__}).")
 
     except Exception as e:
         logger.error(f"Terjadi kesalahan saat memuat model TFLite atau tokenizer: {e}", exc_info=True)
-        global_interpreter = None
+        global_interpreter_pool = None
         global_tokenizer = None
 
 
-def predict_content_hoax_status(raw_text: str) -> dict:
+def _error_result(message: str) -> dict:
+    """Membentuk hasil prediksi standar untuk kondisi gagal."""
+    return {
+        "status": "error", "message": message,
+        "probabilities": {"HOAKS": 0.0, "FAKTA": 0.0},
+        "predicted_label_model": "N/A", "highest_confidence": 0.0,
+        "final_label_thresholded": "BELUM DIVERIFIKASI", "inference_time_ms": 0.0,
+        "windows_used": 0
+    }
+
+
+def _build_prediction_result(probabilities_array, inference_time_ms: float, windows_used: int = 1) -> dict:
+    """Mengubah vektor probabilitas satu sampel menjadi dict hasil prediksi."""
+    # Perhatikan CLASS_LABELS: jika key 0 adalah HOAKS, maka prob_hoax adalah probabilities_array[0]
+    prob_hoax = float(probabilities_array[0])
+    prob_fakta = float(probabilities_array[1])
+    predicted_class_index = int(np.argmax(probabilities_array))
+    predicted_label = CLASS_LABELS.get(predicted_class_index, "tidak diketahui")
+    
+    highest_confidence = float(np.max(probabilities_array))
+
+    final_label_thresholded = "BELUM DIVERIFIKASI"
+    if prob_fakta >= UNCERTAIN_THRESHOLD_HIGH:
+        final_label_thresholded = "FAKTA"
+    elif prob_fakta <= UNCERTAIN_THRESHOLD_LOW:
+        final_label_thresholded = "HOAKS"
+
+    logger.info(f"Probabilities: HOAKS={prob_hoax:.4f}, FAKTA={prob_fakta:.4f}")
+    logger.info(f"Predicted label by model: {predicted_label}, Final (thresholded): {final_label_thresholded}")
+
+    return {
+        "status": "success",
+        "message": "Prediksi berhasil.",
+        "probabilities": {"HOAKS": prob_hoax, "FAKTA": prob_fakta},
+        "predicted_label_model": predicted_label,
+        "highest_confidence": highest_confidence,
+        "final_label_thresholded": final_label_thresholded,
+        "inference_time_ms": inference_time_ms,
+        "windows_used": windows_used
+    }
+
+
+def _split_into_windows(token_ids: list[int]) -> list[list[int]]:
     """
-    Melakukan prediksi menggunakan model TFLite yang sudah dioptimalkan.
+    Memecah token konten (tanpa [CLS]/[SEP]) menjadi jendela yang saling tumpang tindih.
+    Jika mode dokumen panjang nonaktif, hanya jendela pertama yang dipakai (setara truncation).
+    Jumlah jendela dibatasi LONG_DOCUMENT_MAX_WINDOWS dengan memilih jendela yang tersebar merata.
     """
-    global global_interpreter, global_tokenizer
+    window_size = MAX_SEQUENCE_LENGTH - 2
+    if len(token_ids) <= window_size or not settings.LONG_DOCUMENT_MODE:
+        return [token_ids[:window_size]]
 
-    if global_interpreter is None or global_tokenizer is None:
-        logger.error("Interpreter TFLite atau Tokenizer belum dimuat. Tidak dapat melakukan prediksi.")
-        return {
-            "status": "error",
-            "message": "Model/Tokenizer tidak dimuat.",
-            "probabilities": {"HOAKS": 0.0, "FAKTA": 0.0},
-            "predicted_label_model": "N/A",
-            "highest_confidence": 0.0,
-            "final_label_thresholded": "BELUM DIVERIFIKASI",
-            "inference_time_ms": 0.0
-        }
+    stride = max(1, window_size - settings.LONG_DOCUMENT_WINDOW_OVERLAP)
+    starts = list(range(0, len(token_ids) - window_size + stride, stride))
+    if starts[-1] + window_size < len(token_ids):
+        starts.append(len(token_ids) - window_size)
 
-    start_time = time.perf_counter()
-    
-    try:
-        processed_text = preprocess_text_for_ml(raw_text)
-        
-        if not processed_text.strip():
-            logger.warning("Teks setelah pra-pemrosesan kosong atau hanya spasi.")
-            return {
-                "status": "error", "message": "Teks setelah pra-pemrosesan kosong.",
-                "probabilities": {"HOAKS": 0.0, "FAKTA": 0.0},
-                "predicted_label_model": "N/A", "highest_confidence": 0.0,
-                "final_label_thresholded": "BELUM DIVERIFIKASI", "inference_time_ms": 0.0
-            }
-
-        logger.info(f"Teks setelah pra-pemrosesan: {processed_text[:100]}...")
-
-        encoded_input = global_tokenizer(
-            processed_text,
-            truncation=True,
-            padding='max_length',
-            max_length=MAX_SEQUENCE_LENGTH,
-            return_tensors='tf'
+    max_windows = max(1, settings.LONG_DOCUMENT_MAX_WINDOWS)
+    if len(starts) > max_windows:
+        picked = np.linspace(0, len(starts) - 1, max_windows).round().astype(int)
+        starts = [starts[k] for k in sorted(set(picked))]
+    return [token_ids[start:start + window_size] for start in starts]
+
+
+def _aggregate_windows(window_probabilities: np.ndarray, window_lengths: list[int]) -> np.ndarray:
+    """
+    Menggabungkan probabilitas semua jendela satu dokumen menjadi satu vektor probabilitas.
+      - mean      : rata-rata probabilitas, dibobot jumlah token tiap jendela
+      - max_hoax  : jendela dengan probabilitas HOAKS tertinggi
+      - attention : rata-rata berbobot softmax dari keyakinan (selisih log-probabilitas) tiap jendela
+    """
+    if len(window_probabilities) == 1:
+        return window_probabilities[0]
+
+    strategy = settings.LONG_DOCUMENT_AGGREGATION
+    lengths = np.asarray(window_lengths, dtype=np.float64)
+    if strategy == "max_hoax":
+        return window_probabilities[int(np.argmax(window_probabilities[:, 0]))]
+    if strategy == "attention":
+        log_probs = np.log(np.clip(window_probabilities, 1e-7, 1.0))
+        margins = np.abs(log_probs[:, 0] - log_probs[:, 1])
+        scores = margins + np.log(lengths)
+        weights = np.exp(scores - scores.max())
+    else:
+        weights = lengths
+    weights = weights / weights.sum()
+    return (window_probabilities * weights[:, None]).sum(axis=0)
+
+
+def encode_windows(processed_texts: list[str]) -> tuple[list[int], list[dict]]:
+    """
+    Tokenisasi tanpa token spesial dan tanpa padding; setiap teks dipecah menjadi satu atau lebih
+    jendela. Mengembalikan indeks teks pemilik setiap jendela dan input jendela yang belum dipad.
+    """
+    content_ids = global_tokenizer(processed_texts, add_special_tokens=False)['input_ids']
+    window_owners: list[int] = []
+    window_inputs: list[dict] = []
+    for j, token_ids in enumerate(content_ids):
+        for window in _split_into_windows(token_ids):
+            input_ids = global_tokenizer.build_inputs_with_special_tokens(window)
+            window_owners.append(j)
+            window_inputs.append({
+                'input_ids': input_ids,
+                'token_type_ids': global_tokenizer.create_token_type_ids_from_sequences(window),
+                'attention_mask': [1] * len(input_ids),
+            })
+    return window_owners, window_inputs
+
+
+def invoke_windows(window_inputs: list[dict]) -> list[np.ndarray]:
+    """
+    Menjalankan model untuk semua jendela: satu `invoke()` per bucket panjang sekuens (dan per
+    bucket batch terbesar jika jendelanya lebih banyak), dengan setiap jendela dipad hanya sampai
+    bucket terkecil yang memuatnya. Mengembalikan logits per jendela.
+    """
+    bucket_members: dict[int, list[int]] = {}
+    for w, window_input in enumerate(window_inputs):
+        bucket_members.setdefault(global_interpreter_pool.bucket_for(len(window_input['input_ids'])), []).append(w)
+
+    window_logits = [None] * len(window_inputs)
+    with global_interpreter_pool.checkout() as pooled:
+        for bucket, members in bucket_members.items():
+            # Token ditulis langsung ke buffer tensor input interpreter (padding ikut di sana); batch
+            # dipad sampai bucket batch sehingga interpreter tidak dialokasikan ulang
+            logits = pooled.run_encoded(
+                bucket,
+                [window_inputs[w] for w in members],
+                pad_token_id=global_tokenizer.pad_token_id,
+            )
+            for w, row in zip(members, logits):
+                window_logits[w] = np.array(row)
+    return window_logits
+
+
+def aggregate_window_logits(
+    window_logits: list[np.ndarray], window_owners: list[int], window_inputs: list[dict], n_texts: int
+) -> list[tuple[np.ndarray, int]]:
+    """Softmax per jendela lalu agregasi per teks. Mengembalikan (probabilitas, jumlah jendela) per teks."""
+    window_probabilities = _softmax(np.stack(window_logits))
+    per_text_windows: dict[int, list[int]] = {}
+    for w, owner in enumerate(window_owners):
+        per_text_windows.setdefault(owner, []).append(w)
+
+    aggregated = []
+    for j in range(n_texts):
+        windows = per_text_windows[j]
+        probabilities_array = _aggregate_windows(
+            window_probabilities[windows],
+            [len(window_inputs[w]['input_ids']) for w in windows],
         )
-        
-        input_details = global_interpreter.get_input_details()
-        output_details = global_interpreter.get_output_details()
+        aggregated.append((probabilities_array, len(windows)))
+    return aggregated
 
-        input_ids = tf.cast(encoded_input['input_ids'], dtype=input_details[0]['dtype'])
-        attention_mask = tf.cast(encoded_input['attention_mask'], dtype=input_details[1]['dtype'])
-        
-        global_interpreter.set_tensor(input_details[0]['index'], input_ids)
-        global_interpreter.set_tensor(input_details[1]['index'], attention_mask)
-        if len(input_details) > 2:
-            token_type_ids = tf.cast(encoded_input['token_type_ids'], dtype=input_details[2]['dtype'])
-            global_interpreter.set_tensor(input_details[2]['index'], token_type_ids)
-
-        global_interpreter.invoke()
-        logits = global_interpreter.get_tensor(output_details[0]['index'])
-        
-        probabilities_array = tf.nn.softmax(logits, axis=1).numpy()[0]
-        
-        # Perhatikan CLASS_LABELS: jika key 0 adalah HOAKS, maka prob_hoax adalah probabilities_array[0]
-        prob_hoax = float(probabilities_array[0])
-        prob_fakta = float(probabilities_array[1])
-        predicted_class_index = np.argmax(probabilities_array)
-        predicted_label = CLASS_LABELS.get(predicted_class_index, "tidak diketahui")
-        
-        highest_confidence = float(np.max(probabilities_array))
 
-        final_label_thresholded = "BELUM DIVERIFIKASI"
-        if prob_fakta >= UNCERTAIN_THRESHOLD_HIGH:
-            final_label_thresholded = "FAKTA"
-        elif prob_fakta <= UNCERTAIN_THRESHOLD_LOW:
-            final_label_thresholded = "HOAKS"
-        
-        inference_time_ms = (time.perf_counter() - start_time) * 1000
+def predict_content_hoax_status_batch(raw_texts: list[str]) -> list[dict]:
+    """
+    Melakukan prediksi untuk sekumpulan teks dengan satu kali `invoke()` interpreter TFLite
+    per bucket panjang sekuens. Teks yang lebih panjang dari MAX_SEQUENCE_LENGTH dinilai per
+    jendela token (mode dokumen panjang) lalu digabung menjadi satu probabilitas. Urutan hasil
+    sama dengan urutan input; teks yang kosong setelah pra-pemrosesan mendapat hasil error
+    tanpa ikut dikirim ke model. Setiap hasil memuat "stage_timings_ms" berisi durasi tahap
+    preprocess/tokenize/invoke/postprocess batch ini (tidak ikut disimpan di cache).
+    """
+    if global_interpreter_pool is None or global_tokenizer is None:
+        logger.error("Interpreter TFLite atau Tokenizer belum dimuat. Tidak dapat melakukan prediksi.")
+        return [_error_result("Model/Tokenizer tidak dimuat.") for _ in raw_texts]
 
-        logger.info(f"Probabilities: HOAKS={prob_hoax:.4f}, FAKTA={prob_fakta:.4f}")
-        logger.info(f"Predicted label by model: {predicted_label}, Final (thresholded): {final_label_thresholded}")
-        
-        return {
-            "status": "success",
-            "message": "Prediksi berhasil.",
-            "probabilities": {"HOAKS": prob_hoax, "FAKTA": prob_fakta},
-            "predicted_label_model": predicted_label,
-            "highest_confidence": highest_confidence,
-            "final_label_thresholded": final_label_thresholded,
-            "inference_time_ms": inference_time_ms
-        }
+    start_time = time.perf_counter()
+    results: list[dict | None] = [None] * len(raw_texts)
+    # Durasi tahap model untuk batch ini; disertakan di setiap hasil sebagai "stage_timings_ms"
+    stage_timings_ms: dict[str, float] = {}
+
+    try:
+        valid_indices = []
+        valid_texts = []
+        processed_texts = preprocess_batch(raw_texts)
+        stage_timings_ms["preprocess"] = (time.perf_counter() - start_time) * 1000
+        for i, processed_text in enumerate(processed_texts):
+            if not processed_text.strip():
+                logger.warning("Teks setelah pra-pemrosesan kosong atau hanya spasi.")
+                results[i] = _error_result("Teks setelah pra-pemrosesan kosong.")
+                continue
+            logger.info(f"Teks setelah pra-pemrosesan: {processed_text[:100]}...")
+            cached_result = prediction_cache.get(processed_text)
+            if cached_result is not None:
+                cached_result["message"] = "Prediksi berhasil (dari cache)."
+                cached_result["inference_time_ms"] = (time.perf_counter() - start_time) * 1000
+                results[i] = cached_result
+                continue
+            valid_indices.append(i)
+            valid_texts.append(processed_text)
+
+        if valid_texts:
+            stage_start = time.perf_counter()
+            window_owners, window_inputs = encode_windows(valid_texts)
+            stage_timings_ms["tokenize"] = (time.perf_counter() - stage_start) * 1000
+
+            stage_start = time.perf_counter()
+            window_logits = invoke_windows(window_inputs)
+            stage_timings_ms["invoke"] = (time.perf_counter() - stage_start) * 1000
+            inference_time_ms = (time.perf_counter() - start_time) * 1000
+
+            stage_start = time.perf_counter()
+            aggregated = aggregate_window_logits(window_logits, window_owners, window_inputs, len(valid_texts))
+            for j, (probabilities_array, windows_used) in enumerate(aggregated):
+                if windows_used > 1:
+                    logger.info(f"Dokumen panjang dinilai dari {windows_used} jendela ({settings.LONG_DOCUMENT_AGGREGATION}).")
+                i = valid_indices[j]
+                results[i] = _build_prediction_result(probabilities_array, inference_time_ms, windows_used=windows_used)
+                prediction_cache.put(valid_texts[j], results[i])
+            stage_timings_ms["postprocess"] = (time.perf_counter() - stage_start) * 1000
+
+        for result in results:
+            result["stage_timings_ms"] = dict(stage_timings_ms)
+        return results
 
     except Exception as e:
         logger.error(f"Error saat melakukan prediksi: {e}", exc_info=True)
-        return {
-            "status": "error", "message": f"Kesalahan internal saat prediksi: {str(e)}",
-            "probabilities": {"HOAKS": 0.0, "FAKTA": 0.0},
-            "predicted_label_model": "N/A", "highest_confidence": 0.0,
-            "final_label_thresholded": "BELUM DIVERIFIKASI", "inference_time_ms": 0.0
-        }
\ No newline at end of file
+        return [
+            result if result is not None else _error_result(f"Kesalahan internal saat prediksi: {str(e)}")
+            for result in results
+        ]
+
+
+def get_prediction_cache_stats() -> dict:
+    """Ringkasan hit/miss cache prediksi."""
+    return prediction_cache.stats()
+
+
+def get_interpreter_pool_stats() -> dict:
+    """Ringkasan pemakaian pool interpreter; kosong jika model belum dimuat."""
+    if global_interpreter_pool is None:
+        return {"size": 0, "in_use": 0, "available": 0, "saturated": False}
+    return global_interpreter_pool.stats()
+
+
+def predict_content_hoax_status(raw_text: str) -> dict:
+    """
+    Melakukan prediksi menggunakan model TFLite yang sudah dioptimalkan.
+    """
+    return predict_content_hoax_status_batch([raw_text])[0]
+
+
+# Micro-batcher bersama untuk semua request /verify
+inference_batcher = InferenceBatcher(
+    predict_content_hoax_status_batch,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+    max_concurrent_batches=settings.INTERPRETER_POOL_SIZE,
+)
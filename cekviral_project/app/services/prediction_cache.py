@@ -0,0 +1,187 @@
+# cekviral_project/app/services/prediction_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Tier disk dibersihkan (entri kedaluwarsa dan kelebihan baris) saat dibuka dan setiap sekian put
+DISK_PRUNE_EVERY_PUTS = 1000
+
+
+def fingerprint_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash SHA-256 dari isi file (dipakai sebagai versi model)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache hasil prediksi yang dikunci dengan hash teks hasil pra-pemrosesan + versi model.
+
+    Tier pertama adalah LRU di memori dengan TTL. Jika `db_path` diisi, tier kedua berupa
+    SQLite di disk sehingga cache bertahan setelah restart. Saat versi model berubah
+    (mis. file indobert_model.tflite diganti), isi memori dikosongkan dan baris disk
+    dengan versi lama dihapus. Tier disk juga dibersihkan saat dibuka dan setiap
+    DISK_PRUNE_EVERY_PUTS put: baris yang melewati TTL dihapus, lalu baris terlama dibuang
+    sampai tersisa paling banyak `db_max_entries` (default sama dengan `max_entries`).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, db_path: str | None = None,
+                 db_max_entries: int | None = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_max_entries = max(1, db_max_entries) if db_max_entries else self.max_entries
+        self.model_version: str | None = None
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._hits_memory = 0
+        self._hits_disk = 0
+        self._misses = 0
+        self._puts_since_prune = 0
+        self._pruned_disk = 0
+
+        self._db: sqlite3.Connection | None = None
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS prediction_cache ("
+                    "key TEXT PRIMARY KEY, model_version TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS prediction_cache_created_at ON prediction_cache (created_at)"
+                )
+                self._db.commit()
+                self._prune_disk(time.time())
+                logger.info(f"Tier disk cache prediksi aktif di {db_path}.")
+            except sqlite3.Error as e:
+                logger.error(f"Gagal membuka cache prediksi SQLite {db_path}: {e}", exc_info=True)
+                self._db = None
+
+    def set_model_version(self, model_version: str):
+        """Menetapkan versi model aktif dan membuang entri milik versi lain."""
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    deleted = self._db.execute(
+                        "DELETE FROM prediction_cache WHERE model_version != ?", (model_version,)
+                    ).rowcount
+                    self._db.commit()
+                    if deleted:
+                        logger.info(f"{deleted} entri cache prediksi dari versi model lama dihapus.")
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal membersihkan cache prediksi SQLite: {e}")
+
+    def _key(self, processed_text: str) -> str:
+        return hashlib.sha256(f"{self.model_version}\x00{processed_text}".encode('utf-8')).hexdigest()
+
+    def get(self, processed_text: str) -> dict | None:
+        if self.model_version is None:
+            return None
+        key = self._key(processed_text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, result = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._hits_memory += 1
+                    return dict(result)
+                del self._entries[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT result, created_at FROM prediction_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal membaca cache prediksi SQLite: {e}")
+                    row = None
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    result = json.loads(row[0])
+                    self._store_in_memory(key, row[1], result)
+                    self._hits_disk += 1
+                    return dict(result)
+
+            self._misses += 1
+            return None
+
+    def put(self, processed_text: str, result: dict):
+        if self.model_version is None:
+            return
+        key = self._key(processed_text)
+        now = time.time()
+        with self._lock:
+            self._store_in_memory(key, now, result)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO prediction_cache (key, model_version, result, created_at) VALUES (?, ?, ?, ?)",
+                        (key, self.model_version, json.dumps(result), now),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal menulis cache prediksi SQLite: {e}")
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= DISK_PRUNE_EVERY_PUTS:
+                    self._prune_disk(now)
+
+    def _prune_disk(self, now: float):
+        """Menghapus baris disk yang melewati TTL dan baris terlama di atas `db_max_entries`."""
+        self._puts_since_prune = 0
+        try:
+            expired = self._db.execute(
+                "DELETE FROM prediction_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            overflow = self._db.execute(
+                "DELETE FROM prediction_cache WHERE key IN ("
+                "SELECT key FROM prediction_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_entries,),
+            ).rowcount
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Gagal membersihkan cache prediksi SQLite: {e}")
+            return
+        self._pruned_disk += expired + overflow
+        if expired or overflow:
+            logger.info(f"Cache prediksi SQLite: {expired} entri kedaluwarsa dan {overflow} entri terlama dihapus.")
+
+    def _store_in_memory(self, key: str, created_at: float, result: dict):
+        self._entries[key] = (created_at, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits_memory + self._hits_disk + self._misses
+            return {
+                "model_version": self.model_version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self._db is not None,
+                "db_max_entries": self.db_max_entries,
+                "pruned_disk": self._pruned_disk,
+                "hits_memory": self._hits_memory,
+                "hits_disk": self._hits_disk,
+                "misses": self._misses,
+                "hit_rate": (self._hits_memory + self._hits_disk) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,298 @@
+# cekviral_project/app/services/text_preprocessing.py
+import re
+import string
+import logging
+import threading
+from functools import lru_cache
+
+from nltk.tokenize import word_tokenize
+from nltk.corpus import stopwords
+
+logger = logging.getLogger(__name__)
+
+# --- KAMUS SLANGWORDS ---
+slangwords = {"@": "di", "abis": "habis", "wtb": "beli", "masi": "masih", "wts": "jual", "wtt": "tukar", "bgt": "banget", "maks": "maksimal",
+              "plisss": "tolong", "bgttt": "banget", "indo": "indonesia", "bgtt": "banget", "ad": "ada", "rv": "redvelvet", "plis": "tolong",
+              "pls": "tolong", "cr": "sumber", "cod": "bayar ditempat", "adlh": "adalah", "afaik": "as far as i know", "ahaha": "haha", "aj": "saja",
+              "ajep-ajep": "dunia gemerlap", "ak": "saya", "akika": "aku", "akkoh": "aku", "akuwh": "aku", "alay": "norak", "alow": "halo", "ambilin": "ambilkan",
+              "ancur": "hancur", "anjrit": "anjing", "anter": "antar", "ap2": "apa-apa", "apasih": "apa sih", "apes": "sial", "aps": "apa", "aq": "saya",
+              "aquwh": "aku", "asbun": "asal bunyi", "aseekk": "asyik", "asekk": "asyik", "asem": "asam", "aspal": "asli tetapi palsu", "astul": "asal tulis",
+              "ato": "atau", "au ah": "tidak mau tahu", "awak": "saya", "ay": "sayang", "ayank": "sayang", "b4": "sebelum", "bakalan": "akan", "bandes": "bantuan desa",
+              "bangedh": "banget", "banpol": "bantuan polisi", "banpur": "bantuan tempur", "basbang": "basi", "bcanda": "bercanda", "bdg": "bandung", "begajulan": "nakal",
+              "beliin": "belikan", "bencong": "banci", "bentar": "sebentar", "ber3": "bertiga", "beresin": "membereskan", "bete": "bosan", "beud": "banget", "bg": "abang",
+              "bgmn": "bagaimana", "bgt": "banget", "bijimane": "bagaimana", "bintal": "bimbingan mental", "bkl": "akan", "bknnya": "bukannya", "blegug": "bodoh", "blh": "boleh",
+              "bln": "bulan", "blum": "belum", "bnci": "benci", "bnran": "yang benar", "bodor": "lucu", "bokap": "ayah", "boker": "buang air besar", "bokis": "bohong",
+              "boljug": "boleh juga", "bonek": "bocah nekat", "boyeh": "boleh", "br": "baru", "brg": "bareng", "bro": "saudara laki-laki", "bru": "baru", "bs": "bisa",
+              "bsen": "bosan", "bt": "buat", "btw": "ngomong-ngomong", "buaya": "tidak setia", "bubbu": "tidur", "bubu": "tidur", "bumil": "ibu hamil", "bw": "bawa",
+              "bwt": "buat", "byk": "banyak", "byrin": "bayarkan", "cabal": "sabar", "cadas": "keren", "calo": "makelar", "can": "belum", "capcus": "pergi",
+              "caper": "cari perhatian", "ce": "cewek", "cekal": "cegah tangkal", "cemen": "penakut", "cengengesan": "tertawa", "cepet": "cepat", "cew": "cewek", "chuyunk": "sayang",
+              "cimeng": "ganja", "cipika cipiki": "cium pipi kanan cium pipi kiri", "ciyh": "sih", "ckepp": "cakep", "ckp": "cakep", "cmiiw": "correct me if i'm wrong",
+              "cmpur": "campur", "cong": "banci", "conlok": "cinta lokasi", "cowwyy": "maaf", "cp": "siapa", "cpe": "capek", "cppe": "capek", "cucok": "cocok",
+              "cuex": "cuek", "cumi": "Cuma miscall", "cups": "culun", "curanmor": "pencurian kendaraan bermotor", "curcol": "curahan hati colongan", "cwek": "cewek",
+              "cyin": "cinta", "d": "di", "dah": "deh", "dapet": "dapat", "de": "adik", "dek": "adik", "demen": "suka", "deyh": "deh", "dgn": "dengan", "diancurin": "dihancurkan",
+              "dimaafin": "dimaafkan", "dimintak": "diminta", "disono": "di sana", "dket": "dekat", "dkk": "dan kawan-kawan", "dlu": "dulu", "dngn": "dengan", "dodol": "bodoh",
+              "doku": "uang", "dongs": "dong", "dpt": "dapat", "dri": "dari", "drmn": "darimana", "drtd": "dari tadi", "dst": "dan seterusnya", "dtg": "datang", "duh": "aduh",
+              "duren": "durian", "ed": "edisi", "egp": "emang gue pikirin", "eke": "aku", "elu": "kamu", "emangnya": "memangnya", "emng": "memang", "endak": "tidak", "enggak": "tidak",
+              "envy": "iri", "ex": "mantan", "fax": "facsimile", "fifo": "first in first out", "folbek": "follow back", "fyi": "sebagai informasi", "gaada": "tidak ada uang",
+              "gag": "tidak", "gaje": "tidak jelas", "gak papa": "tidak apa-apa", "gan": "juragan", "gaptek": "gagap teknologi", "gatek": "gagap teknologi", "gawe": "kerja",
+              "gbs": "tidak bisa", "gebetan": "orang yang disuka", "geje": "tidak jelas", "gepeng": "gelandangan dan pengemis", "ghiy": "lagi", "gile": "gila", "gimana": "bagaimana",
+              "gino": "gigi nongol", "githu": "gitu", "gj": "tidak jelas", "gmana": "bagaimana", "gn": "begini", "goblok": "bodoh", "golput": "golongan putih", "gowes": "mengayuh sepeda",
+              "gpny": "tidak punya", "gr": "gede rasa", "gretongan": "gratisan", "gtau": "tidak tahu", "gua": "saya", "guoblok": "goblok", "gw": "saya", "ha": "tertawa", "haha": "tertawa",
+              "hallow": "halo", "hankam": "pertahanan dan keamanan", "hehe": "he", "helo": "halo", "hey": "hai", "hlm": "halaman", "hny": "hanya", "hoax": "isu bohong", "hr": "hari",
+              "hrus": "harus", "hubdar": "perhubungan darat", "huff": "mengeluh", "hum": "rumah", "humz": "rumah", "ilang": "hilang", "ilfil": "tidak suka", "imho": "in my humble opinion",
+              "imoetz": "imut", "item": "hitam", "itungan": "hitungan", "iye": "iya", "ja": "saja", "jadiin": "jadi", "jaim": "jaga image", "jayus": "tidak lucu", "jdi": "jadi", "jem": "jam",
+              "jga": "juga", "jgnkan": "jangankan", "jir": "anjing", "jln": "jalan", "jomblo": "tidak punya pacar", "jubir": "juru bicara", "jutek": "galak", "k": "ke", "kab": "kabupaten",
+              "kabor": "kabur", "kacrut": "kacau", "kadiv": "kepala divisi", "kagak": "tidak", "kalo": "kalau", "kampret": "sialan", "kamtibmas": "keamanan dan ketertiban masyarakat",
+              "kamuwh": "kamu", "kanwil": "kantor wilayah", "karna": "karena", "kasubbag": "kepala subbagian", "katrok": "kampungan", "kayanya": "kayaknya", "kbr": "kabar", "kdu": "harus",
+              "kec": "kecamatan", "kejurnas": "kejuaraan nasional", "kekeuh": "keras kepala", "kel": "kelurahan", "kemaren": "kemarin", "kepengen": "mau", "kepingin": "mau",
+              "kepsek": "kepala sekolah", "kesbang": "kesatuan bangsa", "kesra": "kesejahteraan rakyat", "ketrima": "diterima", "kgiatan": "kegiatan", "kibul": "bohong", "kimpoi": "kawin",
+              "kl": "kalau", "klianz": "kalian", "kloter": "kelompok terbang", "klw": "kalau", "km": "kamu", "kmps": "kampus", "kmrn": "kemarin", "knal": "kenal", "knp": "kenapa",
+              "kodya": "kota madya", "komdis": "komisi disiplin", "komsov": "komunis sovyet", "kongkow": "kumpul bareng teman-teman", "kopdar": "kopi darat", "korup": "korupsi", "kpn": "kapan",
+              "krenz": "keren", "krm": "kirim", "kt": "kita", "ktmu": "ketemu", "ktr": "kantor", "kuper": "kurang pergaulan", "kw": "imitasi", "kyk": "seperti", "la": "lah", "lam": "salam",
+              "lamp": "lampiran", "lanud": "landasan udara", "latgab": "latihan gabungan", "lebay": "berlebihan", "leh": "boleh", "lelet": "lambat", "lemot": "lambat", "lgi": "lagi",
+              "lgsg": "langsung", "liat": "lihat", "litbang": "penelitian dan pengembangan", "lmyn": "lumayan", "lo": "kamu", "loe": "kamu", "lola": "lambat berfikir", "louph": "cinta",
+              "low": "kalau", "lp": "lupa", "luber": "langsung, umum, bebas, dan rahasia", "luchuw": "lucu", "lum": "belum", "luthu": "lucu", "lwn": "lawan", "maacih": "terima kasih",
+              "mabal": "bolos", "macem": "macam", "macih": "masih", "maem": "makan", "magabut": "makan gaji buta", "maho": "homo", "mak jang": "kaget", "maksain": "memaksa", "malem": "malam",
+              "mam": "makan", "maneh": "kamu", "maniez": "manis", "mao": "mau", "masukin": "masukkan", "melu": "ikut", "mepet": "dekat sekali", "mgu": "minggu", "migas": "minyak dan gas bumi",
+              "mikol": "minuman beralkohol", "miras": "minuman keras", "mlah": "malah", "mngkn": "mungkin", "mo": "mau", "mokad": "mati", "moso": "masa", "mpe": "sampai", "msk": "masuk",
+              "mslh": "masalah", "mt": "makan teman", "mubes": "musyawarah besar", "mulu": "melulu", "mumpung": "selagi", "munas": "musyawarah nasional", "muntaber": "muntah dan berak",
+              "musti": "mesti", "muupz": "maaf", "mw": "now watching", "n": "dan", "nanam": "menanam", "nanya": "bertanya", "napa": "kenapa", "napi": "narapidana",
+              "napza": "narkotika, alkohol, psikotropika, dan zat adiktif ", "narkoba": "narkotika, psikotropika, dan obat terlarang", "nasgor": "nasi goreng", "nda": "tidak", "ndiri": "sendiri",
+              "ne": "ini", "nekolin": "neokolonialisme", "nembak": "menyatakan cinta", "ngabuburit": "menunggu berbuka puasa", "ngaku": "mengaku", "ngambil": "mengambil", "nganggur": "tidak punya pekerjaan",
+              "ngapah": "kenapa", "ngaret": "terlambat", "ngasih": "memberikan", "ngebandel": "berbuat bandel", "ngegosip": "bergosip", "ngeklaim": "mengklaim", "ngeksis": "menjadi eksis", "ngeles": "berkilah",
+              "ngelidur": "menggigau", "ngerampok": "merampok", "ngga": "tidak", "ngibul": "berbohong", "ngiler": "mau", "ngiri": "iri", "ngisiin": "mengisikan", "ngmng": "bicara", "ngomong": "bicara",
+              "ngubek2": "mencari-cari", "ngurus": "mengurus", "nie": "ini", "nih": "ini", "niyh": "nih", "nmr": "nomor", "nntn": "nonton", "nobar": "nonton bareng", "np": "now playing", "ntar": "nanti",
+              "ntn": "nonton", "numpuk": "bertumpuk", "nutupin": "menutupi", "nyari": "mencari", "nyekar": "menyekar", "nyicil": "mencicil", "nyoblos": "mencoblos", "nyokap": "ibu", "ogah": "tidak mau",
+              "ol": "online", "ongkir": "ongkos kirim", "oot": "out of topic", "org2": "orang-orang", "ortu": "orang tua", "otda": "otonomi daerah", "otw": "on the way, sedang di jalan", "pacal": "pacar",
+              "pake": "pakai", "pala": "kepala", "pansus": "panitia khusus", "parpol": "partai politik", "pasutri": "pasangan suami istri", "pd": "pada", "pede": "percaya diri", "pelatnas": "pemusatan latihan nasional",
+              "pemda": "pemerintah daerah", "pemkot": "pemerintah kota", "pemred": "pemimpin redaksi", "penjas": "pendidikan jasmani", "perda": "peraturan daerah", "perhatiin": "perhatikan", "pesenan": "pesanan",
+              "pgang": "pegang", "pi": "tapi", "pilkada": "pemilihan kepala daerah", "pisan": "sangat", "pk": "penjahat kelamin", "plg": "paling", "pmrnth": "pemerintah", "polantas": "polisi lalu lintas",
+              "ponpes": "pondok pesantren", "pp": "pulang pergi", "prg": "pergi", "prnh": "pernah", "psen": "pesan", "pst": "pasti", "pswt": "pesawat", "pw": "posisi nyaman", "qmu": "kamu", "rakor": "rapat koordinasi",
+              "ranmor": "kendaraan bermotor", "re": "reply", "ref": "referensi", "rehab": "rehabilitasi", "rempong": "sulit", "repp": "balas", "restik": "reserse narkotika", "rhs": "rahasia", "rmh": "rumah"}
+
+# --- AKHIR KAMUS SLANGWORDS ---
+
+
+# --- FUNGSI PREPROCESSING TEKS ---
+def cleaningText(text):
+    text = re.sub(r'@[A-Za-z0-9_]+', '', text)
+    text = re.sub(r'#\w+', '', text)
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'\d+', '', text)
+    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ') # Menangani newline dan tab
+    text = re.sub(r'([,.!?()"])', r' \1 ', text)
+    text = re.sub(r'([a-zA-Z]+)[\"()_-]([a-zA-Z]+)', r'\1 \2', text)
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = re.sub(r'[^\x00-\x7F]+', '', text)
+    text = re.sub(r'\b(\w*[^aeiou\s])(nya|nua|neo)\b', r'\1 \2', text)
+    text = re.sub(r'\s+', ' ', text).strip() # Menangani spasi berlebih dan spasi awal/akhir
+    return text
+
+def casefoldingText(text):
+    text = text.lower()
+    return text
+
+def tokenizingText(text):
+    text = word_tokenize(text)
+    return text
+
+@lru_cache(maxsize=None)
+def get_stopwords() -> frozenset:
+    """Set stopword Indonesia + Inggris (NLTK) ditambah stopword informal; dibangun sekali."""
+    listStopwords = set(stopwords.words('indonesian'))
+    listStopwords1 = set(stopwords.words('english'))
+    listStopwords.update(listStopwords1)
+    listStopwords.update(['iya','yaa','gak','nya','na','sih','ku',"di","ga","ya","gaa","loh","kah","woi","woii","woy", "yg"])
+    return frozenset(listStopwords)
+
+def filteringText(text):
+    listStopwords = get_stopwords()
+    filtered = []
+    for txt in text:
+        if txt not in listStopwords:
+            filtered.append(txt)
+    text = filtered
+    return text
+
+def toSentence(list_words):
+    sentence = ' '.join(word for word in list_words)
+    return sentence
+
+def fix_slangwords(text):
+    words = text.split()
+    fixed_words = []
+    for word in words:
+        if word.lower() in slangwords:
+            fixed_words.append(slangwords[word.lower()])
+        else:
+            fixed_words.append(word)
+    fixed_text = ' '.join(fixed_words)
+    return fixed_text
+
+
+# --- ENGINE PREPROCESSING TERKOMPILASI ---
+
+# Tanda baca yang oleh cleaningText diberi spasi di kedua sisinya sebelum seluruh tanda baca dibuang
+_SPACED_PUNCTUATION = ',.!?()"'
+
+# Kata yang oleh tokenizer Treebank NLTK dipecah menjadi dua token (lihat NLTKWordTokenizer.CONTRACTIONS2)
+_SPLIT_CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+class TextPreprocessor:
+    """
+    Versi terkompilasi dari pipeline `cleaningText` -> `casefoldingText` -> `fix_slangwords`
+    -> `tokenizingText` -> `filteringText` -> `toSentence`.
+
+    Pola regex, set stopword, dan kamus slang (termasuk hasil tokenisasi nilainya) dibangun
+    sekali saat inisialisasi. Normalisasi dilakukan dengan lebih sedikit pass, dan tokenisasi
+    NLTK per kalimat digantikan oleh `str.split()` karena teks yang sudah dibersihkan hanya
+    berisi huruf ASCII. Jika `match_slang_phrases` aktif, kunci slang multi-kata seperti
+    "au ah" ikut dikenali (pipeline lama hanya mencocokkan per kata sehingga kunci tersebut
+    tidak pernah cocok).
+    """
+
+    def __init__(self, slang_dict: dict | None = None, match_slang_phrases: bool = True):
+        slang_dict = slangwords if slang_dict is None else slang_dict
+
+        # Spasi Unicode (NBSP, U+2009, U+3000, ...) dinormalisasi dulu seperti pipeline lama, sebelum
+        # karakter non-ASCII dibuang. Penghapusan @mention, #hashtag, URL, dan angka tetap berurutan
+        # karena satu pass gabungan memberi hasil berbeda (mis. "http#tag" menjadi "" alih-alih "http").
+        self._whitespace_pattern = re.compile(r'\s+')
+        self._strip_patterns = tuple(re.compile(pattern) for pattern in (
+            r'@[A-Za-z0-9_]+', r'#\w+', r'http\S+', r'\d+'
+        ))
+        # Tanda baca lain sudah diberi spasi, jadi hanya '_' dan '-' yang bisa menempel di antara huruf
+        self._joined_word_pattern = re.compile(r'([a-zA-Z]+)[_-]([a-zA-Z]+)')
+        self._punctuation_table = str.maketrans({
+            char: (' ' if char in _SPACED_PUNCTUATION else None) for char in string.punctuation
+        })
+        self._non_ascii_pattern = re.compile(r'[^\x00-\x7F]+')
+        self._suffix_pattern = re.compile(r'\b(\w*[^aeiou\s])(nya|nua|neo)\b')
+
+        self._stopwords = get_stopwords()
+
+        # Nilai slang ditokenisasi sekali di sini, bukan di setiap pemanggilan
+        self._slang_tokens = {}
+        self._slang_phrases = {}
+        for key, value in slang_dict.items():
+            tokens = tuple(word_tokenize(value))
+            key_words = tuple(key.lower().split())
+            if len(key_words) == 1:
+                self._slang_tokens[key_words[0]] = tokens
+            elif match_slang_phrases and len(key_words) > 1:
+                self._slang_phrases.setdefault(key_words[0], []).append((key_words, tokens))
+        for candidates in self._slang_phrases.values():
+            candidates.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def clean(self, text: str) -> str:
+        """Setara dengan `cleaningText` diikuti `casefoldingText`, tanpa normalisasi spasi akhir."""
+        text = self._whitespace_pattern.sub(' ', text)
+        for pattern in self._strip_patterns:
+            text = pattern.sub('', text)
+        text = self._joined_word_pattern.sub(r'\1 \2', text)
+        text = text.translate(self._punctuation_table)
+        text = self._non_ascii_pattern.sub('', text)
+        text = self._suffix_pattern.sub(r'\1 \2', text)
+        return text.lower()
+
+    def _word_tokens(self, word: str) -> tuple:
+        if word in _SPLIT_CONTRACTIONS:
+            return _SPLIT_CONTRACTIONS[word]
+        if word.isalpha():
+            return (word,)
+        # Karakter kontrol ASCII yang lolos pembersihan: serahkan ke tokenizer NLTK
+        return tuple(word_tokenize(word))
+
+    def preprocess(self, text: str) -> str:
+        if not isinstance(text, str):
+            logger.warning(f"Input to preprocess_text_for_ml is not a string: {type(text)}. Attempting conversion.")
+            text = str(text)
+
+        words = self.clean(text).split()
+        stopword_set = self._stopwords
+        slang_tokens = self._slang_tokens
+        slang_phrases = self._slang_phrases
+
+        kept = []
+        i = 0
+        n_words = len(words)
+        while i < n_words:
+            word = words[i]
+            tokens = None
+            if word in slang_phrases:
+                for key_words, phrase_tokens in slang_phrases[word]:
+                    if tuple(words[i:i + len(key_words)]) == key_words:
+                        tokens = phrase_tokens
+                        i += len(key_words)
+                        break
+            if tokens is None:
+                tokens = slang_tokens.get(word)
+                if tokens is None:
+                    tokens = self._word_tokens(word)
+                i += 1
+            for token in tokens:
+                if token not in stopword_set:
+                    kept.append(token)
+        return ' '.join(kept)
+
+    def preprocess_batch(self, texts: list[str]) -> list[str]:
+        return [self.preprocess(text) for text in texts]
+
+
+_preprocessor: TextPreprocessor | None = None
+_preprocessor_lock = threading.Lock()
+
+
+def get_text_preprocessor() -> TextPreprocessor:
+    """Mengembalikan instance `TextPreprocessor` bersama (dibangun saat pertama kali dipakai)."""
+    global _preprocessor
+    if _preprocessor is None:
+        with _preprocessor_lock:
+            if _preprocessor is None:
+                _preprocessor = TextPreprocessor()
+    return _preprocessor
+
+
+def preprocess_text_for_ml(text: str) -> str:
+    """
+    Menggabungkan semua langkah pra-pemrosesan teks ke dalam satu pipeline,
+    termasuk penanganan karakter baris baru dan spasi berlebihan secara otomatis.
+    """
+    return get_text_preprocessor().preprocess(text)
+
+
+def preprocess_batch(texts: list[str]) -> list[str]:
+    """Pra-pemrosesan sekumpulan teks sekaligus dengan engine yang sama."""
+    return get_text_preprocessor().preprocess_batch(texts)
+
+
+def preprocess_text_for_ml_legacy(text: str) -> str:
+    """
+    Pipeline pra-pemrosesan asli (satu langkah per fungsi). Dipertahankan sebagai
+    acuan untuk uji kesetaraan dan benchmark `TextPreprocessor`.
+    """
+    if not isinstance(text, str):
+        logger.warning(f"Input to preprocess_text_for_ml is not a string: {type(text)}. Attempting conversion.")
+        text = str(text)
+
+    # Ini adalah langkah pertama yang kuat untuk menangani newline dan spasi berlebihan.
+    # Digunakan di sini dan di cleaningText untuk redundansi jika ada urutan pemanggilan yang berbeda.
+    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    text = cleaningText(text)
+    text = casefoldingText(text)
+    text = fix_slangwords(text)
+    tokens = tokenizingText(text)
+    tokens = filteringText(tokens)
+    text = toSentence(tokens)
+    return text
+# --- AKHIR ENGINE PREPROCESSING TERKOMPILASI ---
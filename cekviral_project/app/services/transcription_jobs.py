@@ -0,0 +1,329 @@
+# cekviral_project/app/services/transcription_jobs.py
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app.core.config import settings
+from app.services import content_analyzer
+from app.services.content_analyzer import TranscriptionError
+from app.utils.helpers import video_id_from_url
+
+logger = logging.getLogger(__name__)
+
+
+class GcpTranscriptionBackend:
+    """yt-dlp + ffmpeg untuk audio, Google Cloud Speech-to-Text untuk transkripsi."""
+
+    name = "gcp"
+
+    async def download(self, video_url: str) -> str:
+        return await content_analyzer.download_audio(video_url)
+
+    async def transcribe(self, audio_path: str) -> str:
+        return await content_analyzer.transcribe_audio(audio_path)
+
+    def cleanup(self, audio_path: str):
+        content_analyzer.remove_audio(audio_path)
+
+
+class StandInTranscriptionBackend:
+    """
+    Backend pengganti untuk pengujian offline: tidak memanggil yt-dlp maupun Google API.
+    Setiap tahap hanya menunggu `delay_seconds` lalu mengembalikan transkrip contoh yang
+    deterministik untuk URL tersebut.
+    """
+
+    name = "stand_in"
+
+    def __init__(self, delay_seconds: float = 0.5):
+        self.delay_seconds = delay_seconds
+
+    async def download(self, video_url: str) -> str:
+        await asyncio.sleep(self.delay_seconds)
+        return video_url
+
+    async def transcribe(self, audio_path: str) -> str:
+        await asyncio.sleep(self.delay_seconds)
+        return (
+            f"Transkrip contoh untuk video {video_id_from_url(audio_path)}. Beredar kabar bahwa pemerintah "
+            "akan membagikan bantuan tunai kepada seluruh warga melalui tautan pendaftaran di media sosial."
+        )
+
+    def cleanup(self, audio_path: str):
+        pass
+
+
+@dataclass
+class TranscriptionJob:
+    job_id: str
+    video_id: str
+    url: str
+    status: str = "queued"  # queued | downloading | transcribing | done | failed
+    transcript: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # Hasil verifikasi transkrip per (pengguna, URL pemohon) (diisi oleh endpoint status)
+    results: dict = field(default_factory=dict)
+    # detached: ada klien yang akan mengambil hasil lewat /verify/jobs/{handle}, jadi job tidak boleh
+    # dibatalkan; subscribers: jumlah request yang sedang menunggu job ini secara langsung
+    detached: bool = False
+    subscribers: int = 0
+    task: asyncio.Task | None = field(default=None, repr=False)
+    # Di-set setiap kali status berubah lalu diganti event baru; dipakai `wait` alih-alih polling
+    status_changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def set_status(self, status: str):
+        self.status = status
+        self.updated_at = time.time()
+        self.status_changed.set()
+        self.status_changed = asyncio.Event()
+
+
+class TranscriptionJobManager:
+    """
+    Menjalankan transkripsi video sebagai job di latar belakang.
+
+    Submit untuk video yang sama (dikenali dari ID video, bukan URL mentah) selama job masih
+    berjalan atau masih disimpan akan mendapat job yang sama; setiap pemohon yang tidak menunggu
+    langsung mendapat handle sendiri (lihat `open_handle`) yang mengingat URL yang ia kirim.
+    Jumlah unduhan dan transkripsi yang berjalan bersamaan dibatasi semaphore terpisah. Transkrip
+    yang berhasil disimpan di cache LRU per ID video sehingga verifikasi berikutnya tidak perlu
+    membuat job baru.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concurrent_downloads: int,
+        max_concurrent_transcriptions: int,
+        transcript_cache_max_entries: int,
+        transcript_cache_ttl_seconds: float,
+        job_ttl_seconds: float,
+    ):
+        self.backend = backend
+        self.max_concurrent_downloads = max(1, max_concurrent_downloads)
+        self.max_concurrent_transcriptions = max(1, max_concurrent_transcriptions)
+        self.transcript_cache_max_entries = max(1, transcript_cache_max_entries)
+        self.transcript_cache_ttl_seconds = transcript_cache_ttl_seconds
+        self.job_ttl_seconds = job_ttl_seconds
+
+        self._download_slots: asyncio.Semaphore | None = None
+        self._transcription_slots: asyncio.Semaphore | None = None
+        self._jobs: dict[str, TranscriptionJob] = {}
+        self._jobs_by_video: dict[str, TranscriptionJob] = {}
+        # handle -> (job_id, URL yang dikirim pemohon)
+        self._handles: dict[str, tuple[str, str]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._transcripts: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+        self._submitted_total = 0
+        self._deduplicated_total = 0
+        self._failed_total = 0
+
+    def _slots(self) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        # Semaphore dibuat di event loop yang sedang berjalan (bukan saat import modul)
+        if self._download_slots is None:
+            self._download_slots = asyncio.Semaphore(self.max_concurrent_downloads)
+            self._transcription_slots = asyncio.Semaphore(self.max_concurrent_transcriptions)
+        return self._download_slots, self._transcription_slots
+
+    def cached_transcript(self, video_id: str) -> str | None:
+        entry = self._transcripts.get(video_id)
+        if entry is None:
+            return None
+        created_at, transcript = entry
+        if time.time() - created_at > self.transcript_cache_ttl_seconds:
+            del self._transcripts[video_id]
+            return None
+        self._transcripts.move_to_end(video_id)
+        return transcript
+
+    def _cache_transcript(self, video_id: str, transcript: str):
+        self._transcripts[video_id] = (time.time(), transcript)
+        self._transcripts.move_to_end(video_id)
+        while len(self._transcripts) > self.transcript_cache_max_entries:
+            self._transcripts.popitem(last=False)
+
+    def get(self, job_id: str) -> TranscriptionJob | None:
+        return self._jobs.get(job_id)
+
+    def open_handle(self, job_id: str, video_url: str) -> str:
+        """
+        Membuat handle untuk satu pemohon job `job_id`. Job yang digabungkan tetap mengunduh dari
+        URL pemohon pertama, sedangkan hasil lewat handle ini memakai `video_url` milik pemohonnya.
+        """
+        handle = uuid.uuid4().hex
+        self._handles[handle] = (job_id, video_url)
+        return handle
+
+    def resolve(self, handle: str) -> tuple[TranscriptionJob, str] | None:
+        """Job beserta URL yang dikirim pemohon untuk `handle`; None jika tidak ada atau kedaluwarsa."""
+        entry = self._handles.get(handle)
+        if entry is None:
+            return None
+        job_id, video_url = entry
+        job = self._jobs.get(job_id)
+        if job is None:
+            del self._handles[handle]
+            return None
+        return job, video_url
+
+    def submit(self, video_url: str, detached: bool = True) -> TranscriptionJob:
+        """
+        Membuat job baru, atau mengembalikan job yang sudah ada untuk video yang sama.
+        `detached=False` berarti pemanggil menunggu job secara langsung dan wajib memanggil
+        `release` setelahnya; job seperti itu dibatalkan jika semua penunggunya pergi.
+        """
+        self._expire_jobs()
+        video_id = video_id_from_url(video_url)
+        job = self._jobs_by_video.get(video_id)
+        if job is not None and job.status != "failed":
+            self._deduplicated_total += 1
+            logger.info(f"Video {video_id} sudah punya job {job.job_id} ({job.status}); digabungkan.")
+        else:
+            job = TranscriptionJob(job_id=uuid.uuid4().hex, video_id=video_id, url=video_url)
+            self._jobs[job.job_id] = job
+            self._jobs_by_video[video_id] = job
+            self._submitted_total += 1
+
+            job.task = asyncio.create_task(self._run(job))
+            self._tasks.add(job.task)
+            job.task.add_done_callback(lambda task, job=job: self._on_task_done(job, task))
+            logger.info(f"Job transkripsi {job.job_id} dibuat untuk video {video_id} (backend={self.backend.name}).")
+
+        if detached:
+            job.detached = True
+        else:
+            job.subscribers += 1
+        return job
+
+    def _on_task_done(self, job: TranscriptionJob, task: asyncio.Task):
+        self._tasks.discard(task)
+        # Task yang dibatalkan sebelum sempat berjalan tidak melewati _run; tandai gagal agar tidak dipakai ulang
+        if not job.finished:
+            job.error = "Maaf, transkripsi dibatalkan."
+            job.set_status("failed")
+
+    def release(self, job: TranscriptionJob):
+        """Penunggu langsung selesai atau pergi; batalkan job jika tidak ada lagi yang membutuhkannya."""
+        job.subscribers -= 1
+        if job.subscribers <= 0 and not job.detached and not job.finished and job.task is not None:
+            logger.info(f"Tidak ada lagi yang menunggu job transkripsi {job.job_id}; job dibatalkan.")
+            job.task.cancel()
+
+    async def wait(
+        self, job: TranscriptionJob, timeout: float | None = None, on_status: Callable[[str], None] | None = None
+    ) -> TranscriptionJob:
+        """
+        Menunggu sampai job selesai (atau timeout); mengembalikan job dalam kondisi terakhirnya.
+        `on_status` dipanggil setiap kali status job berubah.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_status = None
+        while True:
+            if on_status is not None and job.status != last_status:
+                last_status = job.status
+                on_status(job.status)
+            if job.finished:
+                break
+            status_changed = job.status_changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(status_changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return job
+
+    async def _run(self, job: TranscriptionJob):
+        download_slots, transcription_slots = self._slots()
+        audio_path = None
+        try:
+            async with download_slots:
+                job.set_status("downloading")
+                audio_path = await self.backend.download(job.url)
+            async with transcription_slots:
+                job.set_status("transcribing")
+                transcript = await self.backend.transcribe(audio_path)
+            job.transcript = transcript
+            self._cache_transcript(job.video_id, transcript)
+            job.set_status("done")
+            logger.info(f"Job transkripsi {job.job_id} selesai ({len(transcript)} karakter).")
+        except TranscriptionError as e:
+            job.error = str(e)
+            job.set_status("failed")
+            self._failed_total += 1
+        except asyncio.CancelledError:
+            job.error = "Maaf, transkripsi dibatalkan."
+            job.set_status("failed")
+            raise
+        except Exception as e:
+            logger.error(f"Job transkripsi {job.job_id} gagal: {e}", exc_info=True)
+            job.error = "Maaf, terjadi kesalahan pada layanan transkripsi suara."
+            job.set_status("failed")
+            self._failed_total += 1
+        finally:
+            if audio_path:
+                self.backend.cleanup(audio_path)
+
+    def _expire_jobs(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.updated_at > self.job_ttl_seconds:
+                del self._jobs[job_id]
+                if self._jobs_by_video.get(job.video_id) is job:
+                    del self._jobs_by_video[job.video_id]
+        for handle, (job_id, _) in list(self._handles.items()):
+            if job_id not in self._jobs:
+                del self._handles[handle]
+
+    async def stop(self):
+        """Membatalkan job yang masih berjalan. Dipanggil saat shutdown aplikasi."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("Job transkripsi dihentikan.")
+
+    def stats(self) -> dict:
+        statuses: dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "backend": self.backend.name,
+            "jobs": statuses,
+            "running_tasks": len(self._tasks),
+            "max_concurrent_downloads": self.max_concurrent_downloads,
+            "max_concurrent_transcriptions": self.max_concurrent_transcriptions,
+            "submitted_total": self._submitted_total,
+            "deduplicated_total": self._deduplicated_total,
+            "failed_total": self._failed_total,
+            "cached_transcripts": len(self._transcripts),
+        }
+
+
+def _create_backend():
+    if settings.TRANSCRIPTION_BACKEND == "stand_in":
+        logger.warning("Backend transkripsi pengganti (stand_in) aktif; video tidak benar-benar ditranskripsi.")
+        return StandInTranscriptionBackend(settings.TRANSCRIPTION_STAND_IN_DELAY_SECONDS)
+    return GcpTranscriptionBackend()
+
+
+transcription_jobs = TranscriptionJobManager(
+    backend=_create_backend(),
+    max_concurrent_downloads=settings.TRANSCRIPTION_MAX_CONCURRENT_DOWNLOADS,
+    max_concurrent_transcriptions=settings.TRANSCRIPTION_MAX_CONCURRENT_TRANSCRIPTIONS,
+    transcript_cache_max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+    transcript_cache_ttl_seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+    job_ttl_seconds=settings.TRANSCRIPTION_JOB_TTL_SECONDS,
+)
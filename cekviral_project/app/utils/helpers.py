@@ -1,87 +1,209 @@
 # cekviral_project/app/utils/helpers.py
 import re
-from urllib.parse import urlparse
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import logging
 
 logger = logging.getLogger(__name__)
 
 # --- Pola-pola URL ---
 
-# Platform video yang didukung oleh yt-dlp
-DIRECT_VIDEO_PATTERNS = [
-    re.compile(r"https://(www\.|m\.)?youtube\.com/(watch\?v=|embed/|shorts/|live/)"),
-    re.compile(r"https://youtu\.be/"),
-    re.compile(r"https://(www\.|m\.)?tiktok\.com/(@[^/]+)?/video/"),
-    re.compile(r"https://(www\.)?instagram\.com/(reel|reels|tv)/[^/]+/?"),
-    re.compile(r"https://(www\.)?(twitter|x)\.com/[^/]+/status/\d+"),
-    re.compile(r"https://(www\.)?dailymotion\.com/video/"),
-    re.compile(r"https://(www\.)?vimeo\.com/\d+"),
-    re.compile(r"https://(www\.|m\.)?facebook\.com/([^/]+/videos/|watch/?\?v=|video\.php\?v=)"),
-    re.compile(r"https://fb\.watch/")
-]
+# Pola URL umum; dikompilasi sekali saat modul dimuat
+URL_PATTERN = re.compile(
+    r'^(?:http|ftp)s?://'
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
+    r'localhost|'
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+    r'(?::\d+)?'
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
-# Platform sosial media yang kontennya sulit/tidak didukung untuk diekstrak (dinamis/membutuhkan login)
-UNSUPPORTED_SOCIAL_PATTERNS = [
-    re.compile(r"https://(www\.|m\.)?instagram\.com/p/"), # Postingan Instagram (foto/carousel)
-    re.compile(r"https://(www\.|m\.)?youtube\.com/post/"), # Postingan YouTube
-    re.compile(r"https://(www\.|m\.)?facebook\.com/(story\.php|photo)"), # Postingan Facebook
-]
+# Aturan path per platform video/sosial: (pola atas path+query, kategori), dicek berurutan.
+# Path yang tidak cocok dengan aturan mana pun diperlakukan sebagai artikel web biasa.
+PLATFORM_PATH_RULES = {
+    "youtube.com": [(r"/(watch\?|embed/|shorts/|live/)", "direct_video"), (r"/post/", "unsupported_social")],
+    "youtu.be": [(r"/.", "direct_video")],
+    "tiktok.com": [(r"/(@[^/]+)?/video/", "direct_video")],
+    "instagram.com": [(r"/(reel|reels|tv)/[^/]+", "direct_video"), (r"/p/", "unsupported_social")],
+    "twitter.com": [(r"/[^/]+/status/\d+", "direct_video")],
+    "x.com": [(r"/[^/]+/status/\d+", "direct_video")],
+    "dailymotion.com": [(r"/video/", "direct_video")],
+    "vimeo.com": [(r"/\d+", "direct_video")],
+    "facebook.com": [
+        (r"/([^/]+/videos/|watch/?\?v=|video\.php\?v=)", "direct_video"),
+        (r"/(story\.php|photo)", "unsupported_social"),
+    ],
+    "fb.watch": [(r"/", "direct_video")],
+}
+
+# Plugin ekstraktor khusus untuk media yang paling sering dicek (lihat html_extractor.EXTRACTOR_PLUGINS)
+ARTICLE_EXTRACTORS = {
+    "detik.com": "detik",
+    "kompas.com": "kompas",
+    "tribunnews.com": "tribun",
+    "antaranews.com": "antaranews",
+    "turnbackhoax.id": "turnbackhoax",
+    "cnnindonesia.com": "cnnindonesia",
+    "liputan6.com": "liputan6",
+    "kumparan.com": "kumparan",
+    "tempo.co": "tempo",
+    "okezone.com": "okezone",
+}
 
-# Kata kunci untuk mendeteksi situs jurnal/akademik yang tidak akan kita proses
-ACADEMIC_KEYWORDS = [
-    'journal', 'jurnal', 'doi.org', 'arxiv.org', 'researchgate.net', 
-    'academia.edu', 'ieee.org', 'acm.org', 'springer.com', 'sciencedirect.com'
+# Situs jurnal/akademik yang tidak akan kita proses, ditambah kata kunci di host atau path
+ACADEMIC_HOSTS = [
+    'doi.org', 'arxiv.org', 'researchgate.net', 'academia.edu', 'ieee.org',
+    'acm.org', 'springer.com', 'sciencedirect.com'
 ]
+ACADEMIC_KEYWORD_PATTERN = re.compile(r'journal|jurnal', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class UrlRoute:
+    category: str            # 'direct_video', 'unsupported_social', 'academic', 'web_article', 'unknown'
+    extractor: str = "generic"
+
+
+@dataclass(frozen=True)
+class _HostEntry:
+    path_rules: tuple[tuple[re.Pattern, UrlRoute], ...]
+    default: UrlRoute
+
+
+WEB_ARTICLE_ROUTE = UrlRoute("web_article")
+ACADEMIC_ROUTE = UrlRoute("academic")
+
+
+def _build_routing_table() -> dict[str, _HostEntry]:
+    """Tabel host -> aturan routing, dibangun (dan regex-nya dikompilasi) sekali saat modul dimuat."""
+    table = {
+        host: _HostEntry(
+            tuple((re.compile(pattern, re.IGNORECASE), UrlRoute(category)) for pattern, category in rules),
+            WEB_ARTICLE_ROUTE,
+        )
+        for host, rules in PLATFORM_PATH_RULES.items()
+    }
+    for host, extractor in ARTICLE_EXTRACTORS.items():
+        table[host] = _HostEntry((), UrlRoute("web_article", extractor))
+    for host in ACADEMIC_HOSTS:
+        table[host] = _HostEntry((), ACADEMIC_ROUTE)
+    return table
+
+
+URL_ROUTES = _build_routing_table()
+
+# Parameter query pelacak yang tidak memengaruhi isi halaman
+TRACKING_QUERY_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'spm', 'share', 'amp', 'outputtype', 'utm',
+}
+TRACKING_QUERY_PREFIXES = ('utm_',)
+
+# Subdomain versi mobile/AMP yang isinya sama dengan versi desktop (m.kompas.com, amp.kompas.com, dst.)
+MOBILE_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+AMP_PATH_PATTERN = re.compile(r'(^/amp(?=/)|/amp/?$)', re.IGNORECASE)
 
 # --- Fungsi-fungsi Helper ---
 
 def is_url(input_string: str) -> bool:
     if not isinstance(input_string, str):
         return False
-    url_pattern = re.compile(
-        r'^(?:http|ftp)s?://'
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
-        r'localhost|'
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-        r'(?::\d+)?'
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return bool(url_pattern.match(input_string))
+    return bool(URL_PATTERN.match(input_string))
 
 
-def classify_url(url: str) -> str:
+def route_url(url: str) -> UrlRoute:
     """
-    Mengklasifikasikan URL ke dalam beberapa kategori untuk diproses lebih lanjut.
-    Returns: 'direct_video', 'unsupported_social', 'academic', 'web_article', 'unknown'
+    Kategori URL dan plugin ekstraktornya, dengan satu pencarian host di URL_ROUTES (subdomain
+    ikut host induknya: news.detik.com -> detik.com). Hanya aturan path milik host tersebut yang dicek.
     """
     if not url or not isinstance(url, str):
-        return 'unknown'
-        
+        return UrlRoute("unknown")
+
     try:
-        # Cek jika ini adalah link video langsung
-        for pattern in DIRECT_VIDEO_PATTERNS:
-            if pattern.match(url):
-                logger.info(f"URL classified as 'direct_video': {url}")
-                return "direct_video"
-
-        # Cek jika ini adalah link dari platform sosial yang tidak didukung
-        for pattern in UNSUPPORTED_SOCIAL_PATTERNS:
-            if pattern.match(url):
-                logger.warning(f"URL classified as 'unsupported_social': {url}")
-                return "unsupported_social"
-        
-        # Cek jika ini adalah link dari situs akademik/jurnal
-        parsed_url = urlparse(url)
-        hostname = parsed_url.hostname or ""
-        path = parsed_url.path or ""
-        for keyword in ACADEMIC_KEYWORDS:
-            if keyword in hostname or keyword in path:
-                logger.warning(f"URL classified as 'academic': {url}")
-                return "academic"
-
-        # Jika lolos semua pengecekan di atas, anggap sebagai artikel web umum
-        logger.info(f"URL classified as 'web_article': {url}")
-        return "web_article"
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+        entry = None
+        while host:
+            entry = URL_ROUTES.get(host)
+            if entry is not None:
+                break
+            _, _, host = host.partition(".")
+
+        route = WEB_ARTICLE_ROUTE
+        if entry is not None:
+            route = next((rule for pattern, rule in entry.path_rules if pattern.match(target)), entry.default)
+
+        if route.category == "web_article" and (
+            ACADEMIC_KEYWORD_PATTERN.search(parts.hostname or "") or ACADEMIC_KEYWORD_PATTERN.search(parts.path)
+        ):
+            return ACADEMIC_ROUTE
+        return route
 
     except Exception as e:
-        logger.error(f"Error classifying URL {url}: {e}", exc_info=True)
-        return "unknown"
\ No newline at end of file
+        logger.error(f"Error routing URL {url}: {e}", exc_info=True)
+        return UrlRoute("unknown")
+
+
+def classify_url(url: str) -> str:
+    """
+    Mengklasifikasikan URL ke dalam beberapa kategori untuk diproses lebih lanjut.
+    Returns: 'direct_video', 'unsupported_social', 'academic', 'web_article', 'unknown'
+    """
+    category = route_url(url).category
+    if category in ("unsupported_social", "academic"):
+        logger.warning(f"URL classified as '{category}': {url}")
+    else:
+        logger.info(f"URL classified as '{category}': {url}")
+    return category
+
+
+def canonical_url(url: str) -> str:
+    """
+    Bentuk kanonik URL artikel untuk kunci cache: skema/host huruf kecil, tanpa fragment, port
+    default, parameter pelacak (utm_*, fbclid, dst.), penanda AMP, dan prefix host www./m./amp.;
+    parameter query lainnya diurutkan.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+
+    path = AMP_PATH_PATTERN.sub('', parts.path) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_QUERY_PARAMS and not key.lower().startswith(TRACKING_QUERY_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+# Pola ID video per platform; grup pertama adalah ID-nya
+VIDEO_ID_PATTERNS = [
+    ("youtube", re.compile(r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/)|youtu\.be/)([A-Za-z0-9_-]{6,})")),
+    ("tiktok", re.compile(r"tiktok\.com/(?:@[^/]+/)?video/(\d+)")),
+    ("instagram", re.compile(r"instagram\.com/(?:reel|reels|tv)/([^/?#]+)")),
+    ("twitter", re.compile(r"(?:twitter|x)\.com/[^/]+/status/(\d+)")),
+    ("dailymotion", re.compile(r"dailymotion\.com/video/([A-Za-z0-9]+)")),
+    ("vimeo", re.compile(r"vimeo\.com/(\d+)")),
+    ("facebook", re.compile(r"facebook\.com/(?:[^/]+/videos/(?:[^/]+/)?|watch/?\?v=|video\.php\?v=)(\d+)")),
+    ("fbwatch", re.compile(r"fb\.watch/([A-Za-z0-9_-]+)")),
+]
+
+
+def video_id_from_url(url: str) -> str:
+    """
+    Kunci video yang stabil untuk satu video ("youtube:dQw4w9WgXcQ"), terlepas dari variasi URL
+    (youtu.be vs youtube.com, parameter tambahan, dst.). Jika platform tidak dikenali, URL kanonik dipakai.
+    """
+    for platform, pattern in VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return f"{platform}:{match.group(1)}"
+    return f"url:{canonical_url(url)}"
@@ -0,0 +1,49 @@
+# cekviral_project/app/utils/single_flight.py
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Menggabungkan pekerjaan identik yang sedang berjalan bersamaan.
+
+    Pemanggil pertama untuk sebuah kunci menjalankan `work()` sebagai task tersendiri; pemanggil lain
+    dengan kunci yang sama selama task itu belum selesai menunggu hasil task yang sama. Setelah selesai
+    kuncinya langsung dilepas, jadi tidak ada hasil yang disimpan lebih lama dari pekerjaannya sendiri.
+    Pembatalan satu pemanggil (mis. klien memutus koneksi) tidak membatalkan pekerjaan bagi yang lain.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._leaders_total = 0
+        self._coalesced_total = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable]) -> tuple[object, bool]:
+        """Mengembalikan (hasil, shared); shared True jika hasil berasal dari pekerjaan pemanggil lain."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self._coalesced_total += 1
+        else:
+            self._leaders_total += 1
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task), shared
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Tandai exception sudah diambil walaupun semua pemanggil sudah pergi
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Pekerjaan single-flight {key[:60]} gagal: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "leaders_total": self._leaders_total,
+            "coalesced_total": self._coalesced_total,
+        }
@@ -0,0 +1,139 @@
+# cekviral_project/benchmarks/bench_html_extraction.py
+"""
+Membandingkan ekstraktor artikel selectolax (html_extractor) dengan ekstraktor BeautifulSoup lama:
+waktu ekstraksi per halaman dan kemiripan teks hasilnya (Jaccard kata dan recall kata hasil ekstraktor lama).
+
+Halaman fixture disimpan di satu direktori beserta index.json ({"nama_file.html": "url asli"}) agar
+petunjuk selector per domain ikut teruji. Unduh fixture dari daftar URL (satu per baris):
+    python -m benchmarks.bench_html_extraction --download urls.txt --fixtures benchmarks/fixtures/articles
+
+Lalu jalankan benchmark dari direktori cekviral_project:
+    python -m benchmarks.bench_html_extraction --fixtures benchmarks/fixtures/articles --repeat 20 --json html.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from app.services.content_analyzer import extract_text_from_html_bs4
+from app.services.html_extractor import extract_article_text
+
+
+def download_fixtures(urls_path: str, fixtures_dir: str):
+    """Menyimpan halaman dari daftar URL ke direktori fixture dan memperbarui index.json."""
+    import httpx
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    index_path = os.path.join(fixtures_dir, "index.json")
+    index = json.load(open(index_path, encoding="utf-8")) if os.path.exists(index_path) else {}
+    with open(urls_path, encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    with httpx.Client(follow_redirects=True, timeout=20, headers={"User-Agent": "Mozilla/5.0"}) as client:
+        for url in urls:
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"Gagal mengunduh {url}: {e}")
+                continue
+            parts = urlsplit(url)
+            slug = re.sub(r"[^a-zA-Z0-9]+", "_", f"{parts.hostname}{parts.path}").strip("_")[:120]
+            filename = f"{slug}.html"
+            with open(os.path.join(fixtures_dir, filename), "w", encoding="utf-8") as out:
+                out.write(response.text)
+            index[filename] = url
+            print(f"Disimpan: {filename}")
+
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+
+def time_call(fn, repeat: int) -> tuple[float, object]:
+    """Median waktu (ms) dari `repeat` kali pemanggilan, beserta hasil pemanggilan terakhir."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def compare_texts(fast: str | None, legacy: str | None) -> dict:
+    fast_words = set((fast or "").lower().split())
+    legacy_words = set((legacy or "").lower().split())
+    union = fast_words | legacy_words
+    return {
+        "jaccard": len(fast_words & legacy_words) / len(union) if union else 1.0,
+        "legacy_recall": len(fast_words & legacy_words) / len(legacy_words) if legacy_words else 1.0,
+        "fast_chars": len(fast or ""),
+        "legacy_chars": len(legacy or ""),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join("benchmarks", "fixtures", "articles"))
+    parser.add_argument("--download", help="File berisi daftar URL untuk diunduh sebagai fixture.")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    args = parser.parse_args()
+
+    if args.download:
+        download_fixtures(args.download, args.fixtures)
+        return 0
+
+    index_path = os.path.join(args.fixtures, "index.json")
+    index = json.load(open(index_path, encoding="utf-8")) if os.path.exists(index_path) else {}
+    files = sorted(name for name in os.listdir(args.fixtures) if name.endswith(".html")) if os.path.isdir(args.fixtures) else []
+    if not files:
+        print(f"Tidak ada fixture .html di {args.fixtures}. Gunakan --download untuk mengunduhnya.")
+        return 1
+
+    rows = []
+    print(f"{'halaman':<48} {'bs4 ms':>8} {'cepat ms':>9} {'speedup':>8} {'jaccard':>8} {'recall':>7}")
+    for name in files:
+        with open(os.path.join(args.fixtures, name), encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        url = index.get(name)
+        legacy_ms, legacy_text = time_call(lambda: extract_text_from_html_bs4(html), args.repeat)
+        fast_ms, fast_text = time_call(lambda: extract_article_text(html, url), args.repeat)
+        row = {
+            "page": name,
+            "url": url,
+            "bytes": len(html.encode("utf-8")),
+            "legacy_ms": legacy_ms,
+            "fast_ms": fast_ms,
+            "speedup": legacy_ms / fast_ms if fast_ms else 0.0,
+            **compare_texts(fast_text, legacy_text),
+        }
+        rows.append(row)
+        print(f"{name[:48]:<48} {legacy_ms:>8.2f} {fast_ms:>9.2f} {row['speedup']:>7.1f}x "
+              f"{row['jaccard']:>8.3f} {row['legacy_recall']:>7.3f}")
+
+    total_legacy = sum(row["legacy_ms"] for row in rows)
+    total_fast = sum(row["fast_ms"] for row in rows)
+    summary = {
+        "pages": len(rows),
+        "total_legacy_ms": total_legacy,
+        "total_fast_ms": total_fast,
+        "speedup": total_legacy / total_fast if total_fast else 0.0,
+        "median_jaccard": statistics.median(row["jaccard"] for row in rows),
+        "median_legacy_recall": statistics.median(row["legacy_recall"] for row in rows),
+    }
+    print(f"Total: bs4 {total_legacy:.1f} ms, cepat {total_fast:.1f} ms ({summary['speedup']:.1f}x); "
+          f"median Jaccard {summary['median_jaccard']:.3f}, median recall {summary['median_legacy_recall']:.3f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "pages": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
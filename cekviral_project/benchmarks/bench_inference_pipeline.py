@@ -0,0 +1,239 @@
+# cekviral_project/benchmarks/bench_inference_pipeline.py
+"""
+Benchmark offline pipeline klasifikasi /verify tanpa memanggil endpoint: waktu pra-pemrosesan
+(`preprocess_text_for_ml`), tokenisasi, `invoke` interpreter, dan post-processing diukur terpisah
+pada beberapa tingkat konkurensi (setiap worker = satu request berisi satu teks).
+
+Input berupa teks sintetis berbahasa Indonesia dengan panjang bervariasi (pendek, sedang, panjang)
+dan/atau teks rekaman (file .txt satu teks per baris, atau CSV berkolom `text`). Tanpa --model,
+interpreter pengganti (benchmarks/stand_in_interpreter.py) dipakai sehingga benchmark tetap
+berjalan tanpa file model. Tokenizer IndoBERT tetap dibutuhkan (--tokenizer untuk path lokal).
+
+Jalankan dari direktori cekviral_project:
+    python -m benchmarks.bench_inference_pipeline --json hasil.json
+    python -m benchmarks.bench_inference_pipeline --model models/indobert_model.tflite --concurrency 1 2 4 8
+    python -m benchmarks.bench_inference_pipeline --corpus sample.csv --compare hasil_sebelumnya.json
+"""
+import argparse
+import csv
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import ml_model
+from app.services.interpreter_pool import InterpreterPool
+from app.services.text_preprocessing import preprocess_text_for_ml
+from benchmarks.stand_in_interpreter import StandInInterpreter
+
+STAGES = ("preprocess", "tokenize", "invoke", "postprocess")
+
+# Jumlah kata per kelas panjang input sintetis
+_LENGTH_CLASSES = {"pendek": 15, "sedang": 80, "panjang": 400}
+
+_SYNTHETIC_WORDS = (
+    "pemerintah bantuan warga vaksin covid presiden menteri kesehatan banjir jakarta bmkg cuaca "
+    "ekstrem peringatan video beredar viral pesan berantai whatsapp hoaks fakta klarifikasi polisi "
+    "rekening saldo penipuan link daftar gratis subsidi bbm harga naik turun pasar tradisional "
+    "sekolah siswa ujian nasional jalan tol provinsi sumatera jawa barat timur tengah masyarakat "
+    "diminta waspada segera sebarkan keluarga sumber resmi kementerian dinas laporan data"
+).split()
+_SYNTHETIC_NOISE = ["@admin", "#viral", "https://bit.ly/abc123", "2024", "gak", "bgt", "yg", "sy", "tdk", "!!!"]
+
+
+def synthetic_corpus(per_class: int, seed: int = 0) -> list[tuple[str, str]]:
+    """Teks sintetis (kelas panjang, teks) dengan sedikit mention, hashtag, URL, angka, dan slang."""
+    rng = random.Random(seed)
+    corpus = []
+    for length_class, n_words in _LENGTH_CLASSES.items():
+        for _ in range(per_class):
+            words = [
+                rng.choice(_SYNTHETIC_NOISE) if rng.random() < 0.08 else rng.choice(_SYNTHETIC_WORDS)
+                for _ in range(n_words)
+            ]
+            corpus.append((length_class, " ".join(words).capitalize() + "."))
+    return corpus
+
+
+def recorded_corpus(path: str) -> list[tuple[str, str]]:
+    """Teks rekaman dari .txt (satu per baris) atau CSV berkolom `text`."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            texts = [row.get("text") or "" for row in csv.DictReader(f)]
+        else:
+            texts = [line for line in f]
+    return [("rekaman", text.strip()) for text in texts if text.strip()]
+
+
+def run_request(raw_text: str) -> dict[str, float]:
+    """Menjalankan satu teks melewati semua tahap pipeline dan mengembalikan durasi per tahap (ms)."""
+    timings = {}
+    start = time.perf_counter()
+    processed_text = preprocess_text_for_ml(raw_text)
+    timings["preprocess"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    window_owners, window_inputs = ml_model.encode_windows([processed_text])
+    timings["tokenize"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    window_logits = ml_model.invoke_windows(window_inputs)
+    timings["invoke"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    [(probabilities_array, windows_used)] = ml_model.aggregate_window_logits(window_logits, window_owners, window_inputs, 1)
+    ml_model._build_prediction_result(probabilities_array, 0.0, windows_used=windows_used)
+    timings["postprocess"] = (time.perf_counter() - start) * 1000
+
+    timings["total"] = sum(timings[stage] for stage in STAGES)
+    return timings
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    array = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(array.mean()),
+        "p50": float(np.percentile(array, 50)),
+        "p99": float(np.percentile(array, 99)),
+        "max": float(array.max()),
+    }
+
+
+def run_level(corpus: list[tuple[str, str]], concurrency: int, repeat: int) -> dict:
+    """Satu tingkat konkurensi: semua teks x repeat dijalankan oleh `concurrency` worker thread."""
+    jobs = [(length_class, text) for _ in range(repeat) for length_class, text in corpus]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(lambda job: run_request(job[1]), jobs))
+    wall_s = time.perf_counter() - start
+
+    by_class: dict[str, list[float]] = {}
+    for (length_class, _), timing in zip(jobs, timings):
+        by_class.setdefault(length_class, []).append(timing["total"])
+    return {
+        "concurrency": concurrency,
+        "requests": len(jobs),
+        "wall_s": wall_s,
+        "throughput_per_s": len(jobs) / wall_s if wall_s else 0.0,
+        "stages_ms": {stage: summarize([t[stage] for t in timings]) for stage in STAGES + ("total",)},
+        "total_ms_by_length": {length_class: summarize(values) for length_class, values in by_class.items()},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(levels: list[dict], baseline: dict):
+    """Mencetak perubahan p50/p99 per tahap terhadap hasil JSON sebelumnya (positif = lebih lambat)."""
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    print(f"\nPerbandingan dengan commit {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for level in levels:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        changes = []
+        for stage in STAGES + ("total",):
+            for q in ("p50", "p99"):
+                old, new = before["stages_ms"][stage][q], level["stages_ms"][stage][q]
+                if old:
+                    changes.append(f"{stage}.{q} {(new - old) / old * 100:+.1f}%")
+        print(f"  konkurensi {level['concurrency']}: " + ", ".join(changes))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="File TFLite; tanpa opsi ini interpreter pengganti yang dipakai.")
+    parser.add_argument("--tokenizer", default=ml_model.INDOBERT_TOKENIZER_NAME, help="Nama atau path tokenizer.")
+    parser.add_argument("--corpus", help="Teks rekaman (.txt satu per baris atau CSV berkolom text).")
+    parser.add_argument("--synthetic", type=int, default=20, help="Jumlah teks sintetis per kelas panjang (0 = tanpa).")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3, help="Berapa kali setiap teks dijalankan per tingkat.")
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # Dibaca lebih dulu agar --compare dan --json boleh menunjuk file yang sama
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    corpus = synthetic_corpus(args.synthetic) if args.synthetic > 0 else []
+    if args.corpus:
+        corpus += recorded_corpus(args.corpus)
+    if not corpus:
+        parser.error("Tidak ada input: gunakan --synthetic > 0 dan/atau --corpus.")
+
+    if args.model:
+        _, interpreter_name = ml_model.resolve_interpreter_class()
+        factory = lambda: ml_model.create_interpreter(args.model)
+    else:
+        interpreter_name = "stand-in"
+        factory = StandInInterpreter
+
+    ml_model.INDOBERT_TOKENIZER_NAME = args.tokenizer
+    ml_model.global_tokenizer = ml_model.load_tokenizer()
+    ml_model.global_interpreter_pool = InterpreterPool(
+        factory, size=max(args.concurrency), sequence_lengths=ml_model.get_sequence_buckets(),
+        batch_sizes=ml_model.get_batch_buckets(),
+        max_batch_interpreters=settings.INFERENCE_BATCH_INTERPRETERS_PER_SLOT,
+    )
+
+    for _, text in corpus:
+        run_request(text)  # pemanasan (juga memuat stopwords dan regex pra-pemrosesan)
+
+    levels = []
+    print(f"Input: {len(corpus)} teks | interpreter: {interpreter_name} | pool: {ml_model.global_interpreter_pool.size}")
+    print(f"{'konk':>4} {'req/s':>8} " + " ".join(f"{stage + ' p50/p99':>22}" for stage in STAGES + ("total",)))
+    for concurrency in args.concurrency:
+        level = run_level(corpus, concurrency, args.repeat)
+        levels.append(level)
+        print(f"{concurrency:>4} {level['throughput_per_s']:>8.1f} " + " ".join(
+            f"{level['stages_ms'][stage]['p50']:>10.2f}/{level['stages_ms'][stage]['p99']:<11.2f}"
+            for stage in STAGES + ("total",)
+        ))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "interpreter": interpreter_name,
+            "model": args.model,
+            "corpus": args.corpus,
+            "synthetic_per_class": args.synthetic,
+            "repeat": args.repeat,
+            "settings": {
+                "SEQUENCE_BUCKETS": ml_model.global_interpreter_pool.sequence_lengths,
+                "INTERPRETER_NUM_THREADS": settings.INTERPRETER_NUM_THREADS,
+                "LONG_DOCUMENT_MODE": settings.LONG_DOCUMENT_MODE,
+                "LONG_DOCUMENT_MAX_WINDOWS": settings.LONG_DOCUMENT_MAX_WINDOWS,
+            },
+        },
+        "levels": levels,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if baseline is not None:
+        print_comparison(levels, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# cekviral_project/benchmarks/bench_model_variants.py
+"""
+Membandingkan varian model (float32, float16, int8) pada sampel berlabel dari korpus news_data:
+latensi p50/p99 per teks, throughput batch, memori model, akurasi terhadap label, dan kesesuaian
+dengan baseline float32 (termasuk seberapa sering `final_label_thresholded` berubah).
+
+Sampel berupa CSV dengan kolom `text` dan `label` (HOAKS/FAKTA; boleh kosong). Sampel bisa
+diekspor langsung dari tabel news_data (koneksi lewat variabel environment DB_*):
+    python -m benchmarks.bench_model_variants --export-sample sample.csv --limit 500
+
+Lalu jalankan benchmark dari direktori cekviral_project:
+    python -m benchmarks.bench_model_variants --sample sample.csv
+    python -m benchmarks.bench_model_variants --sample sample.csv --variants float32 int8 --json variants.json
+
+Varian yang filenya belum ada di models/ dilewati (lihat benchmarks/convert_model_variants.py).
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+from app.core.config import settings
+from app.services import ml_model
+from app.services.interpreter_pool import InterpreterPool
+from app.services.ml_model import (
+    MODEL_VARIANT_FILES, MODELS_DIR, create_interpreter, get_batch_buckets, get_sequence_buckets, load_tokenizer,
+)
+
+# Status turnbackhoax.id yang dianggap HOAKS / FAKTA saat mengekspor sampel
+_HOAX_STATUSES = {"HOAKS", "HOAX", "SALAH", "DISINFORMASI", "MISINFORMASI", "FITNAH", "PENIPUAN", "MISLEADING"}
+_FACT_STATUSES = {"FAKTA", "BENAR"}
+
+
+def status_to_label(status: str | None) -> str:
+    """Memetakan kolom status news_data ke label model; string kosong jika tidak dikenali."""
+    status = (status or "").strip().upper()
+    if status in _HOAX_STATUSES:
+        return "HOAKS"
+    if status in _FACT_STATUSES:
+        return "FAKTA"
+    return ""
+
+
+def export_sample(path: str, limit: int):
+    """Mengambil sampel acak dari tabel news_data dan menyimpannya sebagai CSV (text, label)."""
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    conn = psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT status, title, description FROM news_data ORDER BY random() LIMIT %s;",
+                (limit,),
+            )
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["text", "label"])
+        for status, title, description in rows:
+            text = " ".join(part for part in (title, description) if part)
+            if text.strip():
+                writer.writerow([text, status_to_label(status)])
+    print(f"{len(rows)} baris news_data diekspor ke {path}")
+
+
+def load_sample(path: str) -> tuple[list[str], list[str]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = [row for row in csv.DictReader(f) if (row.get("text") or "").strip()]
+    return [row["text"] for row in rows], [(row.get("label") or "").strip().upper() for row in rows]
+
+
+def current_rss_mb() -> float | None:
+    """RSS proses saat ini (Linux); None jika /proc tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run_variant(model_path: str, texts: list[str], batch_size: int) -> dict:
+    """Memuat satu varian ke pool interpreter baru, lalu mengukur latensi, throughput, dan prediksinya."""
+    rss_before = current_rss_mb()
+    load_start = time.perf_counter()
+    ml_model.global_interpreter_pool = InterpreterPool(
+        lambda: create_interpreter(model_path), size=1, sequence_lengths=get_sequence_buckets(),
+        batch_sizes=get_batch_buckets(),
+        max_batch_interpreters=settings.INFERENCE_BATCH_INTERPRETERS_PER_SLOT,
+    )
+    load_s = time.perf_counter() - load_start
+    rss_after = current_rss_mb()
+
+    ml_model.predict_content_hoax_status_batch(texts[:1])  # pemanasan
+
+    # Latensi per teks (satu request = satu teks), jalur prediksi yang sama dengan /verify
+    latencies_ms = []
+    results = []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(ml_model.predict_content_hoax_status_batch([text])[0])
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    # Throughput dengan batch seperti yang dibentuk InferenceBatcher
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        ml_model.predict_content_hoax_status_batch(texts[offset:offset + batch_size])
+    batch_s = time.perf_counter() - start
+
+    ml_model.global_interpreter_pool = None
+    return {
+        "model_path": model_path,
+        "file_mb": os.path.getsize(model_path) / 1024 / 1024,
+        "rss_delta_mb": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        "load_s": load_s,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 0.50),
+            "p99": percentile(latencies_ms, 0.99),
+            "mean": statistics.fmean(latencies_ms) if latencies_ms else 0.0,
+        },
+        "throughput_per_s": len(texts) / batch_s if batch_s else 0.0,
+        "results": results,
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], labels: list[str]) -> dict:
+    """Akurasi terhadap label dan kesesuaian keputusan terhadap baseline float32."""
+    ok = [i for i, r in enumerate(results) if r["status"] == "success" and baseline[i]["status"] == "success"]
+    flips = Counter(
+        f"{baseline[i]['final_label_thresholded']} -> {results[i]['final_label_thresholded']}"
+        for i in ok if baseline[i]["final_label_thresholded"] != results[i]["final_label_thresholded"]
+    )
+    fakta_deltas = [abs(results[i]["probabilities"]["FAKTA"] - baseline[i]["probabilities"]["FAKTA"]) for i in ok]
+
+    labeled = [i for i in ok if labels[i] in ("HOAKS", "FAKTA")]
+    decided = [i for i in labeled if results[i]["final_label_thresholded"] in ("HOAKS", "FAKTA")]
+    return {
+        "compared": len(ok),
+        "label_agreement": sum(
+            results[i]["predicted_label_model"] == baseline[i]["predicted_label_model"] for i in ok
+        ) / len(ok) if ok else 0.0,
+        "thresholded_flips": sum(flips.values()),
+        "thresholded_flip_rate": sum(flips.values()) / len(ok) if ok else 0.0,
+        "thresholded_flip_types": dict(flips.most_common()),
+        "fakta_prob_abs_delta": {
+            "mean": statistics.fmean(fakta_deltas) if fakta_deltas else 0.0,
+            "max": max(fakta_deltas, default=0.0),
+        },
+        "labeled": len(labeled),
+        "accuracy": sum(results[i]["predicted_label_model"] == labels[i] for i in labeled) / len(labeled) if labeled else None,
+        "thresholded_coverage": len(decided) / len(labeled) if labeled else None,
+        "thresholded_accuracy": sum(
+            results[i]["final_label_thresholded"] == labels[i] for i in decided
+        ) / len(decided) if decided else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", help="CSV berkolom text,label.")
+    parser.add_argument("--export-sample", help="Ekspor sampel acak dari tabel news_data ke CSV ini lalu keluar.")
+    parser.add_argument("--limit", type=int, default=500, help="Jumlah baris yang diekspor dari news_data.")
+    parser.add_argument("--variants", nargs="+", choices=list(MODEL_VARIANT_FILES), default=list(MODEL_VARIANT_FILES))
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--batch-size", type=int, default=16, help="Ukuran batch untuk pengukuran throughput.")
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    args = parser.parse_args()
+
+    if args.export_sample:
+        export_sample(args.export_sample, args.limit)
+        return 0
+    if not args.sample:
+        parser.error("--sample wajib diisi (atau gunakan --export-sample untuk membuatnya).")
+
+    texts, labels = load_sample(args.sample)
+    variants = ["float32"] + [v for v in args.variants if v != "float32"]
+    ml_model.global_tokenizer = load_tokenizer()
+
+    report = {}
+    baseline = None
+    for variant in variants:
+        model_path = os.path.join(args.models_dir, MODEL_VARIANT_FILES[variant])
+        if not os.path.exists(model_path):
+            print(f"Varian {variant} dilewati: {model_path} tidak ditemukan.")
+            if variant == "float32":
+                return 1
+            continue
+        measured = run_variant(model_path, texts, args.batch_size)
+        results = measured.pop("results")
+        if baseline is None:
+            baseline = results
+        measured["comparison"] = compare(results, baseline, labels)
+        report[variant] = measured
+
+    print(f"Sampel: {len(texts)} teks ({sum(label in ('HOAKS', 'FAKTA') for label in labels)} berlabel)")
+    print(f"{'varian':>8} {'file MB':>8} {'RSS MB':>7} {'p50 ms':>7} {'p99 ms':>7} {'teks/s':>7} "
+          f"{'akurasi':>8} {'sama f32':>9} {'flip':>5} {'flip %':>7}")
+    for variant, row in report.items():
+        comparison = row["comparison"]
+        rss = f"{row['rss_delta_mb']:.1f}" if row["rss_delta_mb"] is not None else "-"
+        accuracy = f"{comparison['accuracy']:.3f}" if comparison["accuracy"] is not None else "-"
+        print(f"{variant:>8} {row['file_mb']:>8.1f} {rss:>7} {row['latency_ms']['p50']:>7.2f} "
+              f"{row['latency_ms']['p99']:>7.2f} {row['throughput_per_s']:>7.1f} {accuracy:>8} "
+              f"{comparison['label_agreement']:>9.3f} {comparison['thresholded_flips']:>5} "
+              f"{comparison['thresholded_flip_rate'] * 100:>6.2f}%")
+        for flip, count in comparison["thresholded_flip_types"].items():
+            print(f"{'':>10}{flip}: {count}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"sample_size": len(texts), "variants": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# cekviral_project/benchmarks/bench_preprocessing.py
+"""
+Uji kesetaraan dan benchmark throughput `TextPreprocessor` terhadap pipeline pra-pemrosesan lama.
+
+Jalankan dari direktori cekviral_project:
+    python -m benchmarks.bench_preprocessing --docs 200 --words 3000
+    python -m benchmarks.bench_preprocessing --corpus transkrip.txt   # satu dokumen per baris
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from app.services.text_preprocessing import (
+    TextPreprocessor,
+    preprocess_text_for_ml_legacy,
+    slangwords,
+)
+
+# Kosakata sintetis yang meniru transkrip video / artikel berbahasa Indonesia
+_BASE_WORDS = [
+    "pemerintah", "vaksin", "berita", "beredar", "informasi", "masyarakat", "warga", "jakarta",
+    "presiden", "menteri", "kesehatan", "bantuan", "sosial", "polisi", "viral", "video", "klaim",
+    "hoaks", "fakta", "menurut", "sumber", "resmi", "diketahui", "tersebut", "bahwa", "yang",
+    "dan", "di", "ke", "dari", "ini", "itu", "tidak", "sudah", "akan", "bisa", "kami", "mereka",
+    "Rumahnya", "Bukunya", "Kerjanya", "cannot", "gonna", "wanna", "anti-hoaks", "e_ktp",
+    "COVID-19", "Rp100.000", "2024", "café", "naïve", "—", "“kutipan”", "(catatan)",
+]
+_DECORATIONS = [
+    "https://contoh.go.id/berita?id=123", "@akun_resmi", "#CekFakta", "!!!", "?", ",", ".",
+    '"', "'", ":", ";", "\n", "\t", "\r\n", "  ",
+]
+
+
+def build_synthetic_corpus(n_docs: int, n_words: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    single_slang = [key for key in slangwords if " " not in key]
+    docs = []
+    for _ in range(n_docs):
+        parts = []
+        for _ in range(n_words):
+            roll = rng.random()
+            if roll < 0.15:
+                parts.append(rng.choice(single_slang))
+            elif roll < 0.25:
+                parts.append(rng.choice(_DECORATIONS))
+            else:
+                parts.append(rng.choice(_BASE_WORDS))
+        docs.append(" ".join(parts))
+    return docs
+
+
+def load_corpus(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def check_parity(corpus: list[str], preprocessor: TextPreprocessor) -> list[int]:
+    """Mengembalikan indeks dokumen yang hasilnya berbeda dari pipeline lama."""
+    return [
+        i for i, doc in enumerate(corpus)
+        if preprocessor.preprocess(doc) != preprocess_text_for_ml_legacy(doc)
+    ]
+
+
+def time_run(fn, corpus: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100, help="Jumlah dokumen sintetis.")
+    parser.add_argument("--words", type=int, default=2000, help="Jumlah kata per dokumen sintetis.")
+    parser.add_argument("--corpus", help="File teks berisi satu dokumen per baris (menggantikan korpus sintetis).")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan; waktu terbaik yang dilaporkan.")
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_synthetic_corpus(args.docs, args.words)
+    total_chars = sum(len(doc) for doc in corpus)
+
+    # Uji kesetaraan memakai mode tanpa frasa slang multi-kata, karena pipeline lama tidak pernah mencocokkannya
+    parity_preprocessor = TextPreprocessor(match_slang_phrases=False)
+    mismatches = check_parity(corpus, parity_preprocessor)
+
+    phrase_preprocessor = TextPreprocessor()
+    phrase_ok = phrase_preprocessor.preprocess("au ah gelap") == parity_preprocessor.preprocess("tidak mau tahu gelap")
+
+    legacy_s = time_run(lambda docs: [preprocess_text_for_ml_legacy(doc) for doc in docs], corpus, args.repeat)
+    engine_s = time_run(phrase_preprocessor.preprocess_batch, corpus, args.repeat)
+
+    result = {
+        "docs": len(corpus),
+        "chars": total_chars,
+        "parity_mismatches": len(mismatches),
+        "multiword_slang_ok": phrase_ok,
+        "legacy_s": legacy_s,
+        "engine_s": engine_s,
+        "legacy_docs_per_s": len(corpus) / legacy_s,
+        "engine_docs_per_s": len(corpus) / engine_s,
+        "engine_mb_per_s": total_chars / engine_s / 1e6,
+        "speedup": legacy_s / engine_s,
+    }
+
+    print(f"Dokumen: {result['docs']} ({total_chars / 1e6:.2f} juta karakter)")
+    print(f"Kesetaraan dengan pipeline lama: {len(corpus) - len(mismatches)}/{len(corpus)} identik")
+    print(f"Frasa slang multi-kata dikenali: {'ya' if phrase_ok else 'TIDAK'}")
+    print(f"Pipeline lama : {legacy_s:.3f} s ({result['legacy_docs_per_s']:.1f} dok/s)")
+    print(f"Engine baru   : {engine_s:.3f} s ({result['engine_docs_per_s']:.1f} dok/s, {result['engine_mb_per_s']:.2f} MB/s)")
+    print(f"Speedup       : {result['speedup']:.2f}x")
+
+    if mismatches:
+        first = corpus[mismatches[0]]
+        print("\nContoh dokumen berbeda (200 karakter pertama):", repr(first[:200]))
+        print("  lama :", preprocess_text_for_ml_legacy(first)[:200])
+        print("  baru :", parity_preprocessor.preprocess(first)[:200])
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    return 1 if mismatches or not phrase_ok else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# cekviral_project/benchmarks/bench_runtime_footprint.py
+"""
+Membandingkan waktu import, waktu muat model, dan RSS puncak antara jalur inferensi ringan
+(runtime TFLite mandiri + tokenizer cepat) dan jalur lama (TensorFlow penuh + BertTokenizer Python).
+Setiap jalur diukur di proses Python terpisah agar angkanya tidak saling memengaruhi. Jalur
+TensorFlow membutuhkan `pip install -r requirements-benchmark.txt`.
+
+Juga mengukur tambahan RSS untuk setiap interpreter yang dibuat seperti satu slot pool (batch 1 untuk
+setiap bucket panjang sekuens, lalu setiap bucket batch lain), yaitu biaya memori satu pasangan bucket
+di INFERENCE_BATCH_BUCKETS / INFERENCE_BATCH_INTERPRETERS_PER_SLOT.
+
+Jalankan dari direktori cekviral_project:
+    python -m benchmarks.bench_runtime_footprint
+    python -m benchmarks.bench_runtime_footprint --model models/indobert_model.tflite --json footprint.json
+    python -m benchmarks.bench_runtime_footprint --batch-buckets 1 2 4 8 16
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app.services.ml_model import FINE_TUNED_MODEL_FILE, INDOBERT_TOKENIZER_NAME, get_batch_buckets, get_sequence_buckets
+
+_CHILD_TEMPLATE = """
+import json, resource, time
+start = time.perf_counter()
+{imports}
+import_s = time.perf_counter() - start
+
+load_s = None
+model_path = {model_path!r}
+try:
+    start = time.perf_counter()
+    interpreter = Interpreter(model_path=model_path)
+    interpreter.allocate_tensors()
+    tokenizer = Tokenizer.from_pretrained({tokenizer_name!r})
+    load_s = time.perf_counter() - start
+except Exception as e:
+    load_error = str(e)
+else:
+    load_error = None
+
+print(json.dumps({{
+    "import_s": import_s,
+    "load_s": load_s,
+    "load_error": load_error,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+# Membuat interpreter satu per satu seperti PooledInterpreter dan mencatat RSS puncak setelah masing-masing
+# (invoke pertama ikut dijalankan karena delegate bisa mengalokasikan buffer baru saat itu)
+_INTERPRETERS_TEMPLATE = """
+import json, resource
+import numpy as np
+{imports}
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+results, interpreters = [], []
+baseline = rss_mb()
+for batch_size, sequence_length in {shapes!r}:
+    interpreter = Interpreter(model_path={model_path!r})
+    try:
+        for detail in interpreter.get_input_details():
+            interpreter.resize_tensor_input(detail["index"], [batch_size, sequence_length])
+        interpreter.allocate_tensors()
+        for detail in interpreter.get_input_details():
+            interpreter.set_tensor(detail["index"], np.zeros(detail["shape"], dtype=detail["dtype"]))
+        interpreter.invoke()
+    except Exception as e:
+        results.append({{"batch_size": batch_size, "sequence_length": sequence_length, "error": str(e)}})
+        continue
+    interpreters.append(interpreter)
+    results.append({{"batch_size": batch_size, "sequence_length": sequence_length, "max_rss_mb": rss_mb()}})
+
+print(json.dumps({{"baseline_rss_mb": baseline, "interpreters": results}}))
+"""
+
+_PATHS = {
+    "slim": (
+        "try:\n"
+        "    from ai_edge_litert.interpreter import Interpreter\n"
+        "except ImportError:\n"
+        "    from tflite_runtime.interpreter import Interpreter\n"
+        "import numpy\n"
+        "from transformers import BertTokenizerFast as Tokenizer"
+    ),
+    "tensorflow": (
+        "import tensorflow as tf\n"
+        "Interpreter = tf.lite.Interpreter\n"
+        "from transformers import BertTokenizer as Tokenizer"
+    ),
+}
+
+
+def measure(path_name: str, model_path: str) -> dict:
+    code = _CHILD_TEMPLATE.format(
+        imports=_PATHS[path_name], model_path=model_path, tokenizer_name=INDOBERT_TOKENIZER_NAME
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "gagal"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_interpreters(model_path: str, sequence_lengths: list[int], batch_sizes: list[int]) -> dict:
+    shapes = [(1, sequence_length) for sequence_length in sequence_lengths] + [
+        (batch_size, sequence_length) for sequence_length in sequence_lengths for batch_size in batch_sizes if batch_size > 1
+    ]
+    code = _INTERPRETERS_TEMPLATE.format(imports=_PATHS["slim"], model_path=model_path, shapes=shapes)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "gagal"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join("models", FINE_TUNED_MODEL_FILE))
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    parser.add_argument("--sequence-buckets", type=int, nargs="+", default=get_sequence_buckets())
+    parser.add_argument("--batch-buckets", type=int, nargs="+", default=get_batch_buckets())
+    args = parser.parse_args()
+
+    results = {name: measure(name, args.model) for name in _PATHS}
+
+    print(f"{'jalur':<11} {'import s':>9} {'muat s':>8} {'RSS puncak MB':>14}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<11} tidak tersedia: {result['error']}")
+            continue
+        load_s = f"{result['load_s']:.2f}" if result["load_s"] is not None else "-"
+        print(f"{name:<11} {result['import_s']:>9.2f} {load_s:>8} {result['max_rss_mb']:>14.1f}")
+        if result["load_error"]:
+            print(f"{'':<11} (model/tokenizer tidak dimuat: {result['load_error']})")
+
+    footprint = measure_interpreters(args.model, sorted(set(args.sequence_buckets)), sorted(set(args.batch_buckets)))
+    results["interpreters"] = footprint
+    print("\nRSS per interpreter (jalur ringan), seperti satu slot pool:")
+    if "error" in footprint:
+        print(f"tidak tersedia: {footprint['error']}")
+    else:
+        print(f"{'batch x sekuens':<16} {'RSS puncak MB':>14} {'tambahan MB':>12}")
+        previous = footprint["baseline_rss_mb"]
+        for item in footprint["interpreters"]:
+            shape = f"{item['batch_size']} x {item['sequence_length']}"
+            if "error" in item:
+                print(f"{shape:<16} gagal: {item['error']}")
+                continue
+            print(f"{shape:<16} {item['max_rss_mb']:>14.1f} {item['max_rss_mb'] - previous:>12.1f}")
+            previous = item["max_rss_mb"]
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# cekviral_project/benchmarks/bench_sequence_buckets.py
+"""
+Laporan latensi yang dihemat oleh bucket panjang sekuens dibandingkan padding penuh ke MAX_SEQUENCE_LENGTH.
+
+Membutuhkan file models/indobert_model.tflite dan tokenizer IndoBERT. Jalankan dari direktori cekviral_project:
+    python -m benchmarks.bench_sequence_buckets --corpus klaim.txt   # satu klaim per baris
+    python -m benchmarks.bench_sequence_buckets --buckets 32 64 128 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from app.services.interpreter_pool import InterpreterPool
+from app.services.ml_model import FINE_TUNED_MODEL_FILE, MAX_SEQUENCE_LENGTH, create_interpreter, load_tokenizer
+from app.services.text_preprocessing import preprocess_batch
+
+# Contoh klaim pendek bergaya pesan berantai WhatsApp, dipakai jika --corpus tidak diberikan
+_SAMPLE_CLAIMS = [
+    "Pemerintah bagikan bantuan 5 juta rupiah untuk semua warga, klik link berikut untuk daftar sekarang juga!",
+    "Vaksin covid mengandung microchip untuk melacak masyarakat, sebarkan ke keluarga anda",
+    "Minum air hangat dicampur lemon setiap pagi bisa menyembuhkan kanker stadium akhir",
+    "Mulai besok semua kendaraan bermotor wajib ganti plat nomor warna putih, denda 1 juta",
+    "Beredar video banjir besar di Jakarta hari ini, warga diminta mengungsi segera",
+    "Presiden resmikan jalan tol baru yang menghubungkan dua provinsi di pulau Sumatera",
+    "BMKG mengeluarkan peringatan dini cuaca ekstrem untuk wilayah Jawa Barat pekan ini",
+    "Pesan berantai: jangan angkat telepon dari nomor tidak dikenal karena bisa menguras saldo rekening",
+    "Kementerian Kesehatan mengumumkan jadwal imunisasi campak gratis di seluruh puskesmas "
+    "mulai bulan depan, orang tua diminta membawa buku KIA dan kartu identitas anak saat datang.",
+    "Ditemukan telur palsu dari plastik beredar di pasar tradisional, ciri-cirinya cangkang lebih mengkilap "
+    "dan tidak berbau amis, masyarakat diminta waspada dan segera melapor ke dinas perdagangan setempat. "
+    "Informasi ini disebarkan ulang oleh banyak akun media sosial tanpa menyebutkan sumber resmi.",
+]
+
+
+def load_corpus(path: str | None) -> list[str]:
+    if not path:
+        return _SAMPLE_CLAIMS
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def time_invoke(shaped, encoded_row: dict, pad_token_id: int, repeat: int) -> float:
+    """Median latensi invoke (ms) untuk satu sampel pada interpreter yang sudah di-resize."""
+    shaped.run_encoded([encoded_row], pad_token_id)  # pemanasan
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        shaped.run_encoded([encoded_row], pad_token_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="File teks berisi satu klaim per baris.")
+    parser.add_argument("--buckets", type=int, nargs="+", default=[32, 64, MAX_SEQUENCE_LENGTH])
+    parser.add_argument("--repeat", type=int, default=10, help="Jumlah invoke per teks untuk setiap shape.")
+    parser.add_argument("--model", default=os.path.join("models", FINE_TUNED_MODEL_FILE))
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil dalam format JSON ke path ini.")
+    args = parser.parse_args()
+
+    buckets = sorted({b for b in args.buckets if 0 < b <= MAX_SEQUENCE_LENGTH} | {MAX_SEQUENCE_LENGTH})
+    tokenizer = load_tokenizer()
+    pool = InterpreterPool(lambda: create_interpreter(args.model), size=1, sequence_lengths=buckets)
+
+    corpus = [text for text in preprocess_batch(load_corpus(args.corpus)) if text.strip()]
+    per_bucket: dict[int, dict[str, list]] = {b: {"bucket_ms": [], "full_ms": [], "tokens": []} for b in pool.sequence_lengths}
+
+    with pool.checkout() as pooled:
+        full = pooled.interpreter_for(MAX_SEQUENCE_LENGTH)
+        for text in corpus:
+            encoded = tokenizer(text, truncation=True, max_length=MAX_SEQUENCE_LENGTH)
+            n_tokens = len(encoded['input_ids'])
+            bucket = pool.bucket_for(n_tokens)
+            shaped = pooled.interpreter_for(bucket)
+
+            bucket_ms = time_invoke(shaped, encoded, tokenizer.pad_token_id, args.repeat)
+            full_ms = time_invoke(full, encoded, tokenizer.pad_token_id, args.repeat)
+
+            per_bucket[bucket]["bucket_ms"].append(bucket_ms)
+            per_bucket[bucket]["full_ms"].append(full_ms)
+            per_bucket[bucket]["tokens"].append(n_tokens)
+
+    report = []
+    print(f"Korpus: {len(corpus)} teks | bucket: {pool.sequence_lengths}")
+    print(f"{'bucket':>6} {'teks':>5} {'token rata2':>11} {'ms bucket':>10} {'ms penuh':>9} {'hemat ms':>9} {'hemat %':>8}")
+    for bucket, values in per_bucket.items():
+        if not values["tokens"]:
+            continue
+        bucket_ms = float(np.mean(values["bucket_ms"]))
+        full_ms = float(np.mean(values["full_ms"]))
+        row = {
+            "bucket": bucket,
+            "texts": len(values["tokens"]),
+            "avg_tokens": float(np.mean(values["tokens"])),
+            "avg_bucket_ms": bucket_ms,
+            "avg_full_ms": full_ms,
+            "saved_ms": full_ms - bucket_ms,
+            "saved_pct": (full_ms - bucket_ms) / full_ms * 100 if full_ms else 0.0,
+        }
+        report.append(row)
+        print(f"{bucket:>6} {row['texts']:>5} {row['avg_tokens']:>11.1f} {bucket_ms:>10.2f} {full_ms:>9.2f} "
+              f"{row['saved_ms']:>9.2f} {row['saved_pct']:>7.1f}%")
+
+    total_saved = sum(row["saved_ms"] * row["texts"] for row in report)
+    print(f"Total latensi invoke yang dihemat pada korpus: {total_saved:.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"buckets": report, "total_saved_ms": total_saved}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
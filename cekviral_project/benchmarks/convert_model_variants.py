@@ -0,0 +1,52 @@
+# cekviral_project/benchmarks/convert_model_variants.py
+"""
+Membuat varian kuantisasi model IndoBERT TFLite dari SavedModel hasil fine-tuning
+(lihat IndoBERT_Fine_Tuning.ipynb, bagian "Simpan Model ke Berbagai Format").
+
+    float32 -> models/indobert_model.tflite       (tanpa optimasi, sama dengan notebook)
+    float16 -> models/indobert_model_fp16.tflite  (bobot float16)
+    int8    -> models/indobert_model_int8.tflite  (kuantisasi dynamic-range: bobot int8, aktivasi float)
+
+Membutuhkan TensorFlow penuh (pip install -r requirements-benchmark.txt). Jalankan dari direktori cekviral_project:
+    python -m benchmarks.convert_model_variants --saved-model ./indobert_tf_savedmodel
+    python -m benchmarks.convert_model_variants --saved-model ./indobert_tf_savedmodel --variants float16 int8
+"""
+import argparse
+import os
+import sys
+
+from app.services.ml_model import MODEL_VARIANT_FILES
+
+
+def convert(saved_model_dir: str, variant: str) -> bytes:
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    if variant == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        # Tanpa representative dataset, Optimize.DEFAULT menghasilkan kuantisasi dynamic-range
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saved-model", required=True, help="Direktori SavedModel hasil fine-tuning.")
+    parser.add_argument("--variants", nargs="+", choices=list(MODEL_VARIANT_FILES), default=list(MODEL_VARIANT_FILES))
+    parser.add_argument("--output-dir", default="models")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for variant in args.variants:
+        output_path = os.path.join(args.output_dir, MODEL_VARIANT_FILES[variant])
+        tflite_model = convert(args.saved_model, variant)
+        with open(output_path, "wb") as f:
+            f.write(tflite_model)
+        print(f"{variant:>8}: {output_path} ({len(tflite_model) / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
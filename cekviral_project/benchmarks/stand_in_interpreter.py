@@ -0,0 +1,74 @@
+# cekviral_project/benchmarks/stand_in_interpreter.py
+"""
+Interpreter pengganti dengan API yang sama seperti `tf.lite.Interpreter` untuk benchmark tanpa file model.
+
+Input (input_ids, attention_mask, token_type_ids) berbentuk dinamis [batch, panjang sekuens] dan
+output berupa logits [batch, 2], sama seperti model IndoBERT TFLite. Biaya `invoke()` disimulasikan
+dengan beberapa lapisan perkalian matriks NumPy sehingga latensinya naik seiring ukuran batch dan
+panjang sekuens. Angka absolutnya tidak mewakili model asli; yang dibandingkan adalah tren antar commit.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+@lru_cache(maxsize=None)
+def _weights(vocab_size: int, hidden_size: int, num_layers: int, seed: int):
+    """Bobot acak (read-only) yang dipakai bersama oleh semua instance dengan konfigurasi sama."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((vocab_size, hidden_size), dtype=np.float32) * 0.1
+    layers = [
+        rng.standard_normal((hidden_size, hidden_size), dtype=np.float32) / np.sqrt(hidden_size)
+        for _ in range(num_layers)
+    ]
+    classifier = rng.standard_normal((hidden_size, 2), dtype=np.float32)
+    return embeddings, layers, classifier
+
+
+class StandInInterpreter:
+    def __init__(self, model_path: str | None = None, num_threads: int | None = None,
+                 vocab_size: int = 30522, hidden_size: int = 256, num_layers: int = 4, seed: int = 0):
+        self._embeddings, self._layers, self._classifier = _weights(vocab_size, hidden_size, num_layers, seed)
+        self._shape = [1, 1]
+        self._inputs: list[np.ndarray] = []
+        self._output: np.ndarray | None = None
+
+    def get_input_details(self) -> list[dict]:
+        return [
+            {'name': f'serving_default_{name}:0', 'index': index, 'shape': np.array(self._shape),
+             'shape_signature': np.array([-1, -1]), 'dtype': np.int32}
+            for index, name in enumerate(_INPUT_NAMES)
+        ]
+
+    def get_output_details(self) -> list[dict]:
+        return [{'name': 'StatefulPartitionedCall:0', 'index': len(_INPUT_NAMES),
+                 'shape': np.array([self._shape[0], 2]), 'dtype': np.float32}]
+
+    def resize_tensor_input(self, index: int, shape: list[int]):
+        self._shape = list(shape)
+
+    def allocate_tensors(self):
+        self._inputs = [np.zeros(self._shape, dtype=np.int32) for _ in _INPUT_NAMES]
+        self._output = np.zeros((self._shape[0], 2), dtype=np.float32)
+
+    def set_tensor(self, index: int, value):
+        self._inputs[index][...] = value
+
+    def tensor(self, index: int):
+        return lambda: self._inputs[index]
+
+    def invoke(self):
+        input_ids, attention_mask, _ = self._inputs
+        hidden = self._embeddings[input_ids % len(self._embeddings)]
+        for weights in self._layers:
+            hidden = np.tanh(hidden @ weights)
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        self._output = pooled @ self._classifier
+
+    def get_tensor(self, index: int) -> np.ndarray:
+        if index == len(_INPUT_NAMES):
+            return self._output.copy()
+        return self._inputs[index].copy()
@@ -62,6 +62,55 @@ app.add_middleware(
     allow_headers=["*"], # Izinkan semua header
 )
 
+# ----------------- METRIK REQUEST -----------------
+
+from starlette.routing import Match
+from app.core.metrics import REQUESTS_IN_FLIGHT, REQUESTS_TOTAL
+
+
+def _route_path(request) -> str:
+    """Template path route (mis. "/verify") agar label metrik tidak bergantung pada URL mentah."""
+    route = request.scope.get("route")
+    if getattr(route, "path", None):
+        return route.path
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL and getattr(route, "path", None):
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def track_requests(request, call_next):
+    """
+    Menghitung request yang sedang diproses dan jumlah request selesai per route dan status.
+    Request baru dianggap selesai setelah body responsnya habis dikirim, jadi respons streaming
+    (SSE /verify/stream, NDJSON /verify/batch) tetap terhitung sedang diproses selama stream berjalan.
+    """
+    REQUESTS_IN_FLIGHT.inc()
+
+    def finish(status: str):
+        REQUESTS_IN_FLIGHT.dec()
+        REQUESTS_TOTAL.inc(path=_route_path(request), method=request.method, status=status)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish("500")
+        raise
+
+    body_iterator = response.body_iterator
+
+    async def tracked_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            finish(str(response.status_code))
+
+    response.body_iterator = tracked_body()
+    return response
+
 # ----------------- EVENT HANDLERS (Fungsi saat Startup & Shutdown) -----------------
 
 @app.on_event("startup")
@@ -92,10 +141,37 @@ async def startup_event():
     load_ml_model() # Fungsi ini akan mengisi variabel global_model dan global_tokenizer
     logger.info("Model ML deteksi hoaks berhasil dimuat.")
 
+    # 3. Jalankan micro-batcher inferensi
+    from app.services.ml_model import inference_batcher
+    await inference_batcher.start()
+
+    # 4. Buka klien HTTP bersama untuk mengambil artikel
+    from app.services.http_fetcher import http_fetcher
+    await http_fetcher.start()
+
+    # 5. Jalankan penulis riwayat write-behind (juga mengirim ulang baris yang tertunda di file spill)
+    from app.services.database import history_writer, supabase
+    if supabase and settings.HISTORY_WRITE_MODE != "inline":
+        await history_writer.start()
+
+    # 6. Periksa yt-dlp/ffmpeg sekali saja, bukan di setiap request transkripsi
+    if settings.TRANSCRIPTION_BACKEND == "gcp":
+        from app.services.content_analyzer import check_transcription_tools
+        if not await check_transcription_tools():
+            logger.warning("yt-dlp/ffmpeg tidak ditemukan. Fitur transkripsi video tidak akan tersedia.")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Fungsi yang berjalan saat aplikasi dimatikan."""
+    from app.services.ml_model import inference_batcher
+    await inference_batcher.stop()
+    from app.services.http_fetcher import http_fetcher
+    await http_fetcher.stop()
+    from app.services.transcription_jobs import transcription_jobs
+    await transcription_jobs.stop()
+    from app.services.database import history_writer
+    await history_writer.stop()
     logger.info("Aplikasi CekViral shutdown.")
 
 # ----------------- ROUTING DAN EKSEKUSI -----------------
@@ -0,0 +1,5 @@
+import os
+
+# Settings mewajibkan kredensial Supabase; pengujian tidak pernah menghubungi server ini
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
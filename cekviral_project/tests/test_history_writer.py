@@ -0,0 +1,212 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from app.services import database
+from app.services.database import HistoryWriter, _insert_history_rows, _is_unavailable_error
+
+
+class StubInsert:
+    """insert_rows_fn palsu: baris dengan "bad" ditolak, dan `down` kali pertama database tidak terjangkau."""
+
+    def __init__(self, down: int = 0):
+        self.down = down
+        self.calls = []
+
+    def __call__(self, rows):
+        self.calls.append([row["n"] for row in rows])
+        if self.down:
+            self.down -= 1
+            raise httpx.ConnectError("connection refused")
+        if any(row.get("bad") for row in rows):
+            raise APIError({"code": "23503", "message": "violates foreign key constraint"})
+        return [f"id-{row['n']}" for row in rows]
+
+
+def _writer(tmp_path, insert, **kwargs) -> HistoryWriter:
+    options = dict(max_queue_size=100, batch_size=100, flush_interval_ms=20, max_retries=1, max_spill_attempts=3)
+    options.update(kwargs)
+    return HistoryWriter(
+        insert,
+        spill_path=str(tmp_path / "pending.jsonl"),
+        dead_letter_path=str(tmp_path / "dead_letter.jsonl"),
+        **options,
+    )
+
+
+def _read_jsonl(path) -> list[dict]:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+async def _settle(writer: HistoryWriter):
+    await asyncio.sleep(0.05)
+    if writer._replay_task is not None:
+        await writer._replay_task
+    await writer._queue.join()
+
+
+@pytest.mark.parametrize("error, unavailable", [
+    (httpx.ConnectError("refused"), True),
+    (httpx.ReadTimeout("timeout"), True),
+    (APIError({"code": "502", "message": "Bad Gateway"}), True),
+    (APIError({"code": "PGRST001", "message": "could not connect"}), True),
+    (APIError({"code": "57P01", "message": "terminating connection"}), True),
+    (APIError({"code": "23503", "message": "foreign key violation"}), False),
+    (APIError({"code": "23505", "message": "duplicate key"}), False),
+    (APIError({"code": "400", "message": "Bad Request"}), False),
+    (ValueError("bad row"), False),
+])
+def test_is_unavailable_error(error, unavailable):
+    assert _is_unavailable_error(error) is unavailable
+
+
+def test_rejected_row_is_dead_lettered_alone(tmp_path):
+    insert = StubInsert()
+
+    async def scenario():
+        writer = _writer(tmp_path, insert)
+        await writer.start()
+        ids = await writer.write([{"n": 1}, {"n": 2, "bad": True}, {"n": 3}, {"n": 4}], wait_for_ids=True)
+        later = await writer.write([{"n": 5}], wait_for_ids=True)
+        stats = writer.stats()
+        await writer.stop()
+        return ids, later, stats
+
+    ids, later, stats = asyncio.run(scenario())
+    assert ids == ["id-1", None, "id-3", "id-4"]
+    assert later == ["id-5"]
+    assert not stats["database_unavailable"]
+    assert stats["rejected_rows_total"] == 1
+    assert stats["retries_total"] == 0
+    assert [row["n"] for row in _read_jsonl(tmp_path / "dead_letter.jsonl")] == [2]
+    assert not (tmp_path / "pending.jsonl").exists()
+
+
+def test_transient_error_is_retried(tmp_path):
+    insert = StubInsert(down=1)
+
+    async def scenario():
+        writer = _writer(tmp_path, insert)
+        await writer.start()
+        ids = await writer.write([{"n": 1}, {"n": 2}], wait_for_ids=True)
+        stats = writer.stats()
+        await writer.stop()
+        return ids, stats
+
+    ids, stats = asyncio.run(scenario())
+    assert ids == ["id-1", "id-2"]
+    assert stats["retries_total"] == 1
+    assert insert.calls == [[1, 2], [1, 2]]
+    assert not (tmp_path / "pending.jsonl").exists()
+
+
+def test_unavailable_database_spills_and_cools_down(tmp_path):
+    insert = StubInsert(down=10)
+
+    async def scenario():
+        writer = _writer(tmp_path, insert)
+        await writer.start()
+        ids = await writer.write([{"n": 1, "history_id": "client-1"}], wait_for_ids=True)
+        # Selama cooldown batch berikutnya langsung ditulis ke file tanpa dicoba
+        later = await writer.write([{"n": 2}], wait_for_ids=True)
+        stats = writer.stats()
+        await writer.stop()
+        return ids, later, stats
+
+    ids, later, stats = asyncio.run(scenario())
+    assert ids == ["client-1"]
+    assert later == [None]
+    assert stats["database_unavailable"]
+    assert insert.calls == [[1], [1]]
+    spilled = _read_jsonl(tmp_path / "pending.jsonl")
+    assert [(row["n"], row["_spill_attempts"]) for row in spilled] == [(1, 1), (2, 0)]
+
+
+def test_spill_is_replayed_on_start(tmp_path):
+    (tmp_path / "pending.jsonl").write_text(
+        json.dumps({"n": 1, "_spill_attempts": 1}) + "\n" + '{"n": \n' + json.dumps({"n": 2}) + "\n",
+        encoding="utf-8",
+    )
+    insert = StubInsert()
+
+    async def scenario():
+        writer = _writer(tmp_path, insert)
+        await writer.start()
+        await _settle(writer)
+        stats = writer.stats()
+        await writer.stop()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert insert.calls == [[1, 2]]
+    assert stats["replayed_rows_total"] == 2
+    assert stats["dead_letter_rows_total"] == 1
+    assert (tmp_path / "dead_letter.jsonl").read_text(encoding="utf-8") == '{"n": \n'
+    assert not (tmp_path / "pending.jsonl").exists()
+    assert not (tmp_path / "pending.jsonl.replay").exists()
+
+
+def test_replayed_row_is_dead_lettered_after_max_attempts(tmp_path):
+    (tmp_path / "pending.jsonl").write_text(json.dumps({"n": 1, "_spill_attempts": 2}) + "\n", encoding="utf-8")
+    insert = StubInsert(down=10)
+
+    async def scenario():
+        writer = _writer(tmp_path, insert, max_retries=0)
+        await writer.start()
+        await _settle(writer)
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert [(row["n"], row["_spill_attempts"]) for row in _read_jsonl(tmp_path / "dead_letter.jsonl")] == [(1, 3)]
+    assert not (tmp_path / "pending.jsonl").exists()
+
+
+def test_replayed_rejected_row_does_not_dead_letter_new_rows(tmp_path):
+    (tmp_path / "pending.jsonl").write_text(json.dumps({"n": 1, "bad": True}) + "\n", encoding="utf-8")
+    insert = StubInsert()
+
+    async def scenario():
+        writer = _writer(tmp_path, insert, flush_interval_ms=100)
+        await writer.start()
+        ids = await writer.write([{"n": 2}, {"n": 3}], wait_for_ids=True)
+        await _settle(writer)
+        await writer.stop()
+        return ids
+
+    ids = asyncio.run(scenario())
+    assert ids == ["id-2", "id-3"]
+    assert [row["n"] for row in _read_jsonl(tmp_path / "dead_letter.jsonl")] == [1]
+    assert not (tmp_path / "pending.jsonl").exists()
+
+
+class _FakeTable:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def insert(self, rows, **kwargs):
+        self.calls.append(("insert", kwargs))
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.calls.append(("upsert", kwargs))
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": [{"history_id": "db-1"}]})()
+
+
+def test_client_ids_are_upserted_ignoring_duplicates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(database, "supabase", type("Client", (), {"table": lambda self, name: _FakeTable(calls)})())
+
+    assert _insert_history_rows([{"history_id": "client-1"}]) == ["client-1"]
+    assert _insert_history_rows([{"n": 1}]) == ["db-1"]
+    assert calls == [
+        ("upsert", {"on_conflict": "history_id", "ignore_duplicates": True, "returning": "minimal"}),
+        ("insert", {"returning": "representation"}),
+    ]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.services.interpreter_pool import InterpreterPool
+
+
+class FakeInterpreter:
+    """Interpreter palsu dengan tiga input [batch, sekuens]; logits = jumlah input_ids per baris."""
+
+    created = 0
+
+    def __init__(self):
+        FakeInterpreter.created += 1
+        self.shape = [1, 1]
+        self.buffers = {}
+
+    def get_input_details(self):
+        return [{"index": index, "shape": np.array(self.shape)} for index in range(3)]
+
+    def get_output_details(self):
+        return [{"index": 3}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = list(shape)
+
+    def allocate_tensors(self):
+        self.buffers = {index: np.zeros(self.shape, dtype=np.int32) for index in range(3)}
+
+    def tensor(self, index):
+        return lambda: self.buffers[index]
+
+    def invoke(self):
+        self.logits = self.buffers[0].sum(axis=1, keepdims=True).astype(np.float32)
+
+    def get_tensor(self, index):
+        return self.logits
+
+
+def _rows(count: int) -> list[dict]:
+    return [{"input_ids": [i, 1], "attention_mask": [1, 1], "token_type_ids": [0, 0]} for i in range(count)]
+
+
+def test_batch_interpreters_per_slot_are_capped():
+    FakeInterpreter.created = 0
+    pool = InterpreterPool(FakeInterpreter, size=1, sequence_lengths=[8, 16], batch_sizes=[1, 4, 16],
+                           max_batch_interpreters=2)
+    assert FakeInterpreter.created == 2
+
+    with pool.checkout() as slot:
+        assert [float(x[0]) for x in slot.run_encoded(8, _rows(3))] == [1.0, 2.0, 3.0]
+        slot.run_encoded(8, _rows(10))
+        slot.run_encoded(16, _rows(3))
+        # Interpreter 4 x 8 paling lama tidak dipakai, jadi dibuang saat 4 x 16 dibuat
+        assert (4, 8) not in {(b, s) for s, by_batch in slot.buckets.items() for b in by_batch}
+        assert [float(x[0]) for x in slot.run_encoded(8, _rows(2))] == [1.0, 2.0]
+
+    stats = pool.stats()
+    assert stats["live_interpreters"] == 2 + 2
+    assert stats["batch_interpreter_evictions_total"] == 2
+    assert stats["batch_bucket_invokes"] == {1: 0, 4: 3, 16: 1}
+    assert FakeInterpreter.created == 2 + 4
@@ -0,0 +1,36 @@
+import sqlite3
+
+from app.services import prediction_cache
+from app.services.prediction_cache import PredictionCache
+
+
+def _disk_rows(db_path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT count(*) FROM prediction_cache").fetchone()[0]
+
+
+def test_disk_tier_is_capped_every_n_puts(tmp_path, monkeypatch):
+    monkeypatch.setattr(prediction_cache, "DISK_PRUNE_EVERY_PUTS", 10)
+    db_path = tmp_path / "cache.db"
+    cache = PredictionCache(max_entries=2, ttl_seconds=3600, db_path=str(db_path), db_max_entries=5)
+    cache.set_model_version("v1")
+    for i in range(10):
+        cache.put(f"teks {i}", {"i": i})
+
+    assert _disk_rows(db_path) == 5
+    assert cache.stats()["pruned_disk"] == 5
+    assert cache.get("teks 9") == {"i": 9}
+
+
+def test_expired_disk_rows_are_removed_on_startup(tmp_path):
+    db_path = tmp_path / "cache.db"
+    cache = PredictionCache(max_entries=10, ttl_seconds=3600, db_path=str(db_path))
+    cache.set_model_version("v1")
+    for i in range(4):
+        cache.put(f"teks {i}", {"i": i})
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE prediction_cache SET created_at = created_at - 7200 WHERE rowid <= 3")
+
+    reopened = PredictionCache(max_entries=10, ttl_seconds=3600, db_path=str(db_path))
+    assert _disk_rows(db_path) == 1
+    assert reopened.stats()["pruned_disk"] == 3
@@ -0,0 +1,97 @@
+import nltk
+import pytest
+
+from app.services import text_preprocessing
+from app.services.text_preprocessing import TextPreprocessor, preprocess_text_for_ml_legacy
+
+
+def _nltk_data_available() -> bool:
+    try:
+        nltk.data.find('corpora/stopwords')
+        nltk.data.find('tokenizers/punkt_tab')
+    except LookupError:
+        return False
+    return True
+
+
+class _StubStopwords:
+    """Pengganti korpus stopwords NLTK untuk lingkungan tanpa data NLTK."""
+
+    WORDS = {
+        'indonesian': ['dan', 'di', 'ke', 'dari', 'ini', 'itu', 'yang', 'tidak', 'sudah', 'akan', 'bisa', 'saya'],
+        'english': ['i', 'me', 'can', 'not', 'the', 'a', 'if', 'on', 'you', 'it'],
+    }
+
+    def words(self, language):
+        return self.WORDS[language]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def nltk_data():
+    # Tanpa data NLTK, stopwords dan pemecah kalimat (punkt_tab) diganti stub; kedua pipeline memakai
+    # stub yang sama sehingga kesetaraan tetap diuji
+    if _nltk_data_available():
+        yield
+        return
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(text_preprocessing, "stopwords", _StubStopwords())
+        mp.setattr(nltk.tokenize, "sent_tokenize", lambda text, language='english': [text])
+        text_preprocessing.get_stopwords.cache_clear()
+        yield
+    text_preprocessing.get_stopwords.cache_clear()
+
+
+# Korpus kesetaraan: spasi Unicode, campuran URL/hashtag/mention/angka, tanda baca, kata bersambung,
+# akhiran -nya, slang (termasuk frasa), dan newline/tab.
+CORPUS = [
+    "halo\xa0dunia berita",
+    "vaksin berbahaya　kata pejabat",
+    "tersebar  luas di media sosial",
+    "http#tag abc",
+    "#tag http://contoh.id/berita abc",
+    "cek http://a.b/c#frag dan #viral@akun",
+    "@akun#hashtag berita 2024 hoax",
+    "@user_1 bilang http://t.co/x123 itu #hoaks!!!",
+    "https://contoh.id/123?q=4 hari ini 17 agustus",
+    "lihat123http://x.y sekarang",
+    "Presiden \"menyatakan\" (secara resmi) bahwa... benar?",
+    "anti-hoaks dan cek_fakta serta \"kutip\"berita",
+    "rumahnya dijual, bukunya hilang, kamera neo",
+    "gw gak papa kok, bgt deh au ah",
+    "baris satu\nbaris dua\r\nbaris\ttiga",
+    "  spasi   berlebih  di awal dan akhir  ",
+    "emoji 😀 dan aksen café naïve",
+    "I cannot believe it, can't you?",
+    "",
+    "12345 !!! ###",
+]
+
+
+@pytest.fixture(scope="module")
+def parity_preprocessor():
+    # Pipeline lama tidak pernah mencocokkan kunci slang multi-kata, jadi kesetaraan diuji tanpa itu
+    return TextPreprocessor(match_slang_phrases=False)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_preprocess_matches_legacy(parity_preprocessor, text):
+    assert parity_preprocessor.preprocess(text) == preprocess_text_for_ml_legacy(text)
+
+
+def test_preprocess_batch_matches_legacy(parity_preprocessor):
+    expected = [preprocess_text_for_ml_legacy(text) for text in CORPUS]
+    assert parity_preprocessor.preprocess_batch(CORPUS) == expected
+
+
+def test_clean_normalizes_unicode_whitespace(parity_preprocessor):
+    assert parity_preprocessor.clean("halo\xa0dunia\u2009berita\u3000baru").split() == ["halo", "dunia", "berita", "baru"]
+
+
+def test_clean_keeps_legacy_substitution_order(parity_preprocessor):
+    assert parity_preprocessor.clean("http#tag abc").split() == ["http", "abc"]
+
+
+def test_slang_phrases_matched_by_default():
+    slang_dict = {"au ah": "cuek", "au": "emas"}
+    assert TextPreprocessor(slang_dict).preprocess("au ah") == "cuek"
+    assert TextPreprocessor(slang_dict, match_slang_phrases=False).preprocess("au ah").split()[0] == "emas"
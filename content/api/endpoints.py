@@ -2,10 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from models.schemas import RagRequest, User
 from core.auth import get_current_user
 from core.database import get_db
-from core.embedding import embed_query
+from core.config import RAG_TOP_K, RECOMMENDATION_TOP_K
 from core.rag_utils import (    
-    search_docs_for_rag,
-    search_docs_for_rekomendasi,
+    retrieve_news_for_content,
     generate_answer,
     get_latest_recommendations_for_user,
 )
@@ -20,9 +19,8 @@ def generate_teks(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        query_vec = embed_query(input.processed_text)
-        docs = search_docs_for_rag(conn, query_vec, top_k=5)
-        context = "\n\n".join([f"[{status}] {title}\n{desc}" for status, title, desc in docs])
+        docs = retrieve_news_for_content(conn, input.processed_text)[:RAG_TOP_K]
+        context = "\n\n".join([f"[{doc['status']}] {doc['title']}\n{doc['description']}" for doc in docs])
         answer = generate_answer(context, input.processed_text, input.final_label_threshold)
         return {"jawaban": answer}
     except Exception as e:
@@ -47,25 +45,24 @@ def create_recommendations(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="History not found")
 
         processed_teks = row["processed_text"]
-        query_vec = embed_query(processed_teks)
-        docs = search_docs_for_rekomendasi(conn, query_vec, top_k=8)
+        docs = retrieve_news_for_content(conn, processed_teks)[:RECOMMENDATION_TOP_K]
 
         recommendations = []
-        for news_id, title, link, imageurl in docs:
+        for doc in docs:
             cursor.execute(
                 """
                 INSERT INTO recommendations (history_id, news_id, created_at)
                 VALUES (%s, %s, now())
                 RETURNING recom_id
                 """,
-                (history_id, news_id),
+                (history_id, doc["news_id"]),
             )
-            recom_id = cursor.fetchone()[0]
+            recom_id = cursor.fetchone()["recom_id"]
             recommendations.append({
                 "recom_id": recom_id,
-                "title": title,
-                "link": link,
-                "imageurl": imageurl,
+                "title": doc["title"],
+                "link": doc["link"],
+                "imageurl": doc["imageurl"],
             })
         conn.commit()
         cursor.close()
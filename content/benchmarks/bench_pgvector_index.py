@@ -0,0 +1,158 @@
+"""
+Menyetel indeks ANN pgvector: recall@k terhadap pencarian eksak (sequential scan) serta latensi p50/p99
+untuk beberapa nilai hnsw.ef_search atau ivfflat.probes.
+
+Tabel yang ada (indeks dibuat dulu dengan tools/pgvector_index.py), dijalankan dari direktori content:
+    python -m benchmarks.bench_pgvector_index --table news --ef-search 20 40 80 160
+
+Korpus sintetis di Postgres lokal (tabel sementara pgvector_bench, dihapus setelah selesai) untuk menyetel
+sebelum korpus asli sebesar itu:
+    python -m benchmarks.bench_pgvector_index --synthetic 200000 --method hnsw --ef-search 20 40 80 160
+    python -m benchmarks.bench_pgvector_index --synthetic 200000 --method ivfflat --probes 1 5 10 20
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from benchmarks.bench_vector_index import make_queries, summarize, synthetic_corpus
+from core.database import connect_db
+from core.vector_index import parse_vector
+from tools.pgvector_index import OPERATOR_CLASS, default_lists, vector_indexes
+
+SYNTHETIC_TABLE = "pgvector_bench"
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(map(str, vector.tolist())) + "]"
+
+
+def create_synthetic_table(conn, size: int, dim: int, method: str):
+    vectors = synthetic_corpus(size, dim, clusters=max(8, size // 200))
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(SYNTHETIC_TABLE)))
+        cursor.execute(sql.SQL("CREATE TABLE {} (news_id serial PRIMARY KEY, vector vector({}))").format(
+            sql.Identifier(SYNTHETIC_TABLE), sql.Literal(dim)))
+        execute_values(
+            cursor,
+            sql.SQL("INSERT INTO {} (vector) VALUES %s").format(sql.Identifier(SYNTHETIC_TABLE)).as_string(conn),
+            [(vector_literal(vector),) for vector in vectors],
+            page_size=1000,
+        )
+        options = "m = 16, ef_construction = 64" if method == "hnsw" else f"lists = {default_lists(size)}"
+        start = time.perf_counter()
+        cursor.execute(sql.SQL("CREATE INDEX ON {} USING {} (vector {}) WITH ({})").format(
+            sql.Identifier(SYNTHETIC_TABLE), sql.SQL(method), sql.SQL(OPERATOR_CLASS), sql.SQL(options)))
+        print(f"Indeks {method} ({options}) dibangun dalam {time.perf_counter() - start:.1f} detik")
+        cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(SYNTHETIC_TABLE)))
+    conn.commit()
+
+
+def sample_queries(conn, table: str, count: int, noise: float) -> np.ndarray:
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("SELECT vector FROM {} WHERE vector IS NOT NULL ORDER BY random() LIMIT %s").format(
+            sql.Identifier(table)), (count,))
+        vectors = np.stack([parse_vector(row["vector"]) for row in cursor.fetchall()])
+    conn.rollback()
+    return make_queries(vectors, count, noise)
+
+
+def run_queries(conn, table: str, queries: np.ndarray, k: int, settings: list[str]) -> tuple[list[float], list[set]]:
+    """Menjalankan query `<#>` dengan SET LOCAL `settings`; ctid dipakai sebagai ID agar berlaku di tabel mana pun."""
+    query = sql.SQL("SELECT ctid::text AS id FROM {} ORDER BY vector <#> %s::vector LIMIT %s").format(sql.Identifier(table))
+    samples, results = [], []
+    with conn.cursor() as cursor:
+        for vector in queries:
+            for setting in settings:
+                cursor.execute(setting)
+            start = time.perf_counter()
+            cursor.execute(query, (vector_literal(vector), k))
+            found = {row["id"] for row in cursor.fetchall()}
+            samples.append((time.perf_counter() - start) * 1000)
+            results.append(found)
+            conn.rollback()
+    return samples, results
+
+
+def explain_uses_index(conn, table: str, vector: np.ndarray, k: int, settings: list[str]) -> bool:
+    with conn.cursor() as cursor:
+        for setting in settings:
+            cursor.execute(setting)
+        cursor.execute(sql.SQL("EXPLAIN SELECT ctid FROM {} ORDER BY vector <#> %s::vector LIMIT %s").format(
+            sql.Identifier(table)), (vector_literal(vector), k))
+        plan = " ".join(next(iter(row.values())) for row in cursor.fetchall())
+    conn.rollback()
+    return "Index Scan" in plan
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--table", choices=("news", "news_data"))
+    source.add_argument("--synthetic", type=int, metavar="N", help="Buat tabel sintetis berisi N vektor")
+    parser.add_argument("--method", choices=("hnsw", "ivfflat"), default="hnsw", help="Indeks tabel sintetis")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[20, 40, 80, 160])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    conn = connect_db()
+    table = args.table or SYNTHETIC_TABLE
+    try:
+        if args.synthetic:
+            create_synthetic_table(conn, args.synthetic, args.dim, args.method)
+            methods = {args.method}
+        else:
+            indexes = [index for index in vector_indexes(conn, table) if index["inner_product"] and index["valid"]]
+            conn.rollback()
+            methods = {"hnsw" if "USING hnsw" in index["indexdef"] else "ivfflat" for index in indexes}
+            if not methods:
+                print(f"Tabel {table} belum punya indeks {OPERATOR_CLASS}; buat dulu dengan tools/pgvector_index.py.")
+
+        queries = sample_queries(conn, table, args.queries, args.noise)
+        exact_settings = ["SET LOCAL enable_indexscan = off", "SET LOCAL enable_bitmapscan = off"]
+        exact_samples, truth = run_queries(conn, table, queries, args.k, exact_settings)
+        results = [{"method": "exact", "param": None, **summarize(exact_samples, [1.0] * len(truth))}]
+
+        variants = []
+        if "hnsw" in methods:
+            variants += [("hnsw", value, f"SET LOCAL hnsw.ef_search = {value}") for value in args.ef_search]
+        if "ivfflat" in methods:
+            variants += [("ivfflat", value, f"SET LOCAL ivfflat.probes = {value}") for value in args.probes]
+        for method, value, setting in variants:
+            if not explain_uses_index(conn, table, queries[0], args.k, [setting]):
+                print(f"Peringatan: planner tidak memakai indeks {method} untuk {setting}")
+            samples, found = run_queries(conn, table, queries, args.k, [setting])
+            recalls = [len(got & expected) / len(expected) if expected else 1.0 for got, expected in zip(found, truth)]
+            results.append({"method": method, "param": value, **summarize(samples, recalls)})
+    finally:
+        if args.synthetic:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(SYNTHETIC_TABLE)))
+            conn.commit()
+        conn.close()
+
+    print(f"Tabel {table}, {len(queries)} query, k={args.k}")
+    print(f"{'metode':<10}{'param':>7}{'recall@k':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for result in results:
+        print(f"{result['method']:<10}{str(result['param'] or '-'):>7}{result['recall_at_k']:>10.4f}"
+              f"{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}")
+    print("Pilih nilai terkecil yang recall-nya cukup, lalu set PGVECTOR_HNSW_EF_SEARCH / PGVECTOR_IVFFLAT_PROBES.")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"table": table, "k": args.k, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
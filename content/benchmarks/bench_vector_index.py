@@ -0,0 +1,157 @@
+"""
+Membandingkan pencarian berita lewat indeks vektor di dalam proses (core/vector_index.py) dengan query
+pgvector `ORDER BY vector <#> q LIMIT k`: recall@k terhadap pencarian eksak float32 serta latensi p50/p99.
+
+Korpus sintetis (tanpa database), dijalankan dari direktori content:
+    python -m benchmarks.bench_vector_index --synthetic 20000 --queries 500 --k 8
+
+Korpus asli dari tabel news, sekaligus mengukur query Postgres:
+    python -m benchmarks.bench_vector_index --from-db --postgres --queries 200 --json vector_index.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from core.vector_index import NEWS_COLUMNS, NewsVectorIndex, parse_vector
+
+
+def synthetic_corpus(size: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Vektor ternormalisasi yang mengelompok (mirip berita dengan topik yang sama)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_corpus_from_db() -> tuple[np.ndarray, list[dict]]:
+    from core.database import connect_db
+
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(NEWS_COLUMNS)}, vector FROM news WHERE vector IS NOT NULL")
+        records = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    vectors = np.stack([parse_vector(record["vector"]) for record in records])
+    rows = [{column: record[column] for column in NEWS_COLUMNS} for record in records]
+    return vectors, rows
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int = 1) -> np.ndarray:
+    """Query berupa vektor korpus yang diberi derau, seperti teks baru yang mirip berita yang sudah ada."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + noise * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> set:
+    scores = vectors @ query
+    return set(np.argpartition(-scores, k - 1)[:k].tolist())
+
+
+def summarize(samples_ms: list[float], recalls: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "recall_at_k": round(statistics.mean(recalls), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+    }
+
+
+def bench_index(vectors, rows, queries, truth, k, dtype, mode, nprobe) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        index = NewsVectorIndex(directory, dtype, mode, nprobe, refresh_seconds=0, cursor_column="news_id")
+        start = time.perf_counter()
+        index.build(vectors, rows)
+        build_ms = (time.perf_counter() - start) * 1000
+        position = {row["news_id"]: i for i, row in enumerate(rows)}
+        index.search(queries[0], k)  # pemanasan page cache memmap
+
+        samples, recalls = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            found = index.search(query, k)
+            samples.append((time.perf_counter() - start) * 1000)
+            recalls.append(len({position[row["news_id"]] for row in found} & expected) / k)
+    return {"dtype": dtype, "mode": mode, "nprobe": nprobe if mode == "approx" else None,
+            "build_ms": round(build_ms, 1), **summarize(samples, recalls)}
+
+
+def bench_postgres(rows, queries, truth, k) -> dict:
+    from core.database import connect_db
+
+    position = {row["news_id"]: i for i, row in enumerate(rows)}
+    conn = connect_db()
+    samples, recalls = [], []
+    try:
+        cursor = conn.cursor()
+        for query, expected in zip(queries, truth):
+            vector_str = "[" + ",".join(map(str, query.tolist())) + "]"
+            start = time.perf_counter()
+            cursor.execute("SELECT news_id FROM news ORDER BY vector <#> %s::vector LIMIT %s", (vector_str, k))
+            found = cursor.fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+            recalls.append(len({position.get(row["news_id"]) for row in found} & expected) / k)
+        cursor.close()
+    finally:
+        conn.close()
+    return {"dtype": "postgres", "mode": "pgvector", "nprobe": None, "build_ms": None, **summarize(samples, recalls)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="N", help="Jumlah vektor korpus sintetis")
+    source.add_argument("--from-db", action="store_true", help="Ambil korpus dari tabel news")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--noise", type=float, default=0.5, help="Derau query relatif terhadap vektor korpus")
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--postgres", action="store_true", help="Ukur juga query pgvector (butuh --from-db)")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    if args.postgres and not args.from_db:
+        parser.error("--postgres hanya bisa dipakai bersama --from-db")
+
+    if args.from_db:
+        vectors, rows = load_corpus_from_db()
+    else:
+        vectors = synthetic_corpus(args.synthetic, args.dim, clusters=max(8, args.synthetic // 200))
+        rows = [{"news_id": i, "status": "", "title": f"berita {i}", "description": "", "link": "", "imageurl": ""}
+                for i in range(len(vectors))]
+    queries = make_queries(vectors, args.queries, args.noise)
+    truth = [exact_top_k(vectors, query, args.k) for query in queries]
+    print(f"Korpus: {len(vectors)} vektor x {vectors.shape[1]} dimensi, {len(queries)} query, k={args.k}")
+
+    results = []
+    for dtype in ("float16", "int8"):
+        results.append(bench_index(vectors, rows, queries, truth, args.k, dtype, "exact", None))
+        for nprobe in args.nprobe:
+            results.append(bench_index(vectors, rows, queries, truth, args.k, dtype, "approx", nprobe))
+    if args.postgres:
+        results.append(bench_postgres(rows, queries, truth, args.k))
+
+    print(f"{'dtype':<9}{'mode':<10}{'nprobe':>7}{'recall@k':>10}{'p50 ms':>9}{'p99 ms':>9}{'build ms':>10}")
+    for result in results:
+        print(f"{result['dtype']:<9}{result['mode']:<10}{str(result['nprobe'] or '-'):>7}"
+              f"{result['recall_at_k']:>10.4f}{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}"
+              f"{str(result['build_ms'] or '-'):>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"corpus": len(vectors), "k": args.k, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,4 +6,57 @@ load_dotenv()
 
 API_KEY = os.getenv("api_key")
 genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel(model_name="models/gemini-1.5-flash-latest")
\ No newline at end of file
+model = genai.GenerativeModel(model_name="models/gemini-1.5-flash-latest")
+
+# Model embedding untuk query dan dokumen berita (harus sama dengan model yang dipakai ETL)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+
+# Cache embedding query (LRU di memori, opsional SQLite di disk agar bertahan setelah restart)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+EMBEDDING_CACHE_DB_PATH = os.getenv("EMBEDDING_CACHE_DB_PATH") or None
+
+# Layanan embedding: satu instance model per proses dengan micro-batching request yang bersamaan.
+# Jika EMBEDDING_SERVICE_URL diisi (mis. http://127.0.0.1:8100), model tidak dimuat di proses ini
+# dan semua encode dikirim ke sidecar `uvicorn embedding_server:app`.
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL") or None
+EMBEDDING_SERVICE_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_SERVICE_TIMEOUT_SECONDS", "30"))
+
+# Indeks vektor berita di dalam proses: matriks vektor tabel news disimpan sebagai file memmap
+# ("float16" atau "int8") beserta ID dan metadata, lalu dicari top-k dengan NumPy ("exact") atau
+# lewat klaster k-means ("approx", VECTOR_INDEX_NPROBE klaster terdekat). Baris baru (kolom
+# VECTOR_INDEX_CURSOR_COLUMN lebih besar dari snapshot terakhir) ditambahkan setiap
+# VECTOR_INDEX_REFRESH_SECONDS. Selama indeks belum siap atau gagal, pencarian kembali ke query Postgres.
+# "float16" didekode ke float32 di RAM saat dimuat (lebih cepat); "int8" dinilai langsung dari memmap (lebih hemat RAM).
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "true").lower() == "true"
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "vector_index")
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float16")
+VECTOR_INDEX_MODE = os.getenv("VECTOR_INDEX_MODE", "exact")
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "300"))
+VECTOR_INDEX_CURSOR_COLUMN = os.getenv("VECTOR_INDEX_CURSOR_COLUMN", "news_id")
+# Setiap penambahan menulis ulang seluruh matriks snapshot, jadi baris baru baru ditulis setelah terkumpul
+# sebanyak ini atau snapshot terakhir sudah berumur sekian detik (sampai itu, baris baru belum ikut dicari)
+VECTOR_INDEX_APPEND_MIN_ROWS = int(os.getenv("VECTOR_INDEX_APPEND_MIN_ROWS", "200"))
+VECTOR_INDEX_APPEND_MAX_DELAY_SECONDS = float(os.getenv("VECTOR_INDEX_APPEND_MAX_DELAY_SECONDS", "900"))
+# Kursor hanya mendeteksi baris baru (dan baris yang dihapus, dari jumlahnya); UPDATE pada baris lama
+# (status/label, judul, deskripsi, vektor yang dinormalisasi ulang lewat tools.pgvector_index normalize) baru
+# terlihat setelah rebuild penuh berikutnya. Snapshot dibangun ulang penuh setiap sekian detik, jadi hasil
+# usang tersaji paling lama VECTOR_INDEX_FULL_REBUILD_SECONDS + VECTOR_INDEX_REFRESH_SECONDS setelah UPDATE.
+# 0 = tanpa rebuild terjadwal (baris yang diubah tetap usang sampai ada baris yang dihapus).
+VECTOR_INDEX_FULL_REBUILD_SECONDS = float(os.getenv("VECTOR_INDEX_FULL_REBUILD_SECONDS", "3600"))
+
+# Parameter pencarian indeks ANN pgvector (lihat tools/pgvector_index.py) yang di-set per query lewat
+# SET LOCAL. Kosong = default server (hnsw.ef_search 40, ivfflat.probes 1). Nilai lebih besar = recall
+# lebih tinggi tetapi query lebih lambat; ukur dengan benchmarks/bench_pgvector_index.py.
+PGVECTOR_HNSW_EF_SEARCH = int(os.getenv("PGVECTOR_HNSW_EF_SEARCH")) if os.getenv("PGVECTOR_HNSW_EF_SEARCH") else None
+PGVECTOR_IVFFLAT_PROBES = int(os.getenv("PGVECTOR_IVFFLAT_PROBES")) if os.getenv("PGVECTOR_IVFFLAT_PROBES") else None
+
+# Retrieval gabungan: satu pencarian vektor top-max(RAG_TOP_K, RECOMMENDATION_TOP_K) dengan semua kolom,
+# dipakai bersama oleh /inference/rag dan /inference/{history_id}/recommendations. Hasilnya disimpan per
+# processed_text (satu entri per item history) selama RETRIEVAL_CACHE_TTL_SECONDS.
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+RECOMMENDATION_TOP_K = int(os.getenv("RECOMMENDATION_TOP_K", "8"))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "2000"))
@@ -1,8 +1,104 @@
-from sentence_transformers import SentenceTransformer
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
 
-embed_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+import numpy as np
+
+from core.config import EMBEDDING_CACHE_DB_PATH, EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_MODEL_NAME
+from core.embedding_service import embedding_service
+
+
+class EmbeddingCache:
+    """
+    Cache vektor embedding per (model, teks).
+
+    Kunci berupa hash SHA-256 dari nama model dan teks, jadi teks panjang tidak disimpan dan
+    vektor dari model lain tidak pernah tertukar. Vektor disimpan sebagai array float32 (±1,5 KB
+    untuk 384 dimensi) dengan eviksi LRU. Jika `db_path` diisi, vektor juga ditulis ke SQLite
+    sehingga tetap tersedia setelah restart atau di worker lain yang memakai file yang sama; satu
+    koneksi SQLite (autocommit) dipakai bersama oleh semua thread, bergantian lewat `_db_lock`.
+    """
+
+    def __init__(self, max_entries: int, db_path: str | None = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return vector
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row:
+                vector = np.frombuffer(row[0], dtype=np.float32)
+                self._remember(key, vector)
+                with self._lock:
+                    self._disk_hits += 1
+                return vector
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key: str, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._remember(key, vector)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    (key, vector.tobytes()),
+                )
+        return vector
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+            }
+
+
+# Dipakai bersama oleh /inference/rag dan /inference/{history_id}/recommendations
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_DB_PATH)
+
+
+def embed_vector(text: str) -> np.ndarray:
+    """Vektor embedding float32 untuk `text`; diambil dari cache jika teks yang sama sudah pernah di-embed."""
+    key = EmbeddingCache.make_key(EMBEDDING_MODEL_NAME, text)
+    vector = embedding_cache.get(key)
+    if vector is None:
+        vector = embedding_cache.put(key, embedding_service.encode([text])[0])
+    return vector
 
 
 def embed_query(text: str):
-    vector = embed_model.encode(text)
-    return vector.tolist()
\ No newline at end of file
+    return embed_vector(text).tolist()
@@ -0,0 +1,154 @@
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+
+import numpy as np
+
+from core.config import (
+    EMBEDDING_MAX_BATCH_SIZE,
+    EMBEDDING_MAX_WAIT_MS,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_SERVICE_TIMEOUT_SECONDS,
+    EMBEDDING_SERVICE_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """
+    Pemilik tunggal model SentenceTransformer di sebuah proses.
+
+    Pemanggil (thread handler FastAPI, sidecar, skrip) memanggil `encode(texts)` dan diblokir sampai
+    vektornya siap. Satu worker thread mengambil permintaan dari antrean, menunggu paling lama
+    `max_wait_ms` untuk permintaan lain yang datang bersamaan, lalu meng-encode semuanya dalam satu
+    panggilan model sehingga beberapa request berbagi satu forward pass.
+    """
+
+    def __init__(self, model_name: str, max_batch_size: int, max_wait_ms: float):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._model = None
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._batches_total = 0
+        self._texts_total = 0
+        self._requests_total = 0
+
+    def start(self):
+        """Memuat model dan menjalankan worker; aman dipanggil berulang kali."""
+        with self._start_lock:
+            if self._worker is not None:
+                return
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"Memuat model embedding {self.model_name}...")
+            self._model = SentenceTransformer(self.model_name)
+            self._worker = threading.Thread(target=self._run, name="embedding-worker", daemon=True)
+            self._worker.start()
+            logger.info("Model embedding siap.")
+
+    @property
+    def dimension(self) -> int:
+        self.start()
+        return self._model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Matriks float32 berbentuk (len(texts), dimensi), urutannya sama dengan `texts`."""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        self.start()
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _collect(self) -> list[tuple[list[str], Future]]:
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = self._model.encode(
+                    texts, batch_size=self.max_batch_size, convert_to_numpy=True, show_progress_bar=False
+                ).astype(np.float32, copy=False)
+            except Exception as e:
+                logger.error(f"Gagal meng-encode batch berisi {len(texts)} teks: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._batches_total += 1
+            self._texts_total += len(texts)
+            self._requests_total += len(batch)
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def stats(self) -> dict:
+        return {
+            "mode": "in_process",
+            "model": self.model_name,
+            "queued": self._queue.qsize(),
+            "requests_total": self._requests_total,
+            "texts_total": self._texts_total,
+            "batches_total": self._batches_total,
+        }
+
+
+class RemoteEmbeddingService:
+    """
+    Klien untuk sidecar embedding (embedding_server.py) dengan antarmuka yang sama seperti
+    EmbeddingService. Vektor dikirim sebagai float32 mentah, bukan JSON, agar ringkas.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.model_name = EMBEDDING_MODEL_NAME
+
+    def start(self):
+        pass
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        request = urllib.request.Request(
+            f"{self.base_url}/embed",
+            data=json.dumps({"texts": list(texts)}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            model_name = response.headers["X-Embedding-Model"]
+            rows, dim = (int(n) for n in response.headers["X-Embedding-Shape"].split(","))
+            body = response.read()
+        if model_name != self.model_name:
+            raise RuntimeError(f"Sidecar embedding memakai model {model_name}, bukan {self.model_name}")
+        return np.frombuffer(body, dtype=np.float32).reshape(rows, dim)
+
+    def stats(self) -> dict:
+        return {"mode": "sidecar", "url": self.base_url, "model": self.model_name}
+
+
+if EMBEDDING_SERVICE_URL:
+    embedding_service = RemoteEmbeddingService(EMBEDDING_SERVICE_URL, EMBEDDING_SERVICE_TIMEOUT_SECONDS)
+else:
+    embedding_service = EmbeddingService(EMBEDDING_MODEL_NAME, EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MAX_WAIT_MS)
@@ -1,5 +1,22 @@
-from core.config import model
-from core.embedding import embed_query
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from core.config import (
+    EMBEDDING_MODEL_NAME,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_IVFFLAT_PROBES,
+    RAG_TOP_K,
+    RECOMMENDATION_TOP_K,
+    RETRIEVAL_CACHE_MAX_ENTRIES,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+    model,
+)
+from core.embedding import EmbeddingCache, embed_vector
+from core.vector_index import NEWS_COLUMNS, news_index
+
+logger = logging.getLogger(__name__)
 
 
 def get_label_threshold(conn, history_id: str) -> str:
@@ -14,12 +31,33 @@ def get_label_threshold(conn, history_id: str) -> str:
     return row[0] if row else None
 
 
-def search_docs_for_rag(conn, query_vector, top_k=5):
+def apply_ann_search_params(cursor):
+    """Parameter indeks ANN pgvector untuk transaksi ini saja (SET LOCAL), diambil dari config."""
+    if PGVECTOR_HNSW_EF_SEARCH:
+        cursor.execute("SET LOCAL hnsw.ef_search = %s", (PGVECTOR_HNSW_EF_SEARCH,))
+    if PGVECTOR_IVFFLAT_PROBES:
+        cursor.execute("SET LOCAL ivfflat.probes = %s", (PGVECTOR_IVFFLAT_PROBES,))
+
+
+def search_news(conn, query_vector, top_k):
+    """
+    Satu pencarian vektor yang mengembalikan semua kolom NEWS_COLUMNS untuk top-k berita, lewat indeks
+    di dalam proses jika siap, selain itu query pgvector ke Postgres.
+    """
+    if news_index is not None:
+        try:
+            rows = news_index.search(query_vector, top_k)
+        except Exception as e:
+            logger.error(f"Pencarian indeks vektor gagal, memakai Postgres: {e}")
+            rows = None
+        if rows is not None:
+            return rows
     cursor = conn.cursor()
+    apply_ann_search_params(cursor)
     vector_str = "[" + ",".join(map(str, query_vector)) + "]"
     cursor.execute(
-        """
-        SELECT status, title, description 
+        f"""
+        SELECT {", ".join(NEWS_COLUMNS)}
         FROM news
         ORDER BY vector <#> %s::vector
         LIMIT %s;
@@ -31,19 +69,84 @@ def search_docs_for_rag(conn, query_vector, top_k=5):
     return results
 
 
-def search_docs_for_rekomendasi(conn, query_vector, top_k=8):
-    cursor = conn.cursor()
-    vector_str = "[" + ",".join(map(str, query_vector)) + "]"
-    cursor.execute("""
-        SELECT news_id, title, link, imageurl
-        FROM news
-        ORDER BY vector <#> %s::vector
-        LIMIT %s
-    """, (vector_str, top_k))
-    results = cursor.fetchall()  # list of tuples (news_id, title, link, imageurl)
-    cursor.close()
-    return results
-    
+class RetrievalCache:
+    """
+    Hasil search_news per konten selama TTL singkat. Kuncinya hash processed_text (sama dengan kunci cache
+    embedding), jadi satu item history punya satu entri: /inference/rag menerima processed_text dari klien
+    dan /recommendations membacanya dari tabel history untuk history_id yang sama.
+
+    Penjelasan RAG dan rekomendasi untuk satu pengecekan biasanya diminta hampir bersamaan; thread kedua
+    menunggu pencarian yang sedang berjalan untuk kunci yang sama alih-alih menjalankan pencarian sendiri.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, key: str) -> list[dict] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, rows = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return rows
+
+    def get_or_search(self, key: str, search) -> list[dict]:
+        """Hasil tersimpan untuk `key`; jika tidak ada, `search()` dijalankan sekali untuk semua pemanggil yang bersamaan."""
+        while True:
+            with self._lock:
+                rows = self._lookup(key)
+                if rows is not None:
+                    self._hits += 1
+                    return rows
+                pending = self._inflight.get(key)
+                if pending is None:
+                    done = threading.Event()
+                    self._inflight[key] = done
+                    self._misses += 1
+                    break
+            # Jika pencarian pemanggil lain gagal, putaran berikutnya menjalankan pencarian sendiri
+            pending.wait()
+
+        try:
+            rows = search()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, rows)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return rows
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+retrieval_cache = RetrievalCache(RETRIEVAL_CACHE_TTL_SECONDS, RETRIEVAL_CACHE_MAX_ENTRIES)
+
+
+def retrieve_news_for_content(conn, processed_text: str) -> list[dict]:
+    """
+    Top-max(RAG_TOP_K, RECOMMENDATION_TOP_K) berita untuk satu konten, dengan semua kolom yang dibutuhkan
+    penjelasan RAG (status, title, description) maupun rekomendasi (news_id, title, link, imageurl).
+    Pemanggil mengambil potongan [:RAG_TOP_K] atau [:RECOMMENDATION_TOP_K].
+    """
+    key = EmbeddingCache.make_key(EMBEDDING_MODEL_NAME, processed_text)
+    top_k = max(RAG_TOP_K, RECOMMENDATION_TOP_K)
+    return retrieval_cache.get_or_search(key, lambda: search_news(conn, embed_vector(processed_text), top_k))
+
 
 def get_latest_recommendations_for_user(conn, user_id: str, limit: int = 8):
     """
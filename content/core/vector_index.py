@@ -0,0 +1,468 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+from psycopg2 import sql
+
+from core.config import (
+    VECTOR_INDEX_APPEND_MAX_DELAY_SECONDS,
+    VECTOR_INDEX_APPEND_MIN_ROWS,
+    VECTOR_INDEX_CURSOR_COLUMN,
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_DTYPE,
+    VECTOR_INDEX_ENABLED,
+    VECTOR_INDEX_FULL_REBUILD_SECONDS,
+    VECTOR_INDEX_MODE,
+    VECTOR_INDEX_NPROBE,
+    VECTOR_INDEX_REFRESH_SECONDS,
+)
+from core.database import connect_db
+
+logger = logging.getLogger(__name__)
+
+# Kolom tabel news yang disimpan sebagai metadata di samping matriks vektor
+NEWS_COLUMNS = ["news_id", "status", "title", "description", "link", "imageurl"]
+# Skor dihitung per blok agar konversi float16/int8 -> float32 tidak menyalin seluruh matriks sekaligus
+SCORE_BLOCK_ROWS = 8192
+# Klaster k-means dilatih ulang saat rebuild penuh atau jika korpus sudah tumbuh sebesar ini sejak pelatihan
+RETRAIN_GROWTH_FACTOR = 2.0
+KMEANS_ITERATIONS = 10
+
+
+def parse_vector(value) -> np.ndarray:
+    """Vektor pgvector dari psycopg2: string "[0.1,0.2,...]" tanpa adapter pgvector, array jika ada."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Mengubah vektor float32 ke format penyimpanan. "int8" memakai skala simetris per baris
+    (max |v| / 127) sehingga skor = (q · baris_int8) * skala.
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    stored = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return stored, scales.astype(np.float32)
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """K-means sferis sederhana (assign berdasarkan inner product) untuk mode "approx"."""
+    rng = np.random.default_rng(0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    data = vectors / np.where(norms == 0, 1, norms)
+    centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1)
+        for cluster in range(nlist):
+            members = data[assignments == cluster]
+            if len(members):
+                mean = members.sum(axis=0)
+                centroids[cluster] = mean / (np.linalg.norm(mean) or 1.0)
+    return centroids.astype(np.float32)
+
+
+@dataclass
+class IndexSnapshot:
+    version: str
+    vectors: np.ndarray              # memmap (n, dim) float16 atau int8
+    scales: np.ndarray | None        # skala per baris untuk int8
+    rows: list[dict]                 # metadata NEWS_COLUMNS, urutannya sama dengan `vectors`
+    manifest: dict
+    centroids: np.ndarray | None = None
+    assignments: np.ndarray | None = None
+    list_order: np.ndarray | None = None    # indeks baris diurutkan per klaster
+    list_offsets: np.ndarray | None = None  # batas tiap klaster di list_order
+    # Konversi float16 -> float32 di NumPy lambat (±20 ms per 20 ribu vektor), jadi snapshot float16
+    # didekode sekali ke RAM saat dimuat. Snapshot int8 dinilai langsung dari memmap per blok.
+    decoded: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def dequantized(self) -> np.ndarray:
+        vectors = np.asarray(self.vectors, dtype=np.float32)
+        return vectors * self.scales[:, None] if self.scales is not None else vectors
+
+    def scores(self, query: np.ndarray, candidates: np.ndarray | None = None) -> np.ndarray:
+        if self.decoded is not None:
+            return (self.decoded[candidates] if candidates is not None else self.decoded) @ query
+        if candidates is not None:
+            scores = self.vectors[candidates].astype(np.float32) @ query
+            return scores * self.scales[candidates] if self.scales is not None else scores
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_BLOCK_ROWS):
+            block = self.vectors[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        return scores * self.scales if self.scales is not None else scores
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([
+            self.list_order[self.list_offsets[cluster]:self.list_offsets[cluster + 1]] for cluster in probes
+        ])
+
+
+class NewsVectorIndex:
+    """
+    Indeks vektor tabel news di dalam proses, pengganti `ORDER BY vector <#> q LIMIT k` ke Postgres.
+
+    Snapshot disimpan di `directory/<versi>/` (vectors.npy dibuka sebagai memmap, rows.json, manifest.json)
+    dan file CURRENT menunjuk versi aktif, jadi beberapa worker uvicorn berbagi page cache yang sama dan
+    pembaruan snapshot bersifat atomik. Thread latar belakang menambahkan baris baru secara inkremental;
+    jika jumlah baris lama di database berubah (ada yang dihapus) snapshot dibangun ulang penuh.
+    Perubahan pada baris lama (UPDATE status/judul/vektor) tidak terdeteksi dari kursor, jadi snapshot
+    juga dibangun ulang penuh jika rebuild penuh terakhir sudah lebih dari `full_rebuild_seconds` lalu
+    (0 = hanya saat terdeteksi perubahan jumlah baris).
+
+    Setiap penambahan menulis ulang seluruh vectors.npy ke versi baru (O(jumlah baris) I/O disk), jadi
+    baris baru baru ditulis setelah terkumpul `append_min_rows` baris atau snapshot sudah berumur
+    `append_max_delay_seconds`; sampai saat itu baris tersebut belum ikut dicari.
+    """
+
+    def __init__(self, directory: str, dtype: str, mode: str, nprobe: int, refresh_seconds: float,
+                 cursor_column: str, append_min_rows: int = 1, append_max_delay_seconds: float = 0.0,
+                 full_rebuild_seconds: float = 0.0):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"VECTOR_INDEX_DTYPE tidak dikenal: {dtype}")
+        if mode not in ("exact", "approx"):
+            raise ValueError(f"VECTOR_INDEX_MODE tidak dikenal: {mode}")
+        self.directory = directory
+        self.dtype = dtype
+        self.mode = mode
+        self.nprobe = nprobe
+        self.refresh_seconds = refresh_seconds
+        self.cursor_column = cursor_column
+        self.append_min_rows = max(1, append_min_rows)
+        self.append_max_delay_seconds = append_max_delay_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self._snapshot: IndexSnapshot | None = None
+        self._refresh_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._searches_total = 0
+        self._fallbacks_total = 0
+        self._last_refresh_error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None and len(self._snapshot) > 0
+
+    # ----------------- Pencarian -----------------
+
+    def search(self, query_vector, top_k: int) -> list[dict] | None:
+        """
+        Top-k baris (metadata NEWS_COLUMNS) dengan inner product terbesar, urutan sama seperti
+        `ORDER BY vector <#> q`. None jika indeks belum siap sehingga pemanggil kembali ke Postgres.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or len(snapshot) == 0:
+            self._fallbacks_total += 1
+            return None
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape[0] != snapshot.vectors.shape[1]:
+            logger.warning(f"Dimensi query {query.shape[0]} tidak cocok dengan indeks {snapshot.vectors.shape[1]}")
+            self._fallbacks_total += 1
+            return None
+
+        candidates = None
+        if self.mode == "approx" and snapshot.centroids is not None:
+            candidates = snapshot.candidates(query, self.nprobe)
+        scores = snapshot.scores(query, candidates)
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if candidates is not None:
+            top = candidates[top]
+        self._searches_total += 1
+        return [snapshot.rows[i] for i in top]
+
+    # ----------------- Snapshot di disk -----------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Hanya satu proses yang membangun snapshot pada satu waktu."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _current_version(self) -> str | None:
+        try:
+            with open(os.path.join(self.directory, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> bool:
+        """Membuka snapshot aktif dari disk jika ada dan berbeda dari yang sedang dipakai."""
+        version = self._current_version()
+        if version is None or (self._snapshot is not None and self._snapshot.version == version):
+            return False
+        path = os.path.join(self.directory, version)
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, "rows.json"), encoding="utf-8") as f:
+            rows = json.load(f)
+        snapshot = IndexSnapshot(
+            version=version,
+            vectors=np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            scales=np.load(os.path.join(path, "scales.npy")) if manifest["dtype"] == "int8" else None,
+            rows=rows,
+            manifest=manifest,
+        )
+        if manifest["dtype"] == "float16":
+            snapshot.decoded = np.asarray(snapshot.vectors, dtype=np.float32)
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            snapshot.centroids = np.load(os.path.join(path, "centroids.npy"))
+            snapshot.assignments = np.load(os.path.join(path, "assignments.npy"))
+            snapshot.list_order = np.argsort(snapshot.assignments, kind="stable")
+            snapshot.list_offsets = np.searchsorted(
+                snapshot.assignments[snapshot.list_order], np.arange(len(snapshot.centroids) + 1)
+            )
+        self._snapshot = snapshot
+        logger.info(f"Indeks vektor berita dimuat: versi {version}, {len(rows)} baris ({manifest['dtype']}).")
+        return True
+
+    def _write_snapshot(self, parts: list[np.ndarray], scales: np.ndarray | None, rows: list[dict],
+                        last_cursor, centroids: np.ndarray | None, trained_count: int, built_at: float):
+        """
+        Menulis versi baru dari `parts` (potongan matriks tersimpan berurutan, mis. memmap snapshot lama
+        lalu baris baru). Potongan disalin per blok ke memmap tujuan, tidak digabung dulu di RAM.
+        `built_at` adalah waktu rebuild penuh terakhir (dipertahankan saat penambahan).
+        """
+        version = f"{int(time.time() * 1000)}-{os.getpid()}"
+        path = os.path.join(self.directory, version)
+        os.makedirs(path)
+        dim = parts[0].shape[1]
+        matrix = np.lib.format.open_memmap(
+            os.path.join(path, "vectors.npy"), mode="w+", dtype=parts[0].dtype,
+            shape=(sum(len(part) for part in parts), dim),
+        )
+        offset = 0
+        for part in parts:
+            for start in range(0, len(part), SCORE_BLOCK_ROWS):
+                block = part[start:start + SCORE_BLOCK_ROWS]
+                matrix[offset:offset + len(block)] = block
+                offset += len(block)
+        if scales is not None:
+            np.save(os.path.join(path, "scales.npy"), scales)
+        if centroids is not None:
+            assignments = np.empty(len(matrix), dtype=np.int32)
+            for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+                data = matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+                if scales is not None:
+                    data *= scales[start:start + len(data), None]
+                assignments[start:start + len(data)] = np.argmax(data @ centroids.T, axis=1)
+            np.save(os.path.join(path, "centroids.npy"), centroids)
+            np.save(os.path.join(path, "assignments.npy"), assignments)
+        matrix.flush()
+        del matrix
+        with open(os.path.join(path, "rows.json"), "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, default=str)
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dtype": self.dtype,
+                "dim": int(dim),
+                "count": len(rows),
+                "cursor_column": self.cursor_column,
+                "last_cursor": last_cursor,
+                "trained_count": trained_count,
+                "created_at": time.time(),
+                "built_at": built_at,
+            }, f, default=str)
+
+        current_tmp = os.path.join(self.directory, "CURRENT.tmp")
+        with open(current_tmp, "w") as f:
+            f.write(version)
+        os.replace(current_tmp, os.path.join(self.directory, "CURRENT"))
+        # Versi lama aman dihapus: proses lain yang masih memetakan file-nya tetap bisa membacanya
+        for name in os.listdir(self.directory):
+            old_path = os.path.join(self.directory, name)
+            if name != version and os.path.isdir(old_path):
+                shutil.rmtree(old_path, ignore_errors=True)
+        self.load()
+
+    # ----------------- Sinkronisasi dari Postgres -----------------
+
+    def _fetch_rows(self, conn, after=None) -> list[dict]:
+        query = sql.SQL("SELECT {columns}, vector, {cursor} AS index_cursor FROM news {where} ORDER BY {cursor}").format(
+            columns=sql.SQL(", ").join(map(sql.Identifier, NEWS_COLUMNS)),
+            cursor=sql.Identifier(self.cursor_column),
+            where=sql.SQL("WHERE {} > %s").format(sql.Identifier(self.cursor_column)) if after is not None else sql.SQL(""),
+        )
+        cursor = conn.cursor()
+        cursor.execute(query, (after,) if after is not None else None)
+        rows = cursor.fetchall()
+        cursor.close()
+        return [row for row in rows if row["vector"] is not None]
+
+    def _count_until(self, conn, last_cursor) -> int:
+        cursor = conn.cursor()
+        cursor.execute(
+            sql.SQL("SELECT count(*) AS total FROM news WHERE vector IS NOT NULL AND {} <= %s").format(
+                sql.Identifier(self.cursor_column)
+            ),
+            (last_cursor,),
+        )
+        total = cursor.fetchone()["total"]
+        cursor.close()
+        return total
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Menyinkronkan snapshot dengan tabel news. Mengembalikan jumlah baris yang ditambahkan (atau
+        jumlah semua baris jika snapshot dibangun ulang penuh).
+        """
+        with self._refresh_lock, self._file_lock():
+            # Proses lain mungkin sudah menulis snapshot yang lebih baru
+            self.load()
+            snapshot = self._snapshot
+            conn = connect_db()
+            try:
+                rebuild = (
+                    full
+                    or snapshot is None
+                    or len(snapshot) == 0
+                    or snapshot.manifest["dtype"] != self.dtype
+                    or snapshot.manifest["cursor_column"] != self.cursor_column
+                    or self._full_rebuild_due(snapshot)
+                    or self._count_until(conn, snapshot.manifest["last_cursor"]) != len(snapshot)
+                )
+                new_rows = self._fetch_rows(conn, None if rebuild else snapshot.manifest["last_cursor"])
+            finally:
+                conn.close()
+
+            if not rebuild and not new_rows:
+                return 0
+            if rebuild and not new_rows:
+                # Snapshot kosong ditulis agar baris lama tidak terus disajikan; pencarian kembali ke Postgres
+                logger.warning("Tabel news tidak berisi vektor; indeks vektor dikosongkan.")
+                if snapshot is not None and len(snapshot) > 0:
+                    self._write_empty_snapshot(snapshot.vectors.shape[1])
+                return 0
+            if not rebuild and not self._append_due(snapshot, len(new_rows)):
+                # Kursor tidak dimajukan, jadi baris ini diambil lagi (bersama yang lebih baru) nanti
+                return 0
+
+            vectors = np.stack([parse_vector(row["vector"]) for row in new_rows])
+            rows = [{column: row[column] for column in NEWS_COLUMNS} for row in new_rows]
+            last_cursor = new_rows[-1]["index_cursor"]
+            if rebuild:
+                self.build(vectors, rows, last_cursor)
+            else:
+                self._append(snapshot, vectors, rows, last_cursor)
+            logger.info(
+                f"Indeks vektor berita {'dibangun ulang' if rebuild else 'diperbarui'}: "
+                f"{len(new_rows)} baris {'total' if rebuild else 'baru'}, {len(self._snapshot)} baris di indeks."
+            )
+            return len(new_rows)
+
+    def build(self, vectors: np.ndarray, rows: list[dict], last_cursor=None):
+        """Menulis snapshot penuh dari matriks float32 dan metadata barisnya (juga dipakai benchmark)."""
+        stored, scales = quantize(vectors, self.dtype)
+        centroids = None
+        if self.mode == "approx":
+            centroids = train_centroids(vectors, max(1, int(np.sqrt(len(rows)))))
+        self._write_snapshot([stored], scales, rows, last_cursor, centroids, len(rows), time.time())
+
+    def _write_empty_snapshot(self, dim: int):
+        stored = np.empty((0, dim), dtype=np.int8 if self.dtype == "int8" else np.float16)
+        scales = np.empty(0, dtype=np.float32) if self.dtype == "int8" else None
+        self._write_snapshot([stored], scales, [], None, None, 0, time.time())
+
+    def _full_rebuild_due(self, snapshot: IndexSnapshot) -> bool:
+        if self.full_rebuild_seconds <= 0:
+            return False
+        # Snapshot lama tanpa built_at dianggap dibangun saat dibuat
+        built_at = snapshot.manifest.get("built_at", snapshot.manifest.get("created_at", 0))
+        return time.time() - built_at >= self.full_rebuild_seconds
+
+    def _append_due(self, snapshot: IndexSnapshot, pending_rows: int) -> bool:
+        age = time.time() - snapshot.manifest.get("created_at", 0)
+        return pending_rows >= self.append_min_rows or age >= self.append_max_delay_seconds
+
+    def _append(self, snapshot: IndexSnapshot, vectors: np.ndarray, rows: list[dict], last_cursor):
+        """
+        Menulis versi baru berisi snapshot lama ditambah `rows`. Matriks lama disalin per blok dari
+        memmap-nya (tidak digabung di RAM), tetapi tetap ditulis ulang seluruhnya; karena itu
+        penambahan dikumpulkan dulu (lihat `_append_due`). Klaster approx hanya dilatih ulang jika
+        korpus sudah tumbuh RETRAIN_GROWTH_FACTOR kali sejak pelatihan terakhir.
+        """
+        stored, scales = quantize(vectors, self.dtype)
+        scales = np.concatenate([snapshot.scales, scales]) if scales is not None else None
+        rows = snapshot.rows + rows
+        centroids, trained_count = None, 0
+        if self.mode == "approx":
+            trained_count = snapshot.manifest.get("trained_count", 0)
+            if snapshot.centroids is not None and len(rows) <= trained_count * RETRAIN_GROWTH_FACTOR:
+                centroids = snapshot.centroids
+            else:
+                data = np.concatenate([snapshot.dequantized(), vectors])
+                centroids = train_centroids(data, max(1, int(np.sqrt(len(rows)))))
+                trained_count = len(rows)
+        built_at = snapshot.manifest.get("built_at", snapshot.manifest.get("created_at", 0))
+        self._write_snapshot([snapshot.vectors, stored], scales, rows, last_cursor, centroids, trained_count, built_at)
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+                self._last_refresh_error = None
+            except Exception as e:
+                self._last_refresh_error = str(e)
+                logger.error(f"Gagal memperbarui indeks vektor berita: {e}")
+            time.sleep(self.refresh_seconds)
+
+    def start(self):
+        """Memuat snapshot yang ada di disk lalu menjalankan thread pembaruan berkala."""
+        if self._thread is not None:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"Gagal memuat snapshot indeks vektor berita: {e}")
+        self._thread = threading.Thread(target=self._run, name="news-vector-index", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "ready": self.ready,
+            "version": snapshot.version if snapshot else None,
+            "rows": len(snapshot) if snapshot else 0,
+            "built_at": snapshot.manifest.get("built_at") if snapshot else None,
+            "dtype": self.dtype,
+            "mode": self.mode,
+            "searches_total": self._searches_total,
+            "fallbacks_total": self._fallbacks_total,
+            "last_refresh_error": self._last_refresh_error,
+        }
+
+
+news_index = NewsVectorIndex(
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_DTYPE,
+    VECTOR_INDEX_MODE,
+    VECTOR_INDEX_NPROBE,
+    VECTOR_INDEX_REFRESH_SECONDS,
+    VECTOR_INDEX_CURSOR_COLUMN,
+    VECTOR_INDEX_APPEND_MIN_ROWS,
+    VECTOR_INDEX_APPEND_MAX_DELAY_SECONDS,
+    VECTOR_INDEX_FULL_REBUILD_SECONDS,
+) if VECTOR_INDEX_ENABLED else None
@@ -0,0 +1,46 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+
+from core.config import EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MAX_WAIT_MS, EMBEDDING_MODEL_NAME
+from core.embedding_service import EmbeddingService
+
+# Sidecar embedding lokal: satu salinan model untuk API konten, CLI RAG, dan ETL di mesin yang sama.
+# Jalankan dengan `uvicorn embedding_server:app --host 127.0.0.1 --port 8100`, lalu set
+# EMBEDDING_SERVICE_URL=http://127.0.0.1:8100 di proses lain.
+
+app = FastAPI(title="Embedding Sidecar")
+
+# Selalu in-process di sini, walaupun EMBEDDING_SERVICE_URL ikut ter-set di environment
+service = EmbeddingService(EMBEDDING_MODEL_NAME, EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MAX_WAIT_MS)
+
+
+class EmbedRequest(BaseModel):
+    texts: list[str] = Field(..., description="Teks yang akan di-embed")
+
+
+@app.on_event("startup")
+def load_model():
+    service.start()
+
+
+@app.post("/embed")
+async def embed(request: EmbedRequest):
+    try:
+        vectors = await run_in_threadpool(service.encode, request.texts)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(
+        content=vectors.tobytes(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Embedding-Model": service.model_name,
+            "X-Embedding-Shape": f"{vectors.shape[0]},{vectors.shape[1]}",
+        },
+    )
+
+
+@app.get("/stats")
+def stats():
+    return service.stats()
@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from api.endpoints import router as api_router
+from core.embedding_service import embedding_service
+from core.vector_index import news_index
 
 
 app = FastAPI()
@@ -15,6 +17,20 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def load_embedding_model():
+    # Model dimuat sekali saat startup (tidak ada yang dimuat jika memakai sidecar EMBEDDING_SERVICE_URL)
+    embedding_service.start()
+
+
+@app.on_event("startup")
+def start_news_index():
+    # Snapshot indeks vektor dimuat dari disk lalu diperbarui di latar belakang; sampai siap,
+    # pencarian berita tetap memakai query Postgres
+    if news_index is not None:
+        news_index.start()
+
+
 # Tambahkan endpoint untuk root "/"
 @app.get("/", response_class=HTMLResponse)
 def read_root():
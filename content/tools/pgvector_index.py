@@ -0,0 +1,267 @@
+"""
+Pengelolaan indeks ANN pgvector untuk kolom `vector` di tabel news (layanan konten) dan news_data (ETL).
+
+Kedua tabel dicari dengan operator inner product `<#>`, jadi indeks harus memakai operator class
+`vector_ip_ops`; indeks dengan vector_l2_ops/vector_cosine_ops tidak akan dipakai planner untuk query itu.
+Inner product hanya sama dengan cosine similarity jika vektor yang disimpan ternormalisasi (norma 1),
+periksa dengan `check-norms` dan perbaiki dengan `normalize`.
+
+Dijalankan dari direktori content (memakai koneksi PG_* dari .env):
+    python -m tools.pgvector_index status --table news
+    python -m tools.pgvector_index check-norms --table news
+    python -m tools.pgvector_index normalize --table news
+    python -m tools.pgvector_index create --table news --method hnsw --m 16 --ef-construction 64 --replace
+    python -m tools.pgvector_index create --table news --method ivfflat --lists 100 --replace
+    python -m tools.pgvector_index rebuild --table news --method hnsw
+    python -m tools.pgvector_index drop --table news --method ivfflat
+
+Indeks dibuat dan dibangun ulang dengan CONCURRENTLY sehingga tabel tetap bisa dibaca/ditulis selama proses.
+Setelah itu atur PGVECTOR_HNSW_EF_SEARCH / PGVECTOR_IVFFLAT_PROBES berdasarkan benchmarks/bench_pgvector_index.py.
+"""
+import argparse
+import math
+import sys
+
+from psycopg2 import sql
+
+from core.database import connect_db
+
+TABLES = ("news", "news_data")
+METHODS = ("hnsw", "ivfflat")
+VECTOR_COLUMN = "vector"
+OPERATOR_CLASS = "vector_ip_ops"
+
+
+def index_name(table: str, method: str) -> str:
+    return f"{table}_{VECTOR_COLUMN}_{method}_idx"
+
+
+def autocommit_connection():
+    """CREATE/REINDEX/DROP INDEX CONCURRENTLY tidak boleh berjalan di dalam transaksi."""
+    conn = connect_db()
+    conn.autocommit = True
+    return conn
+
+
+def fetch_one(conn, query, params=None) -> dict:
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchone()
+
+
+def fetch_all(conn, query, params=None) -> list[dict]:
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
+def execute(conn, query, params=None):
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+
+
+def pgvector_version(conn) -> str | None:
+    row = fetch_one(conn, "SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    return row["extversion"] if row else None
+
+
+def vector_indexes(conn, table: str) -> list[dict]:
+    """Semua indeks hnsw/ivfflat di tabel, beserta ukuran dan apakah operator class-nya cocok untuk `<#>`."""
+    rows = fetch_all(conn, """
+        SELECT i.indexname, i.indexdef, pg_relation_size(c.oid) AS size_bytes, x.indisvalid AS valid
+        FROM pg_indexes i
+        JOIN pg_namespace n ON n.nspname = i.schemaname
+        JOIN pg_class c ON c.relname = i.indexname AND c.relnamespace = n.oid
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.tablename = %s AND (i.indexdef ILIKE '%%USING hnsw%%' OR i.indexdef ILIKE '%%USING ivfflat%%')
+        ORDER BY i.indexname
+    """, (table,))
+    for row in rows:
+        row["inner_product"] = OPERATOR_CLASS in row["indexdef"]
+    return rows
+
+
+def norm_stats(conn, table: str, tolerance: float) -> dict:
+    return fetch_one(conn, sql.SQL("""
+        SELECT count(*) AS total,
+               min(vector_norm({column})) AS min_norm,
+               max(vector_norm({column})) AS max_norm,
+               avg(vector_norm({column})) AS avg_norm,
+               count(*) FILTER (WHERE abs(vector_norm({column}) - 1) > %s) AS not_normalized
+        FROM {table}
+        WHERE {column} IS NOT NULL
+    """).format(table=sql.Identifier(table), column=sql.Identifier(VECTOR_COLUMN)), (tolerance,))
+
+
+def default_lists(rows: int) -> int:
+    """Anjuran pgvector: rows / 1000 sampai 1 juta baris, sqrt(rows) setelahnya."""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def cmd_status(args) -> int:
+    conn = autocommit_connection()
+    try:
+        version = pgvector_version(conn)
+        total = fetch_one(conn, sql.SQL("SELECT count(*) AS total FROM {}").format(sql.Identifier(args.table)))["total"]
+        print(f"pgvector {version or 'TIDAK TERPASANG'}, tabel {args.table}: {total} baris")
+        indexes = vector_indexes(conn, args.table)
+        if not indexes:
+            print("Belum ada indeks ANN; query `<#>` memakai sequential scan.")
+        for index in indexes:
+            flags = []
+            if not index["inner_product"]:
+                flags.append(f"BUKAN {OPERATOR_CLASS}, tidak dipakai untuk <#>")
+            if not index["valid"]:
+                flags.append("INVALID, jalankan rebuild")
+            print(f"- {index['indexname']} ({index['size_bytes'] / 1024 / 1024:.1f} MB){' [' + '; '.join(flags) + ']' if flags else ''}")
+            print(f"    {index['indexdef']}")
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_check_norms(args) -> int:
+    conn = autocommit_connection()
+    try:
+        stats = norm_stats(conn, args.table, args.tolerance)
+    finally:
+        conn.close()
+    if not stats["total"]:
+        print(f"Tabel {args.table} belum berisi vektor.")
+        return 0
+    print(f"{stats['total']} vektor, norma min {stats['min_norm']:.4f} / rata-rata {stats['avg_norm']:.4f} / "
+          f"maks {stats['max_norm']:.4f}")
+    if stats["not_normalized"]:
+        print(f"{stats['not_normalized']} vektor tidak ternormalisasi (toleransi {args.tolerance}): peringkat `<#>` "
+              f"ikut dipengaruhi panjang vektor, bukan hanya kemiripan. Jalankan `normalize`.")
+        return 1
+    print("Semua vektor ternormalisasi: inner product = cosine similarity.")
+    return 0
+
+
+def cmd_normalize(args) -> int:
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            # l2_normalize tersedia sejak pgvector 0.7.0
+            cursor.execute(sql.SQL("""
+                UPDATE {table} SET {column} = l2_normalize({column})
+                WHERE {column} IS NOT NULL AND abs(vector_norm({column}) - 1) > %s
+            """).format(table=sql.Identifier(args.table), column=sql.Identifier(VECTOR_COLUMN)), (args.tolerance,))
+            updated = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"{updated} vektor di {args.table} dinormalisasi. Jalankan `rebuild` jika tabel sudah punya indeks ANN.")
+    return 0
+
+
+def cmd_create(args) -> int:
+    conn = autocommit_connection()
+    try:
+        if not pgvector_version(conn):
+            print("Ekstensi vector belum terpasang (CREATE EXTENSION vector).")
+            return 1
+        name = index_name(args.table, args.method)
+        if args.replace:
+            for index in vector_indexes(conn, args.table):
+                if index["indexname"] != name:
+                    print(f"Menghapus indeks {index['indexname']}...")
+                    execute(conn, sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(index["indexname"])))
+        if args.maintenance_work_mem:
+            execute(conn, sql.SQL("SET maintenance_work_mem = {}").format(sql.Literal(args.maintenance_work_mem)))
+
+        if args.method == "hnsw":
+            options = sql.SQL("m = {}, ef_construction = {}").format(sql.Literal(args.m), sql.Literal(args.ef_construction))
+        else:
+            rows = fetch_one(conn, sql.SQL("SELECT count(*) AS total FROM {} WHERE {} IS NOT NULL").format(
+                sql.Identifier(args.table), sql.Identifier(VECTOR_COLUMN)))["total"]
+            lists = args.lists or default_lists(rows)
+            if rows < lists * 10:
+                print(f"Peringatan: hanya {rows} vektor untuk {lists} list. Centroid IVFFlat dihitung dari data yang ada "
+                      f"saat indeks dibuat, jadi buat (atau rebuild) setelah tabel terisi.")
+            options = sql.SQL("lists = {}").format(sql.Literal(lists))
+
+        print(f"Membuat indeks {name} ({args.method}, {OPERATOR_CLASS})...")
+        execute(conn, sql.SQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {method} ({column} {opclass}) WITH ({options})"
+        ).format(
+            name=sql.Identifier(name),
+            table=sql.Identifier(args.table),
+            method=sql.SQL(args.method),
+            column=sql.Identifier(VECTOR_COLUMN),
+            opclass=sql.SQL(OPERATOR_CLASS),
+            options=options,
+        ))
+        execute(conn, sql.SQL("ANALYZE {}").format(sql.Identifier(args.table)))
+        print("Selesai.")
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_rebuild(args) -> int:
+    """Membangun ulang indeks (mis. IVFFlat setelah data bertambah banyak, atau indeks yang INVALID)."""
+    conn = autocommit_connection()
+    try:
+        name = index_name(args.table, args.method)
+        if args.maintenance_work_mem:
+            execute(conn, sql.SQL("SET maintenance_work_mem = {}").format(sql.Literal(args.maintenance_work_mem)))
+        print(f"Membangun ulang {name}...")
+        execute(conn, sql.SQL("REINDEX INDEX CONCURRENTLY {}").format(sql.Identifier(name)))
+        print("Selesai.")
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_drop(args) -> int:
+    conn = autocommit_connection()
+    try:
+        name = index_name(args.table, args.method)
+        execute(conn, sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+        print(f"Indeks {name} dihapus.")
+    finally:
+        conn.close()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, handler, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--table", choices=TABLES, default="news")
+        command.set_defaults(handler=handler)
+        return command
+
+    add_command("status", cmd_status, "Versi pgvector dan indeks ANN yang ada")
+    for name, handler, help_text in (("check-norms", cmd_check_norms, "Periksa norma vektor yang tersimpan"),
+                                     ("normalize", cmd_normalize, "Normalisasi L2 vektor yang tersimpan")):
+        command = add_command(name, handler, help_text)
+        command.add_argument("--tolerance", type=float, default=1e-3)
+    for name, handler, help_text in (("create", cmd_create, "Buat indeks HNSW/IVFFlat"),
+                                     ("rebuild", cmd_rebuild, "Bangun ulang indeks"),
+                                     ("drop", cmd_drop, "Hapus indeks")):
+        command = add_command(name, handler, help_text)
+        command.add_argument("--method", choices=METHODS, default="hnsw")
+        if name != "drop":
+            command.add_argument("--maintenance-work-mem", help="Mis. 1GB; mempercepat pembangunan indeks")
+        if name == "create":
+            command.add_argument("--m", type=int, default=16, help="HNSW: jumlah koneksi per node")
+            command.add_argument("--ef-construction", type=int, default=64, help="HNSW: lebar kandidat saat build")
+            command.add_argument("--lists", type=int, help="IVFFlat: jumlah list (default rows/1000)")
+            command.add_argument("--replace", action="store_true", help="Hapus indeks ANN lain di kolom vector")
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import requests
+from typing import List
+from dotenv import load_dotenv
+
+# Muat environment variables dari file .env
+load_dotenv()
+
+# ===================
+# KONFIGURASI
+# ===================
+# Harus sama dengan model yang dipakai layanan konten (content/core/config.py)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+# Jika diisi (mis. http://127.0.0.1:8100), encode dikirim ke sidecar embedding (content/embedding_server.py)
+# sehingga ETL dan CLI tidak memuat salinan model sendiri
+EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL")
+# Jumlah teks per request ke sidecar / per batch model lokal
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+_local_model = None
+
+
+def _get_local_model():
+    """Memuat model lokal sekali saja, hanya jika sidecar tidak dipakai."""
+    global _local_model
+    if _local_model is None:
+        from sentence_transformers import SentenceTransformer
+        print(f"Memuat model embedding {EMBEDDING_MODEL_NAME} secara lokal...")
+        _local_model = SentenceTransformer(EMBEDDING_MODEL_NAME, cache_folder='./model_cache')
+    return _local_model
+
+
+def _encode_remote(texts: List[str]) -> np.ndarray:
+    response = requests.post(f"{EMBEDDING_SERVICE_URL.rstrip('/')}/embed", json={"texts": texts}, timeout=300)
+    response.raise_for_status()
+    model_name = response.headers["X-Embedding-Model"]
+    if model_name != EMBEDDING_MODEL_NAME:
+        raise RuntimeError(f"Sidecar embedding memakai model {model_name}, bukan {EMBEDDING_MODEL_NAME}")
+    rows, dim = (int(n) for n in response.headers["X-Embedding-Shape"].split(","))
+    return np.frombuffer(response.content, dtype=np.float32).reshape(rows, dim)
+
+
+def encode_texts(texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+    """
+    Menyandikan teks menjadi matriks float32 berbentuk (len(texts), dimensi).
+    Memakai sidecar jika EMBEDDING_SERVICE_URL di-set, selain itu model lokal.
+    """
+    if not EMBEDDING_SERVICE_URL:
+        model = _get_local_model()
+        vectors = model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE, show_progress_bar=show_progress_bar,
+                               convert_to_numpy=True)
+        return vectors.astype(np.float32, copy=False)
+
+    chunks = []
+    starts = range(0, len(texts), EMBEDDING_BATCH_SIZE)
+    if show_progress_bar:
+        from tqdm import tqdm
+        starts = tqdm(starts, desc="Embedding (sidecar)")
+    for start in starts:
+        chunks.append(_encode_remote(texts[start:start + EMBEDDING_BATCH_SIZE]))
+    if not chunks:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(chunks)
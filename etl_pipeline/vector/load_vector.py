@@ -1,9 +1,10 @@
+import numpy as np
 import pandas as pd
 from typing import List, Tuple
 import re
 import unicodedata
 from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
+from embedding_client import EMBEDDING_MODEL_NAME, encode_texts as embed_texts
 import psycopg2
 from psycopg2.extras import execute_batch
 import sys
@@ -40,12 +41,14 @@ def load_and_clean_data(file_path: str) -> pd.DataFrame:
     df['cleaned_description'] = df['description'].progress_apply(clean_text)
     return df
 
-def encode_texts(texts: List[str], model_name: str = 'paraphrase-multilingual-MiniLM-L12-v2') -> List:
-    """Menyandikan teks menjadi vektor embedding."""
-    print("Menyandikan teks menjadi vektor...")
-    model = SentenceTransformer(model_name, cache_folder='./model_cache')
-    vectors = model.encode(texts, show_progress_bar=True, batch_size=32)
-    print(f"Dimensi embedding: {model.get_sentence_embedding_dimension()}")
+def encode_texts(texts: List[str]) -> List:
+    """Menyandikan teks menjadi vektor embedding (lewat sidecar embedding jika EMBEDDING_SERVICE_URL di-set)."""
+    print(f"Menyandikan teks menjadi vektor dengan {EMBEDDING_MODEL_NAME}...")
+    vectors = embed_texts(texts, show_progress_bar=True)
+    print(f"Dimensi embedding: {vectors.shape[1]}")
+    # Normalisasi L2 agar pencarian inner product (<#>) setara cosine similarity
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
     return vectors.tolist()
 
 def connect_db():
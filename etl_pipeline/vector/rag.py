@@ -4,7 +4,7 @@ import psycopg2
 import textwrap
 import google.generativeai as genai
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+from embedding_client import encode_texts
 
 # Muat environment variables dari file .env
 load_dotenv()
@@ -19,9 +19,11 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
+# Parameter indeks ANN pgvector per query (kosong = default server), sama seperti layanan konten
+PGVECTOR_HNSW_EF_SEARCH = os.getenv("PGVECTOR_HNSW_EF_SEARCH")
+PGVECTOR_IVFFLAT_PROBES = os.getenv("PGVECTOR_IVFFLAT_PROBES")
 
-# Nama model dipusatkan di sini agar mudah diganti
-EMBEDDING_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+# Nama model dipusatkan di sini agar mudah diganti (model embedding diatur di embedding_client.py)
 GENERATIVE_MODEL_NAME = 'models/gemini-1.5-flash-latest'
 
 # Konfigurasi API key Gemini
@@ -34,10 +36,8 @@ genai.configure(api_key=GEMINI_API_KEY)
 # ===================
 # Inisialisasi Model (dilakukan sekali saja untuk efisiensi)
 # ===================
-print("Memuat model embedding...")
-embed_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-print("Model embedding siap.")
-
+# Model embedding dimuat oleh embedding_client saat pertama dipakai (atau memakai sidecar jika
+# EMBEDDING_SERVICE_URL di-set)
 print("Memuat model generatif...")
 generative_model = genai.GenerativeModel(model_name=GENERATIVE_MODEL_NAME)
 print("Model generatif siap.")
@@ -72,7 +72,7 @@ def embed_query(text: str) -> list:
     :param text: Teks input dari user.
     :return: Sebuah list float yang merepresentasikan vector.
     """
-    vector = embed_model.encode(text)
+    vector = encode_texts([text])[0]
     return vector.tolist()
 
 def search_similar_docs(conn, query_vector: list, top_k: int = 6):
@@ -87,6 +87,10 @@ def search_similar_docs(conn, query_vector: list, top_k: int = 6):
         # Menggunakan str() pada list akan menghasilkan format '[1.0, 2.0, ...]'
         # yang kompatibel dengan pgvector
         vector_str = str(query_vector)
+        if PGVECTOR_HNSW_EF_SEARCH:
+            cursor.execute("SET LOCAL hnsw.ef_search = %s", (int(PGVECTOR_HNSW_EF_SEARCH),))
+        if PGVECTOR_IVFFLAT_PROBES:
+            cursor.execute("SET LOCAL ivfflat.probes = %s", (int(PGVECTOR_IVFFLAT_PROBES),))
         cursor.execute(
             """
             SELECT title, cleaned_description